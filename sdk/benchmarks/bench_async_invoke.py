@@ -0,0 +1,122 @@
+# =============================================================================
+# bench_async_invoke.py - 同步 vs 异步调用基准测试
+# =============================================================================
+# 在本地 Mock Endpoint 上对比 invoke_endpoint（线程池）与 AsyncEndpointClient
+# 的吞吐 (req/s) 和 p50/p99 延迟
+#
+# 使用方法:
+#   cd sdk && python benchmarks/bench_async_invoke.py --requests 5000 --concurrency 64
+# =============================================================================
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from sm_deploy.config import DeployConfig  # noqa: E402
+from sm_deploy.mock_server import MockEndpointServer  # noqa: E402
+
+
+def _local_config() -> DeployConfig:
+    return DeployConfig(
+        company="acme",
+        team="bench",
+        project="local",
+        region="us-east-1",
+        account_id="000000000000",
+        vpc_id="vpc-local",
+        subnet_ids=["subnet-local"],
+        security_group_ids=["sg-local"],
+        inference_role_arn="arn:aws:iam::000000000000:role/local",
+        execution_role_arn="arn:aws:iam::000000000000:role/local",
+        bucket="local",
+    )
+
+
+def _percentile(samples, pct: float) -> float:
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100.0 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def _report(label: str, elapsed: float, latencies):
+    print(
+        f"  {label:<8} {len(latencies) / elapsed:>10.1f} req/s"
+        f"   p50={_percentile(latencies, 50) * 1000:7.2f} ms"
+        f"   p99={_percentile(latencies, 99) * 1000:7.2f} ms"
+    )
+
+
+def bench_sync(config: DeployConfig, payload: dict, requests: int, concurrency: int):
+    from sm_deploy.clients import set_max_pool_connections
+    from sm_deploy.endpoint import invoke_endpoint
+
+    set_max_pool_connections(concurrency)
+
+    def _call(_):
+        start = time.perf_counter()
+        invoke_endpoint("model", payload, config=config)
+        return time.perf_counter() - start
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        latencies = list(pool.map(_call, range(requests)))
+    return time.perf_counter() - start, latencies
+
+
+def bench_async(config: DeployConfig, payload: dict, requests: int, concurrency: int):
+    from sm_deploy.async_endpoint import AsyncEndpointClient
+
+    async def _run():
+        async with AsyncEndpointClient(config=config, max_concurrency=concurrency) as client:
+
+            latencies = []
+
+            # 与线程池相同的闭环模型: concurrency 个 worker 各自串行发送
+            async def _worker(count: int):
+                for _ in range(count):
+                    start = time.perf_counter()
+                    await client.invoke("model", payload)
+                    latencies.append(time.perf_counter() - start)
+
+            counts = [requests // concurrency] * concurrency
+            for i in range(requests % concurrency):
+                counts[i] += 1
+
+            start = time.perf_counter()
+            await asyncio.gather(*(_worker(count) for count in counts))
+            return time.perf_counter() - start, latencies
+
+    return asyncio.run(_run())
+
+
+def main():
+    parser = argparse.ArgumentParser(description="sync vs async invoke_endpoint benchmark")
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--latency-ms", type=float, default=5.0, help="mock 推理耗时")
+    args = parser.parse_args()
+
+    # 本地 mock 无需真实凭证
+    os.environ.setdefault("AWS_ACCESS_KEY_ID", "bench")
+    os.environ.setdefault("AWS_SECRET_ACCESS_KEY", "bench")
+
+    config = _local_config()
+    payload = {"instances": [[1.0, 2.0, 3.0, 4.0, 5.0]]}
+
+    with MockEndpointServer(latency_ms=args.latency_ms) as server:
+        os.environ["AWS_ENDPOINT_URL_SAGEMAKER_RUNTIME"] = server.url
+        print(
+            f"Mock endpoint: {server.url}  requests={args.requests}"
+            f"  concurrency={args.concurrency}  latency={args.latency_ms}ms"
+        )
+        _report("sync", *bench_sync(config, payload, args.requests, args.concurrency))
+        _report("async", *bench_async(config, payload, args.requests, args.concurrency))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+# =============================================================================
+# bench_import.py - import sm_deploy 耗时检查
+# =============================================================================
+# 在全新解释器中多次测量 `import sm_deploy` 耗时，超出预算或导入了 boto3
+# 时以非零状态退出（可直接用于 CI）
+#
+# 使用方法:
+#   cd sdk && python benchmarks/bench_import.py --budget-ms 100
+# =============================================================================
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+SDK_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+
+_PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import sm_deploy
+elapsed = time.perf_counter() - start
+print(json.dumps({"ms": elapsed * 1000, "boto3": "boto3" in sys.modules}))
+"""
+
+
+def measure_once() -> dict:
+    output = subprocess.check_output([sys.executable, "-c", _PROBE], cwd=SDK_DIR)
+    return json.loads(output)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="import sm_deploy time budget check")
+    parser.add_argument("--budget-ms", type=float, default=100.0)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    samples = [measure_once() for _ in range(args.runs)]
+    median_ms = statistics.median(s["ms"] for s in samples)
+    boto3_loaded = any(s["boto3"] for s in samples)
+
+    print(f"import sm_deploy: median {median_ms:.1f} ms over {args.runs} runs (budget {args.budget_ms} ms)")
+
+    if boto3_loaded:
+        print("FAIL: import sm_deploy eagerly imported boto3")
+        sys.exit(1)
+    if median_ms > args.budget_ms:
+        print("FAIL: import time over budget")
+        sys.exit(1)
+    print("OK")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+# =============================================================================
+# bench_local_batch.py - 本地 Batch Transform 策略/Payload 扫描
+# =============================================================================
+# 用 run_local_batch_transform 对比不同 BatchStrategy / MaxPayloadInMB 的吞吐，
+# 模型为 CSV 行求和，每个请求附加固定开销（模拟 HTTP + 反序列化成本）
+#
+# 使用方法:
+#   cd sdk && python benchmarks/bench_local_batch.py --rows 200000 --overhead-ms 2
+# =============================================================================
+
+import argparse
+import functools
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from sm_deploy.local_batch import run_local_batch_transform  # noqa: E402
+
+
+def csv_sum_predict(body: bytes, content_type: str, overhead_ms: float = 0.0) -> bytes:
+    time.sleep(overhead_ms / 1000.0)
+    lines = body.decode("utf-8").splitlines()
+    return "".join(f"{sum(float(v) for v in line.split(','))}\n" for line in lines).encode("utf-8")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="local batch transform strategy sweep")
+    parser.add_argument("--rows", type=int, default=200000)
+    parser.add_argument("--cols", type=int, default=10)
+    parser.add_argument("--files", type=int, default=4)
+    parser.add_argument("--overhead-ms", type=float, default=2.0)
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    args = parser.parse_args()
+
+    predict = functools.partial(csv_sum_predict, overhead_ms=args.overhead_ms)
+    row = ",".join(str(i) for i in range(args.cols)) + "\n"
+
+    with tempfile.TemporaryDirectory() as tmp:
+        input_dir = os.path.join(tmp, "input")
+        os.makedirs(input_dir)
+        for index in range(args.files):
+            with open(os.path.join(input_dir, f"part-{index}.csv"), "w") as f:
+                f.write(row * (args.rows // args.files))
+
+        print(f"{args.rows} rows x {args.cols} cols, {args.files} files, "
+              f"{args.workers} workers, {args.overhead_ms} ms/request overhead")
+        print(f"  {'strategy':<14} {'payload':>8} {'requests':>9} {'elapsed':>9} {'records/s':>11}")
+
+        sweep = [("SingleRecord", 6)] if args.rows <= 5000 else []
+        sweep += [("MultiRecord", mb) for mb in (0.01, 0.1, 1, 6)]
+        for strategy, payload_mb in sweep:
+            stats = run_local_batch_transform(
+                input_dir,
+                os.path.join(tmp, f"output-{strategy}-{payload_mb}"),
+                predict,
+                strategy=strategy,
+                max_payload_mb=payload_mb,
+                max_concurrent_transforms=args.workers,
+            )
+            print(
+                f"  {strategy:<14} {payload_mb:>6} MB {stats['requests']:>9} "
+                f"{stats['elapsed']:>8.2f}s {stats['records_per_second']:>11,.0f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+# =============================================================================
+# bench_serializers.py - JSON vs 二进制序列化基准测试
+# =============================================================================
+# 对比 10k x 100 float 矩阵在 JSON / CSV / .npy 下的序列化、反序列化耗时和大小
+#
+# 使用方法:
+#   cd sdk && python benchmarks/bench_serializers.py --rows 10000 --cols 100
+# =============================================================================
+
+import argparse
+import io
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from sm_deploy.serializers import serialize, deserialize  # noqa: E402
+
+
+def _body_bytes(body) -> bytes:
+    if isinstance(body, str):
+        return body.encode("utf-8")
+    if hasattr(body, "read"):
+        return body.read()
+    return bytes(body)
+
+
+def _bench(matrix: np.ndarray, content_type: str, repeat: int):
+    encode_times, decode_times = [], []
+    size = 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        raw = _body_bytes(serialize(matrix, content_type))
+        encode_times.append(time.perf_counter() - start)
+        size = len(raw)
+
+        # 模拟响应流: 与 invoke_endpoint 相同，从可 read() 的流解码
+        start = time.perf_counter()
+        deserialize(io.BytesIO(raw), content_type)
+        decode_times.append(time.perf_counter() - start)
+
+    return min(encode_times), min(decode_times), size
+
+
+def main():
+    parser = argparse.ArgumentParser(description="invoke_endpoint serializer benchmark")
+    parser.add_argument("--rows", type=int, default=10000)
+    parser.add_argument("--cols", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    matrix = np.random.default_rng(0).random((args.rows, args.cols))
+    print(f"Matrix: {args.rows} x {args.cols} float64, best of {args.repeat}")
+    print(f"  {'content type':<22} {'encode':>10} {'decode':>10} {'size':>12}")
+
+    for content_type in ("application/json", "text/csv", "application/x-npy"):
+        encode, decode, size = _bench(matrix, content_type, args.repeat)
+        print(
+            f"  {content_type:<22} {encode * 1000:>8.1f}ms {decode * 1000:>8.1f}ms"
+            f" {size / 1024 / 1024:>9.2f} MB"
+        )
+
+
+if __name__ == "__main__":
+    main()
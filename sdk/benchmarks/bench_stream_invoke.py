@@ -0,0 +1,64 @@
+# =============================================================================
+# bench_stream_invoke.py - 流式调用首字节时间基准测试
+# =============================================================================
+# 在本地 Mock Endpoint（event-stream 响应）上测量 invoke_endpoint_stream 的
+# 首字节时间 (TTFB) 与完整响应时间的 p50/p99
+#
+# 使用方法:
+#   cd sdk && python benchmarks/bench_stream_invoke.py --requests 200 --chunk-delay-ms 10
+# =============================================================================
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from sm_deploy.mock_server import MockEndpointServer  # noqa: E402
+
+from bench_async_invoke import _local_config, _percentile  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description="invoke_endpoint_stream TTFB benchmark")
+    parser.add_argument("--requests", type=int, default=100)
+    parser.add_argument("--tokens", type=int, default=32, help="每个响应的 token 数")
+    parser.add_argument("--latency-ms", type=float, default=20.0, help="mock 首个分片前的耗时")
+    parser.add_argument("--chunk-delay-ms", type=float, default=5.0, help="mock 分片间隔")
+    args = parser.parse_args()
+
+    # 本地 mock 无需真实凭证
+    os.environ.setdefault("AWS_ACCESS_KEY_ID", "bench")
+    os.environ.setdefault("AWS_SECRET_ACCESS_KEY", "bench")
+
+    from sm_deploy.endpoint import invoke_endpoint_stream
+
+    config = _local_config()
+    payload = {"instances": list(range(args.tokens))}
+
+    with MockEndpointServer(latency_ms=args.latency_ms, chunk_delay_ms=args.chunk_delay_ms) as server:
+        os.environ["AWS_ENDPOINT_URL_SAGEMAKER_RUNTIME"] = server.url
+        print(
+            f"Mock endpoint: {server.url}  requests={args.requests}  tokens={args.tokens}"
+            f"  latency={args.latency_ms}ms  chunk_delay={args.chunk_delay_ms}ms"
+        )
+
+        ttfb, total = [], []
+        for _ in range(args.requests):
+            start = time.perf_counter()
+            with invoke_endpoint_stream("model", payload, decode="jsonlines", config=config) as stream:
+                for _event in stream:
+                    pass
+            total.append(time.perf_counter() - start)
+            ttfb.append(stream.time_to_first_byte)
+
+    for label, samples in (("TTFB", ttfb), ("total", total)):
+        print(
+            f"  {label:<6} p50={_percentile(samples, 50) * 1000:8.2f} ms"
+            f"   p99={_percentile(samples, 99) * 1000:8.2f} ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
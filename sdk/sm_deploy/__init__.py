@@ -6,38 +6,185 @@
 # 使用方法:
 #   from sm_deploy import deploy_model, create_endpoint
 #
+# 子模块按需加载: `import sm_deploy` 不会导入 boto3，
+# 直到首次访问某个导出名称（或调用需要 AWS 的函数）时才加载对应模块。
 # =============================================================================
 
-from .config import DeployConfig, get_config
-from .model import create_model, deploy_model
-from .endpoint import (
-    create_endpoint_config,
-    create_endpoint,
-    update_endpoint,
-    delete_endpoint,
-    invoke_endpoint,
-    list_endpoints,
-)
-from .batch import create_batch_transform
+import importlib
+from typing import TYPE_CHECKING
 
 __version__ = "1.0.0"
 
-__all__ = [
+# 导出名称 -> 所在子模块
+_LAZY_EXPORTS = {
     # Config
-    "DeployConfig",
-    "get_config",
+    "DeployConfig": ".config",
+    "get_config": ".config",
+    "clear_config_cache": ".config",
+    # Clients
+    "get_client": ".clients",
+    "get_credentials": ".clients",
+    "invalidate_clients": ".clients",
+    "set_max_pool_connections": ".clients",
     # Model
-    "create_model",
-    "deploy_model",
+    "create_model": ".model",
+    "deploy_model": ".model",
+    "deploy_models": ".model",
     # Endpoint
-    "create_endpoint_config",
-    "create_endpoint",
-    "update_endpoint",
-    "delete_endpoint",
-    "invoke_endpoint",
-    "list_endpoints",
+    "create_endpoint_config": ".endpoint",
+    "create_endpoint": ".endpoint",
+    "update_endpoint": ".endpoint",
+    "delete_endpoint": ".endpoint",
+    "invoke_endpoint": ".endpoint",
+    "invoke_endpoint_stream": ".endpoint",
+    "EndpointGroup": ".endpoint",
+    "list_endpoints": ".endpoint",
+    # Variants / traffic shifting
+    "VariantSpec": ".variants",
+    "set_variant_weights": ".variants",
+    "get_variant_weights": ".variants",
+    "shift_traffic": ".variants",
+    "compare_shadow": ".variants",
+    # Autoscaling
+    "AutoScalingSpec": ".autoscaling",
+    "ScheduledScaling": ".autoscaling",
+    "configure_autoscaling": ".autoscaling",
+    "remove_autoscaling": ".autoscaling",
+    "simulate_autoscaling": ".autoscaling",
+    "load_invocation_trace": ".autoscaling",
+    # Serverless cold starts
+    "build_serverless_config": ".serverless",
+    "ColdStartDetector": ".serverless",
+    "track_cold_starts": ".serverless",
+    "cold_start_stats": ".serverless",
+    "KeepWarm": ".serverless",
+    "sweep_serverless": ".rightsizing",
+    # Streaming
+    "ResponseStream": ".streaming",
+    # Rate limiting / retry
+    "EndpointLimiter": ".ratelimit",
+    "configure_limiter": ".ratelimit",
+    "limiter_stats": ".ratelimit",
+    # Metrics
+    "enable_metrics": ".metrics",
+    "disable_metrics": ".metrics",
+    "get_registry": ".metrics",
+    "MetricsRegistry": ".metrics",
+    "StatsdExporter": ".metrics",
+    # Load testing
+    "run_load": ".bench",
+    "find_max_throughput": ".bench",
+    "recommend_instances": ".bench",
+    "LatencyHistogram": ".bench",
+    # Serializers
+    "register_serializer": ".serializers",
+    "register_deserializer": ".serializers",
+    # Cache
+    "PredictionCache": ".cache",
+    "MemoryCacheBackend": ".cache",
+    "SqliteCacheBackend": ".cache",
+    # Async
+    "AsyncEndpointClient": ".async_endpoint",
+    "ainvoke_endpoint": ".async_endpoint",
+    # Async Inference
+    "invoke_endpoint_async": ".async_inference",
+    "AsyncResultCollector": ".async_inference",
+    "wait_async_results": ".async_inference",
+    "get_async_inference_prefix": ".async_inference",
+    # Micro-batching
+    "BatchingInvoker": ".batching",
     # Batch
-    "create_batch_transform",
-]
+    "create_batch_transform": ".batch",
+    "run_sharded_batch_transform": ".batch",
+    "run_local_batch_transform": ".local_batch",
+    "tune_batch_transform": ".batch_tuning",
+    "iter_transform_results": ".batch_results",
+    "iter_transform_job_results": ".batch_results",
+    # Multi-model
+    "ModelManifest": ".multi_model",
+    "get_multi_model_prefix": ".multi_model",
+    "upload_target_model": ".multi_model",
+    # Model artifact packaging
+    "package_model": ".packaging",
+    "hash_model_dir": ".packaging",
+    "get_artifact_prefix": ".packaging",
+    # Status polling
+    "StatusPoller": ".poller",
+    "get_poller": ".poller",
+}
 
+__all__ = list(_LAZY_EXPORTS)
 
+
+def __getattr__(name: str):
+    module_name = _LAZY_EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    value = getattr(importlib.import_module(module_name, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
+
+
+if TYPE_CHECKING:
+    from .config import DeployConfig, get_config, clear_config_cache
+    from .clients import get_client, get_credentials, invalidate_clients, set_max_pool_connections
+    from .model import create_model, deploy_model, deploy_models
+    from .endpoint import (
+        create_endpoint_config,
+        create_endpoint,
+        update_endpoint,
+        delete_endpoint,
+        invoke_endpoint,
+        invoke_endpoint_stream,
+        list_endpoints,
+        EndpointGroup,
+    )
+    from .variants import (
+        VariantSpec,
+        set_variant_weights,
+        get_variant_weights,
+        shift_traffic,
+        compare_shadow,
+    )
+    from .autoscaling import (
+        AutoScalingSpec,
+        ScheduledScaling,
+        configure_autoscaling,
+        remove_autoscaling,
+        simulate_autoscaling,
+        load_invocation_trace,
+    )
+    from .serverless import (
+        build_serverless_config,
+        ColdStartDetector,
+        track_cold_starts,
+        cold_start_stats,
+        KeepWarm,
+    )
+    from .rightsizing import sweep_serverless
+    from .streaming import ResponseStream
+    from .ratelimit import EndpointLimiter, configure_limiter, limiter_stats
+    from .metrics import enable_metrics, disable_metrics, get_registry, MetricsRegistry, StatsdExporter
+    from .bench import run_load, find_max_throughput, recommend_instances, LatencyHistogram
+    from .serializers import register_serializer, register_deserializer
+    from .cache import PredictionCache, MemoryCacheBackend, SqliteCacheBackend
+    from .async_endpoint import AsyncEndpointClient, ainvoke_endpoint
+    from .async_inference import (
+        invoke_endpoint_async,
+        AsyncResultCollector,
+        wait_async_results,
+        get_async_inference_prefix,
+    )
+    from .batching import BatchingInvoker
+    from .batch import create_batch_transform, run_sharded_batch_transform
+    from .local_batch import run_local_batch_transform
+    from .batch_tuning import tune_batch_transform
+    from .batch_results import iter_transform_results, iter_transform_job_results
+    from .poller import StatusPoller, get_poller
+    from .multi_model import ModelManifest, get_multi_model_prefix, upload_target_model
+    from .packaging import package_model, hash_model_dir, get_artifact_prefix
@@ -0,0 +1,260 @@
+# =============================================================================
+# async_endpoint.py - 异步 Endpoint 调用 (asyncio)
+# =============================================================================
+# 基于 asyncio + aiohttp 的 InvokeEndpoint 调用，支持并发上限、超时和取消
+# 依赖: pip install aiohttp
+# =============================================================================
+
+import asyncio
+import json
+import os
+from typing import Any, Iterable, List, Optional, Tuple
+from urllib.parse import quote
+
+from .config import get_config, DeployConfig
+from .clients import get_credentials
+from .serializers import serialize, deserialize, body_to_bytes
+
+
+def _get_runtime_url(region: str) -> str:
+    """获取 SageMaker Runtime 地址（支持 AWS_ENDPOINT_URL_SAGEMAKER_RUNTIME 覆盖）"""
+    url = os.environ.get("AWS_ENDPOINT_URL_SAGEMAKER_RUNTIME") or os.environ.get(
+        "AWS_ENDPOINT_URL"
+    )
+    if url:
+        return url.rstrip("/")
+    return f"https://runtime.sagemaker.{region}.amazonaws.com"
+
+
+class AsyncEndpointClient:
+    """
+    异步 Endpoint 调用客户端
+
+    持有一个常驻的 aiohttp Session（复用 HTTP 连接），用 SigV4 签名请求，
+    并通过信号量限制同时在途的请求数。
+
+    Example:
+        async with AsyncEndpointClient(max_concurrency=100) as client:
+            result = await client.invoke("sklearn-v1", {"instances": [[1, 2, 3]]})
+            results = await client.invoke_many(
+                "sklearn-v1", [{"instances": [[i]]} for i in range(1000)]
+            )
+    """
+
+    def __init__(
+        self,
+        config: DeployConfig = None,
+        max_concurrency: int = 64,
+        timeout: float = 60.0,
+        endpoint_url: Optional[str] = None,
+    ):
+        """
+        Args:
+            config: 部署配置（默认自动获取）
+            max_concurrency: 最大在途请求数
+            timeout: 单次请求超时（秒）
+            endpoint_url: Runtime 地址（默认按 Region 生成，本地测试可指定 mock 地址）
+        """
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be >= 1")
+
+        self.config = config or get_config()
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+        self.endpoint_url = (endpoint_url or _get_runtime_url(self.config.region)).rstrip("/")
+
+        self._semaphore = None
+        self._session = None
+        self._credentials = get_credentials()
+        if self._credentials is None:
+            raise ValueError("No AWS credentials found for SageMaker Runtime requests")
+
+    async def _get_http_session(self):
+        """惰性创建 aiohttp Session（必须在事件循环内创建）"""
+        if self._session is None or self._session.closed:
+            try:
+                import aiohttp
+            except ImportError:
+                raise ImportError("AsyncEndpointClient requires aiohttp: pip install aiohttp")
+
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=self.max_concurrency),
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+            )
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._session
+
+    def _full_endpoint_name(self, endpoint_name: str) -> str:
+        prefix = self.config.get_endpoint_name_prefix()
+        return endpoint_name if endpoint_name.startswith(prefix) else f"{prefix}-{endpoint_name}"
+
+    def _sign(self, url: str, body: bytes, headers: dict) -> dict:
+        """对请求做 SigV4 签名，返回带签名的 headers"""
+        from botocore.auth import SigV4Auth
+        from botocore.awsrequest import AWSRequest
+
+        request = AWSRequest(method="POST", url=url, data=body, headers=headers)
+        credentials = self._credentials.get_frozen_credentials()
+        SigV4Auth(credentials, "sagemaker", self.config.region).add_auth(request)
+        return dict(request.headers.items())
+
+    async def invoke(
+        self,
+        endpoint_name: str,
+        data: Any,
+        content_type: str = "application/json",
+        accept: str = "application/json",
+        timeout: Optional[float] = None,
+        target_model: Optional[str] = None,
+    ) -> Any:
+        """
+        异步调用 Endpoint（返回值与 invoke_endpoint 相同）
+
+        Args:
+            endpoint_name: Endpoint 名称
+            data: 输入数据
+            content_type: 请求 Content-Type
+            accept: 响应 Accept
+            timeout: 本次调用超时（秒，默认使用客户端超时）
+            target_model: 多模型 Endpoint 的目标模型
+
+        Returns:
+            推理结果
+        """
+        session = await self._get_http_session()
+        full_endpoint_name = self._full_endpoint_name(endpoint_name)
+
+        body = body_to_bytes(serialize(data, content_type))
+
+        url = f"{self.endpoint_url}/endpoints/{quote(full_endpoint_name, safe='')}/invocations"
+
+        async with self._semaphore:
+            # 在获得并发槽位后再签名，避免排队过久导致签名过期
+            headers = {"Content-Type": content_type, "Accept": accept}
+            if target_model:
+                headers["X-Amzn-SageMaker-Target-Model"] = target_model
+            headers = self._sign(url, body, headers)
+            response = await asyncio.wait_for(
+                self._post(session, url, body, headers), timeout or self.timeout
+            )
+
+        status, raw, error_type = response
+        if status >= 300:
+            _raise_client_error(status, raw, error_type)
+
+        return deserialize(raw, accept)
+
+    @staticmethod
+    async def _post(session, url: str, body: bytes, headers: dict) -> Tuple[int, bytes, str]:
+        async with session.post(url, data=body, headers=headers) as response:
+            raw = await response.read()
+            return response.status, raw, response.headers.get("x-amzn-ErrorType", "")
+
+    async def invoke_many(
+        self,
+        endpoint_name: str,
+        payloads: Iterable[Any],
+        content_type: str = "application/json",
+        accept: str = "application/json",
+        return_exceptions: bool = False,
+    ) -> List[Any]:
+        """
+        并发调用 Endpoint（受 max_concurrency 限制），结果顺序与输入一致
+
+        Args:
+            endpoint_name: Endpoint 名称
+            payloads: 输入数据列表
+            content_type: 请求 Content-Type
+            accept: 响应 Accept
+            return_exceptions: 是否将异常作为结果返回（否则首个异常会取消其余请求）
+
+        Returns:
+            推理结果列表
+        """
+        tasks = [
+            asyncio.ensure_future(self.invoke(endpoint_name, data, content_type, accept))
+            for data in payloads
+        ]
+        try:
+            return await asyncio.gather(*tasks, return_exceptions=return_exceptions)
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            raise
+
+    async def close(self):
+        """关闭 HTTP Session"""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+    async def __aenter__(self):
+        await self._get_http_session()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+
+def _raise_client_error(status: int, raw: bytes, error_type: str):
+    """将错误响应转换为与 boto3 一致的 ClientError"""
+    from botocore.exceptions import ClientError
+
+    try:
+        payload = json.loads(raw.decode("utf-8"))
+    except (UnicodeDecodeError, json.JSONDecodeError):
+        payload = {}
+    if not isinstance(payload, dict):
+        payload = {}
+
+    code = (error_type or payload.get("__type", "") or str(status)).split(":")[0]
+    code = code.rsplit("#", 1)[-1]
+    message = payload.get("message") or payload.get("Message") or raw[:200].decode("utf-8", "replace")
+
+    raise ClientError(
+        {
+            "Error": {"Code": code, "Message": message},
+            "ResponseMetadata": {"HTTPStatusCode": status},
+        },
+        "InvokeEndpoint",
+    )
+
+
+async def ainvoke_endpoint(
+    endpoint_name: str,
+    data: Any,
+    content_type: str = "application/json",
+    accept: str = "application/json",
+    config: DeployConfig = None,
+    client: AsyncEndpointClient = None,
+    timeout: Optional[float] = None,
+    target_model: Optional[str] = None,
+) -> Any:
+    """
+    异步调用 Endpoint 进行推理（invoke_endpoint 的 asyncio 版本）
+
+    高并发场景请复用 AsyncEndpointClient，避免每次调用创建新的 HTTP Session。
+
+    Args:
+        endpoint_name: Endpoint 名称
+        data: 输入数据
+        content_type: 请求 Content-Type
+        accept: 响应 Accept
+        config: 部署配置
+        client: 复用的 AsyncEndpointClient（默认创建临时客户端）
+        timeout: 超时（秒）
+        target_model: 多模型 Endpoint 的目标模型
+
+    Returns:
+        推理结果
+
+    Example:
+        result = await ainvoke_endpoint("sklearn-v1", {"instances": [[1.0, 2.0]]})
+    """
+    if client is not None:
+        return await client.invoke(endpoint_name, data, content_type, accept, timeout, target_model)
+
+    async with AsyncEndpointClient(config=config) as temp_client:
+        return await temp_client.invoke(
+            endpoint_name, data, content_type, accept, timeout, target_model
+        )
@@ -0,0 +1,344 @@
+# =============================================================================
+# async_inference.py - 异步推理 Endpoint (Async Inference)
+# =============================================================================
+# 适合大 payload / 长耗时模型: 请求体先上传到 S3，Endpoint 排队处理后把
+# 结果写回 S3。
+#
+# 目录结构:
+#   s3://{bucket}/{output_prefix}/async/{endpoint}/
+#     ├── input/{inference_id}      # invoke_endpoint_async 上传的请求体
+#     ├── output/{id}.out           # 成功结果（由 SageMaker 写入）
+#     └── failures/{id}-error.out   # 失败信息（由 SageMaker 写入）
+#
+# 结果收集: AsyncResultCollector 每轮按目录列举一次（List，而非逐个对象 Head），
+# 一次请求即可确认同一目录下的多个结果。
+# =============================================================================
+
+import time
+import uuid
+from typing import Any, Dict, Iterator, List, Tuple
+
+from .config import get_config, DeployConfig
+from .clients import get_client, split_s3_uri
+from .serializers import serialize, deserialize, body_to_bytes
+from .ratelimit import get_limiter
+
+
+def get_async_inference_prefix(name: str, config: DeployConfig = None) -> str:
+    """
+    获取异步推理 Endpoint 的 S3 目录
+
+    Returns:
+        s3://{bucket}/{output_prefix}/async/{name}/
+    """
+    if config is None:
+        config = get_config()
+    return f"s3://{config.bucket}/{config.output_prefix}/async/{name}/"
+
+
+def build_async_inference_config(
+    name: str,
+    config: DeployConfig = None,
+    output_s3_uri: str = None,
+    max_concurrent_invocations: int = None,
+    success_topic_arn: str = None,
+    error_topic_arn: str = None,
+) -> Dict[str, Any]:
+    """
+    构建 CreateEndpointConfig 的 AsyncInferenceConfig
+
+    Args:
+        name: Endpoint（或模型）完整名称，决定默认输出目录
+        config: 部署配置
+        output_s3_uri: 输出目录（默认 get_async_inference_prefix(name)）
+        max_concurrent_invocations: 每个实例同时处理的请求数（默认由 SageMaker 决定）
+        success_topic_arn: 成功通知 SNS Topic
+        error_topic_arn: 失败通知 SNS Topic
+
+    Returns:
+        AsyncInferenceConfig (dict)
+    """
+    if config is None:
+        config = get_config()
+
+    base = (output_s3_uri or get_async_inference_prefix(name, config)).rstrip("/") + "/"
+    output_config: Dict[str, Any] = {
+        "S3OutputPath": f"{base}output/",
+        "S3FailurePath": f"{base}failures/",
+    }
+    notification = {}
+    if success_topic_arn:
+        notification["SuccessTopic"] = success_topic_arn
+    if error_topic_arn:
+        notification["ErrorTopic"] = error_topic_arn
+    if notification:
+        output_config["NotificationConfig"] = notification
+
+    async_config: Dict[str, Any] = {"OutputConfig": output_config}
+    if max_concurrent_invocations:
+        async_config["ClientConfig"] = {
+            "MaxConcurrentInvocationsPerInstance": max_concurrent_invocations
+        }
+    return async_config
+
+
+def invoke_endpoint_async(
+    endpoint_name: str,
+    data: Any,
+    content_type: str = "application/json",
+    accept: str = "application/json",
+    config: DeployConfig = None,
+    inference_id: str = None,
+    input_s3_uri: str = None,
+    s3_client=None,
+    idempotent: bool = False,
+) -> Dict[str, Any]:
+    """
+    异步调用 Endpoint
+
+    请求体上传到 {async 目录}/input/{inference_id} 后调用 InvokeEndpointAsync，立即返回。
+
+    Args:
+        endpoint_name: Endpoint 名称
+        data: 输入数据（按 content_type 序列化，见 serializers.py）
+        content_type: 请求 Content-Type
+        accept: 响应 Accept
+        config: 部署配置
+        inference_id: 推理 ID（默认自动生成）
+        input_s3_uri: 已在 S3 上的输入（传入时不上传 data）
+        s3_client: S3 Client（默认共享 Client）
+        idempotent: 请求是否幂等（默认 False: 5xx / 连接错误不重试，避免同一请求重复排队执行）
+
+    Returns:
+        {"inference_id", "endpoint_name", "input_location", "output_location",
+         "failure_location", "accept"}（可直接交给 AsyncResultCollector）
+
+    Example:
+        handle = invoke_endpoint_async("whisper-large", audio_bytes, content_type="audio/wav")
+        result = AsyncResultCollector([handle]).wait(timeout=900)[handle["inference_id"]]
+    """
+    if config is None:
+        config = get_config()
+
+    runtime = get_client("sagemaker-runtime", config.region)
+    prefix = config.get_endpoint_name_prefix()
+
+    full_endpoint_name = (
+        endpoint_name if endpoint_name.startswith(prefix) else f"{prefix}-{endpoint_name}"
+    )
+    inference_id = inference_id or uuid.uuid4().hex
+
+    if input_s3_uri is None:
+        s3 = s3_client or get_client("s3", config.region)
+        input_s3_uri = f"{get_async_inference_prefix(full_endpoint_name, config)}input/{inference_id}"
+        bucket, key = split_s3_uri(input_s3_uri)
+        s3.put_object(
+            Bucket=bucket,
+            Key=key,
+            Body=body_to_bytes(serialize(data, content_type)),
+            ContentType=content_type,
+        )
+
+    response = get_limiter(full_endpoint_name, config.region).call(
+        runtime.invoke_endpoint_async,
+        EndpointName=full_endpoint_name,
+        InputLocation=input_s3_uri,
+        ContentType=content_type,
+        Accept=accept,
+        InferenceId=inference_id,
+        idempotent=idempotent,
+    )
+
+    return {
+        "inference_id": response.get("InferenceId", inference_id),
+        "endpoint_name": full_endpoint_name,
+        "input_location": input_s3_uri,
+        "output_location": response["OutputLocation"],
+        "failure_location": response.get("FailureLocation"),
+        "accept": accept,
+    }
+
+
+class AsyncResultCollector:
+    """
+    批量等待异步推理结果
+
+    把待完成的输出位置按所在目录分组，每轮对每个目录分页列举一次，
+    一次 List 请求可以确认最多 1000 个结果；列举从最小的待完成 Key 开始
+    (StartAfter)，越过最大的待完成 Key 后停止，已完成的结果不会被反复列举。
+    目录中待完成数少于 head_threshold 时改为逐个 HEAD。
+    轮询间隔从 poll_interval 开始按 backoff 增长。
+
+    Example:
+        handles = [invoke_endpoint_async("whisper-large", f) for f in files]
+        collector = AsyncResultCollector(handles)
+        for result in collector.iter_completed(timeout=1800):
+            print(result["inference_id"], result["status"], result.get("body"))
+    """
+
+    def __init__(
+        self,
+        handles: List[Dict[str, Any]] = None,
+        config: DeployConfig = None,
+        fetch: bool = True,
+        poll_interval: float = 2.0,
+        max_poll_interval: float = 30.0,
+        backoff: float = 1.5,
+        head_threshold: int = 10,
+        s3_client=None,
+    ):
+        """
+        Args:
+            handles: invoke_endpoint_async 的返回值列表
+            config: 部署配置
+            fetch: 完成后是否下载结果并按 accept 反序列化（结果放在 body 字段）
+            poll_interval: 首次轮询间隔（秒）
+            max_poll_interval: 轮询间隔上限（秒）
+            backoff: 每轮无新结果时的间隔增长倍数
+            head_threshold: 目录中待完成数 >= 该值时用 List 批量确认，否则逐个 HEAD
+            s3_client: S3 Client（默认共享 Client，测试时可传入本地替身）
+        """
+        if s3_client is None:
+            if config is None:
+                config = get_config()
+            s3_client = get_client("s3", config.region)
+
+        self.fetch = fetch
+        self.poll_interval = poll_interval
+        self.max_poll_interval = max_poll_interval
+        self.backoff = backoff
+        self.head_threshold = head_threshold
+        self._s3 = s3_client
+        self._pending: Dict[str, Dict[str, Any]] = {}
+        # (bucket, 目录) -> {key: (inference_id, status)}
+        self._watch: Dict[Tuple[str, str], Dict[str, Tuple[str, str]]] = {}
+
+        for handle in handles or []:
+            self.add(handle)
+
+    @property
+    def pending(self) -> int:
+        """尚未完成的请求数"""
+        return len(self._pending)
+
+    def add(self, handle: Dict[str, Any]):
+        """加入一个待等待的请求（invoke_endpoint_async 的返回值）"""
+        inference_id = handle["inference_id"]
+        self._pending[inference_id] = handle
+        self._watch_location(handle["output_location"], inference_id, "Completed")
+        if handle.get("failure_location"):
+            self._watch_location(handle["failure_location"], inference_id, "Failed")
+
+    def _watch_location(self, location: str, inference_id: str, status: str):
+        bucket, key = split_s3_uri(location)
+        directory = key[: key.rfind("/") + 1]
+        self._watch.setdefault((bucket, directory), {})[key] = (inference_id, status)
+
+    def _unwatch(self, handle: Dict[str, Any]):
+        for location in (handle["output_location"], handle.get("failure_location")):
+            if not location:
+                continue
+            bucket, key = split_s3_uri(location)
+            directory = key[: key.rfind("/") + 1]
+            watched = self._watch.get((bucket, directory), {})
+            watched.pop(key, None)
+            if not watched:
+                self._watch.pop((bucket, directory), None)
+
+    def poll_once(self) -> List[Dict[str, Any]]:
+        """列举一轮，返回本轮完成的结果"""
+        found: List[Tuple[str, str, str, str]] = []
+        for (bucket, directory), watched in list(self._watch.items()):
+            if len(watched) < self.head_threshold:
+                for key in sorted(watched):
+                    if self._exists(bucket, key):
+                        found.append((*watched[key], bucket, key))
+                continue
+
+            first_key, last_key = min(watched), max(watched)
+            paginator = self._s3.get_paginator("list_objects_v2")
+            # StartAfter 不含自身: 从 first_key 去掉最后一个字符开始，first_key 会被列出
+            pages = paginator.paginate(Bucket=bucket, Prefix=directory, StartAfter=first_key[:-1])
+            for page in pages:
+                for obj in page.get("Contents", []):
+                    if obj["Key"] in watched:
+                        found.append((*watched[obj["Key"]], bucket, obj["Key"]))
+                if page.get("Contents") and page["Contents"][-1]["Key"] >= last_key:
+                    break
+
+        completed = []
+        for inference_id, status, bucket, key in found:
+            handle = self._pending.pop(inference_id, None)
+            if handle is None:
+                # 同一轮里成功和失败位置都出现时只取第一个
+                continue
+            self._unwatch(handle)
+            result = {
+                "inference_id": inference_id,
+                "status": status,
+                "location": f"s3://{bucket}/{key}",
+            }
+            if self.fetch:
+                body = self._s3.get_object(Bucket=bucket, Key=key)["Body"]
+                if status == "Completed":
+                    result["body"] = deserialize(body, handle.get("accept", "application/json"))
+                else:
+                    result["error"] = body.read().decode("utf-8", "replace")
+            completed.append(result)
+        return completed
+
+    def _exists(self, bucket: str, key: str) -> bool:
+        try:
+            self._s3.head_object(Bucket=bucket, Key=key)
+            return True
+        except self._s3.exceptions.ClientError as e:
+            if e.response.get("Error", {}).get("Code") in ("404", "NoSuchKey", "NotFound"):
+                return False
+            raise
+
+    def iter_completed(self, timeout: float = 3600.0) -> Iterator[Dict[str, Any]]:
+        """
+        按完成顺序产出结果，超时后剩余请求以 status="Timeout" 产出
+
+        Yields:
+            {"inference_id", "status": Completed/Failed/Timeout, "location", "body"/"error"}
+        """
+        deadline = time.monotonic() + timeout
+        interval = self.poll_interval
+        while self._pending:
+            completed = self.poll_once()
+            yield from completed
+            if not self._pending:
+                return
+
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            if completed:
+                interval = self.poll_interval
+            time.sleep(min(interval, remaining))
+            interval = min(self.max_poll_interval, interval * self.backoff)
+
+        for inference_id, handle in list(self._pending.items()):
+            self._unwatch(handle)
+            del self._pending[inference_id]
+            yield {"inference_id": inference_id, "status": "Timeout", "location": None}
+
+    def wait(self, timeout: float = 3600.0) -> Dict[str, Dict[str, Any]]:
+        """等待全部请求，返回 {inference_id: 结果}"""
+        return {result["inference_id"]: result for result in self.iter_completed(timeout)}
+
+
+def wait_async_results(
+    handles: List[Dict[str, Any]],
+    timeout: float = 3600.0,
+    config: DeployConfig = None,
+    fetch: bool = True,
+) -> Dict[str, Dict[str, Any]]:
+    """
+    等待一批异步推理结果（AsyncResultCollector 的简写）
+
+    Returns:
+        {inference_id: {"status", "location", "body"/"error"}}
+    """
+    return AsyncResultCollector(handles, config=config, fetch=fetch).wait(timeout)
@@ -0,0 +1,634 @@
+# =============================================================================
+# autoscaling.py - Endpoint 变体自动扩缩容
+# =============================================================================
+# 通过 Application Auto Scaling 为变体设置实例数范围和策略:
+#   目标跟踪   InvocationsPerInstance（每实例每分钟调用数）/ CPU / 平均 ModelLatency
+#   定时扩缩   cron / at 表达式，按时间段调整 min / max（如夜间缩到 1 台）
+#
+# simulate_autoscaling() 在本地回放每分钟请求速率轨迹，按目标跟踪的告警规则
+# （连续 3 分钟高于目标扩容、连续 15 分钟低于 90% 目标缩容、冷却时间、新实例
+# 启动耗时）估算实例数变化和扩容期间的排队，不调用任何 AWS API。
+#
+# 命令行:
+#   python -m sm_deploy.autoscaling --trace rps.csv --per-instance-rps 40 \
+#       --min 1 --max 8 --target-invocations 1680 --schedule "cron(0 8 * * ? *)" 3 8
+# =============================================================================
+
+import argparse
+import csv
+import math
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+
+from .config import get_config, DeployConfig
+from .clients import get_client
+
+SERVICE_NAMESPACE = "sagemaker"
+SCALABLE_DIMENSION = "sagemaker:variant:DesiredInstanceCount"
+
+# 目标跟踪告警规则（Application Auto Scaling 为目标跟踪策略创建的告警）
+SCALE_OUT_DATAPOINTS = 3
+SCALE_IN_DATAPOINTS = 15
+SCALE_IN_RATIO = 0.9
+
+
+@dataclass
+class ScheduledScaling:
+    """
+    定时调整实例数范围
+
+    Example:
+        ScheduledScaling("night", "cron(0 22 * * ? *)", min_capacity=1, max_capacity=2,
+                         timezone="Asia/Tokyo")
+    """
+
+    name: str
+    schedule: str
+    min_capacity: Optional[int] = None
+    max_capacity: Optional[int] = None
+    timezone: str = "UTC"
+
+
+@dataclass
+class AutoScalingSpec:
+    """
+    变体的自动扩缩容配置
+
+    target_invocations 为每实例每分钟的调用数，可由压测结果估算:
+    单实例可持续吞吐 (req/s) × 60 × 目标利用率（见 bench.recommend_instances）。
+    target_cpu 为 CPUUtilization 平均值，该指标按 vCPU 累加（4 vCPU 满载为 400）。
+    target_latency_ms 跟踪平均 ModelLatency；延迟与实例数不成正比，建议与
+    target_invocations 一起使用。
+
+    Example:
+        AutoScalingSpec(min_capacity=2, max_capacity=10, target_invocations=1200,
+                        schedules=[ScheduledScaling("night", "cron(0 22 * * ? *)", 1, 2)])
+    """
+
+    min_capacity: int = 1
+    max_capacity: int = 4
+    target_invocations: Optional[float] = None
+    target_cpu: Optional[float] = None
+    target_latency_ms: Optional[float] = None
+    scale_in_cooldown: int = 300
+    scale_out_cooldown: int = 60
+    disable_scale_in: bool = False
+    schedules: List[ScheduledScaling] = field(default_factory=list)
+
+    def targets(self) -> Dict[str, float]:
+        """{metric: 目标值}（invocations / cpu / latency）"""
+        targets = {
+            "invocations": self.target_invocations,
+            "cpu": self.target_cpu,
+            "latency": self.target_latency_ms,
+        }
+        return {metric: value for metric, value in targets.items() if value is not None}
+
+
+def _full_name(name: str, config: DeployConfig) -> str:
+    prefix = config.get_endpoint_name_prefix()
+    return name if name.startswith(prefix) else f"{prefix}-{name}"
+
+
+def get_resource_id(endpoint_name: str, variant: str = "AllTraffic") -> str:
+    """Application Auto Scaling 的 ResourceId"""
+    return f"endpoint/{endpoint_name}/variant/{variant}"
+
+
+def _metric_specification(metric: str, endpoint_name: str, variant: str) -> Dict[str, Any]:
+    if metric == "invocations":
+        return {
+            "PredefinedMetricSpecification": {
+                "PredefinedMetricType": "SageMakerVariantInvocationsPerInstance"
+            }
+        }
+    dimensions = [
+        {"Name": "EndpointName", "Value": endpoint_name},
+        {"Name": "VariantName", "Value": variant},
+    ]
+    if metric == "cpu":
+        return {
+            "CustomizedMetricSpecification": {
+                "Namespace": "/aws/sagemaker/Endpoints",
+                "MetricName": "CPUUtilization",
+                "Dimensions": dimensions,
+                "Statistic": "Average",
+                "Unit": "Percent",
+            }
+        }
+    if metric == "latency":
+        return {
+            "CustomizedMetricSpecification": {
+                "Namespace": "AWS/SageMaker",
+                "MetricName": "ModelLatency",
+                "Dimensions": dimensions,
+                "Statistic": "Average",
+                "Unit": "Microseconds",
+            }
+        }
+    raise ValueError(f"Unsupported metric: {metric} (expected invocations, cpu or latency)")
+
+
+def configure_autoscaling(
+    endpoint_name: str,
+    spec: AutoScalingSpec,
+    variant: str = "AllTraffic",
+    config: DeployConfig = None,
+) -> Dict[str, Any]:
+    """
+    为变体注册扩缩容目标并设置策略（可重复调用；不在 spec 中的旧策略和定时任务会被删除）
+
+    Endpoint 需为 InService。
+
+    Args:
+        endpoint_name: Endpoint 名称
+        spec: 扩缩容配置
+        variant: 变体名称
+        config: 部署配置
+
+    Returns:
+        {"resource_id", "policies": [...], "scheduled_actions": [...]}
+
+    Example:
+        configure_autoscaling("sklearn-v1", AutoScalingSpec(min_capacity=1, max_capacity=8,
+                                                            target_invocations=1500))
+    """
+    if config is None:
+        config = get_config()
+    if not 1 <= spec.min_capacity <= spec.max_capacity:
+        raise ValueError("require 1 <= min_capacity <= max_capacity")
+    targets = spec.targets()
+    if not targets and not spec.schedules:
+        raise ValueError("AutoScalingSpec needs at least one target or schedule")
+
+    aas = get_client("application-autoscaling", config.region)
+    full_endpoint_name = _full_name(endpoint_name, config)
+    resource_id = get_resource_id(full_endpoint_name, variant)
+    target = {
+        "ServiceNamespace": SERVICE_NAMESPACE,
+        "ResourceId": resource_id,
+        "ScalableDimension": SCALABLE_DIMENSION,
+    }
+
+    aas.register_scalable_target(
+        **target, MinCapacity=spec.min_capacity, MaxCapacity=spec.max_capacity
+    )
+
+    policies = []
+    for metric, value in targets.items():
+        policy_name = f"{full_endpoint_name}-{variant}-{metric}"
+        aas.put_scaling_policy(
+            **target,
+            PolicyName=policy_name,
+            PolicyType="TargetTrackingScaling",
+            TargetTrackingScalingPolicyConfiguration={
+                # ModelLatency 单位为微秒
+                "TargetValue": float(value * 1000 if metric == "latency" else value),
+                **_metric_specification(metric, full_endpoint_name, variant),
+                "ScaleInCooldown": spec.scale_in_cooldown,
+                "ScaleOutCooldown": spec.scale_out_cooldown,
+                "DisableScaleIn": spec.disable_scale_in,
+            },
+        )
+        policies.append(policy_name)
+
+    actions = []
+    for schedule in spec.schedules:
+        action: Dict[str, Any] = {}
+        if schedule.min_capacity is not None:
+            action["MinCapacity"] = schedule.min_capacity
+        if schedule.max_capacity is not None:
+            action["MaxCapacity"] = schedule.max_capacity
+        action_name = f"{full_endpoint_name}-{variant}-{schedule.name}"
+        aas.put_scheduled_action(
+            ServiceNamespace=SERVICE_NAMESPACE,
+            ScheduledActionName=action_name,
+            ResourceId=resource_id,
+            ScalableDimension=SCALABLE_DIMENSION,
+            Schedule=schedule.schedule,
+            Timezone=schedule.timezone,
+            ScalableTargetAction=action,
+        )
+        actions.append(action_name)
+
+    # 删除旧配置留下的策略和定时任务
+    existing = aas.describe_scaling_policies(ServiceNamespace=SERVICE_NAMESPACE, ResourceId=resource_id)
+    for policy in existing.get("ScalingPolicies", []):
+        if policy["PolicyName"] not in policies:
+            aas.delete_scaling_policy(**target, PolicyName=policy["PolicyName"])
+    existing = aas.describe_scheduled_actions(ServiceNamespace=SERVICE_NAMESPACE, ResourceId=resource_id)
+    for scheduled in existing.get("ScheduledActions", []):
+        if scheduled["ScheduledActionName"] not in actions:
+            aas.delete_scheduled_action(
+                ServiceNamespace=SERVICE_NAMESPACE,
+                ScheduledActionName=scheduled["ScheduledActionName"],
+                ResourceId=resource_id,
+                ScalableDimension=SCALABLE_DIMENSION,
+            )
+
+    print(
+        f"✅ Autoscaling configured: {resource_id} "
+        f"[{spec.min_capacity}-{spec.max_capacity}] {', '.join(policies + actions)}"
+    )
+    return {"resource_id": resource_id, "policies": policies, "scheduled_actions": actions}
+
+
+def remove_autoscaling(endpoint_name: str, config: DeployConfig = None) -> List[str]:
+    """
+    注销 Endpoint 所有变体的扩缩容目标（策略和定时任务随之删除）
+
+    删除 Endpoint 或通过 UpdateEndpoint 替换变体前调用。
+
+    Returns:
+        已注销的 ResourceId 列表
+    """
+    if config is None:
+        config = get_config()
+
+    aas = get_client("application-autoscaling", config.region)
+    prefix = f"endpoint/{_full_name(endpoint_name, config)}/variant/"
+
+    removed = []
+    paginator = aas.get_paginator("describe_scalable_targets")
+    for page in paginator.paginate(ServiceNamespace=SERVICE_NAMESPACE):
+        for target in page["ScalableTargets"]:
+            if target["ResourceId"].startswith(prefix):
+                aas.deregister_scalable_target(
+                    ServiceNamespace=SERVICE_NAMESPACE,
+                    ResourceId=target["ResourceId"],
+                    ScalableDimension=target["ScalableDimension"],
+                )
+                removed.append(target["ResourceId"])
+    for resource_id in removed:
+        print(f"✅ Autoscaling removed: {resource_id}")
+    return removed
+
+
+def load_invocation_trace(
+    endpoint_name: str,
+    start: datetime,
+    end: datetime,
+    variant: str = "AllTraffic",
+    config: DeployConfig = None,
+) -> List[Tuple[datetime, float]]:
+    """
+    从 CloudWatch 读取变体每分钟的请求速率，作为 simulate_autoscaling 的轨迹
+
+    Returns:
+        [(分钟起始时刻, req/s)]（没有数据的分钟为 0）
+    """
+    if config is None:
+        config = get_config()
+
+    cloudwatch = get_client("cloudwatch", config.region)
+    full_endpoint_name = _full_name(endpoint_name, config)
+    start = start.replace(second=0, microsecond=0)
+
+    counts: Dict[datetime, float] = {}
+    paginator = cloudwatch.get_paginator("get_metric_data")
+    for page in paginator.paginate(
+        MetricDataQueries=[
+            {
+                "Id": "invocations",
+                "MetricStat": {
+                    "Metric": {
+                        "Namespace": "AWS/SageMaker",
+                        "MetricName": "Invocations",
+                        "Dimensions": [
+                            {"Name": "EndpointName", "Value": full_endpoint_name},
+                            {"Name": "VariantName", "Value": variant},
+                        ],
+                    },
+                    "Period": 60,
+                    "Stat": "Sum",
+                },
+            }
+        ],
+        StartTime=start,
+        EndTime=end,
+    ):
+        for result in page["MetricDataResults"]:
+            for timestamp, value in zip(result["Timestamps"], result["Values"]):
+                counts[timestamp.replace(second=0, microsecond=0)] = value
+
+    minutes = int((end - start).total_seconds() // 60)
+    trace = []
+    for index in range(minutes):
+        minute = start + timedelta(minutes=index)
+        trace.append((minute, counts.get(minute, 0.0) / 60.0))
+    return trace
+
+
+# =============================================================================
+# 本地模拟
+# =============================================================================
+
+
+def _parse_cron_field(value: str, low: int, high: int) -> Optional[set]:
+    if value in ("*", "?"):
+        return None
+    result = set()
+    for part in value.split(","):
+        number = int(part)
+        if not low <= number <= high:
+            raise ValueError(f"Cron field out of range: {value}")
+        result.add(number)
+    return result
+
+
+def _schedule_matcher(schedule: ScheduledScaling):
+    """返回 (本地时刻) -> 是否触发；仅支持 at() 和分钟 / 小时为固定值的每日 cron()"""
+    expression = schedule.schedule.strip()
+    if expression.startswith("at(") and expression.endswith(")"):
+        at = datetime.fromisoformat(expression[3:-1]).replace(second=0, microsecond=0)
+        return lambda local: local.replace(tzinfo=None) == at
+
+    if expression.startswith("cron(") and expression.endswith(")"):
+        fields = expression[5:-1].split()
+        if len(fields) != 6 or any(f not in ("*", "?") for f in fields[2:]):
+            raise ValueError(f"Simulator supports daily cron expressions only: {expression}")
+        minutes = _parse_cron_field(fields[0], 0, 59)
+        hours = _parse_cron_field(fields[1], 0, 23)
+        return lambda local: (minutes is None or local.minute in minutes) and (
+            hours is None or local.hour in hours
+        )
+
+    raise ValueError(f"Simulator supports at() and cron() schedules only: {expression}")
+
+
+def simulate_autoscaling(
+    trace: Sequence[Union[float, Tuple[datetime, float]]],
+    spec: AutoScalingSpec,
+    per_instance_rps: float,
+    initial_instances: int = None,
+    cold_start_seconds: float = 360.0,
+    base_latency_ms: float = 50.0,
+    request_timeout: float = 60.0,
+    start: datetime = None,
+) -> Dict[str, Any]:
+    """
+    回放每分钟请求速率轨迹，估算目标跟踪 + 定时扩缩容下的实例数和排队
+
+    模型（每分钟一步）:
+    - 每个 InService 实例每秒处理 per_instance_rps 个请求，处理不完的请求排队，
+      排队超过 request_timeout 的部分计为失败（InvokeEndpoint 60 秒超时）
+    - 指标: 每实例每分钟调用数、CPU（利用率 × 100）、平均延迟 base_latency_ms / (1 - 利用率)
+    - 任一策略连续 3 分钟高于目标且超过 scale_out_cooldown 时扩容到
+      ceil(当前实例数 × 指标 / 目标)，新实例 cold_start_seconds 后才开始处理请求
+    - 所有策略连续 15 分钟低于 90% 目标且超过 scale_in_cooldown 时缩容
+    - 定时任务在匹配的分钟调整 min / max，并把实例数限制在新范围内
+
+    Args:
+        trace: 每分钟的请求速率 (req/s)，或 [(时刻, req/s)]（如 load_invocation_trace 的结果）
+        spec: 扩缩容配置
+        per_instance_rps: 单实例可持续吞吐（如 bench.find_max_throughput 的结果 / 实例数）
+        initial_instances: 初始实例数（默认 spec.min_capacity）
+        cold_start_seconds: 新实例从扩容决定到 InService 的时间
+        base_latency_ms: 空载时的模型延迟（用于 latency 策略）
+        request_timeout: 请求超时（秒）
+        start: 轨迹起始时刻（trace 为纯数值时用于匹配定时任务，默认当天 00:00 UTC）
+
+    Returns:
+        {"timeline": [{"time", "rps", "in_service", "desired", "backlog", "wait_seconds",
+                       "utilization", "rejected"}],
+         "summary": {"instance_hours", "peak_instances", "static_instance_hours",
+                     "queued_minutes", "max_wait_seconds", "rejected_requests",
+                     "scale_out_events", "scale_in_events"}}
+        static_instance_hours 为按峰值固定部署时的实例小时数（对比用）
+    """
+    if per_instance_rps <= 0:
+        raise ValueError("per_instance_rps must be > 0")
+    targets = spec.targets()
+
+    points = [item if isinstance(item, tuple) else (None, item) for item in trace]
+    if points and points[0][0] is not None:
+        start = points[0][0]
+    if start is None:
+        start = datetime.now(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
+    if start.tzinfo is None:
+        start = start.replace(tzinfo=timezone.utc)
+
+    schedules = []
+    for schedule in spec.schedules:
+        try:
+            from zoneinfo import ZoneInfo
+
+            zone = ZoneInfo(schedule.timezone)
+        except ImportError:
+            zone = timezone.utc
+        schedules.append((schedule, _schedule_matcher(schedule), zone))
+
+    min_capacity, max_capacity = spec.min_capacity, spec.max_capacity
+    desired = initial_instances if initial_instances is not None else min_capacity
+    # 每个实例可以开始处理请求的时刻（秒）
+    ready_at = [0.0] * desired
+    above = {metric: 0 for metric in targets}
+    below = 0
+    last_scale_out = last_scale = float("-inf")
+    backlog = 0.0
+    timeline = []
+    summary = {
+        "instance_hours": 0.0,
+        "peak_instances": desired,
+        "queued_minutes": 0,
+        "max_wait_seconds": 0.0,
+        "rejected_requests": 0.0,
+        "scale_out_events": 0,
+        "scale_in_events": 0,
+    }
+
+    def resize(count: int, now: float):
+        nonlocal desired
+        if count > desired:
+            ready_at.extend([now + cold_start_seconds] * (count - desired))
+        elif count < desired:
+            # 先取消尚未就绪的实例
+            ready_at.sort()
+            del ready_at[count:]
+        desired = count
+
+    for index, (_, rps) in enumerate(points):
+        now = index * 60.0
+        moment = start + timedelta(minutes=index)
+
+        for schedule, matches, zone in schedules:
+            if matches(moment.astimezone(zone)):
+                if schedule.min_capacity is not None:
+                    min_capacity = schedule.min_capacity
+                if schedule.max_capacity is not None:
+                    max_capacity = schedule.max_capacity
+                bounded = min(max(desired, min_capacity), max_capacity)
+                if bounded != desired:
+                    resize(bounded, now)
+                    last_scale = now
+
+        in_service = sum(1 for t in ready_at if t <= now)
+        rate = in_service * per_instance_rps
+        capacity = rate * 60.0
+        demand = backlog + rps * 60.0
+        served = min(demand, capacity)
+        backlog = demand - served
+        rejected = max(0.0, backlog - rate * request_timeout)
+        backlog -= rejected
+        wait = backlog / rate if rate else 0.0
+        utilization = served / capacity if capacity else (1.0 if rps else 0.0)
+
+        observed = {
+            "invocations": served / in_service if in_service else 0.0,
+            "cpu": utilization * 100.0,
+            "latency": base_latency_ms / max(0.05, 1.0 - utilization),
+        }
+
+        # 目标跟踪
+        ratios = {metric: observed[metric] / target for metric, target in targets.items() if target}
+        for metric, ratio in ratios.items():
+            above[metric] = above[metric] + 1 if ratio > 1.0 else 0
+        below = below + 1 if ratios and all(r < SCALE_IN_RATIO for r in ratios.values()) else 0
+
+        # 饱和时调用数被实例容量封顶，用需求估算扩容幅度
+        wanted = {
+            metric: math.ceil(desired * ratio * (demand / served if served and metric == "invocations" else 1.0))
+            for metric, ratio in ratios.items()
+        }
+        out = [wanted[m] for m in ratios if above[m] >= SCALE_OUT_DATAPOINTS]
+        if out and now - last_scale_out >= spec.scale_out_cooldown:
+            count = min(max_capacity, max(out))
+            if count > desired:
+                resize(count, now)
+                last_scale_out = last_scale = now
+                summary["scale_out_events"] += 1
+                above = {metric: 0 for metric in targets}
+        elif (
+            not spec.disable_scale_in
+            and below >= SCALE_IN_DATAPOINTS
+            and now - last_scale >= spec.scale_in_cooldown
+        ):
+            count = max(min_capacity, max(wanted.values()))
+            if count < desired:
+                resize(count, now)
+                last_scale = now
+                summary["scale_in_events"] += 1
+                below = 0
+
+        summary["instance_hours"] += len(ready_at) / 60.0
+        summary["peak_instances"] = max(summary["peak_instances"], desired)
+        summary["max_wait_seconds"] = max(summary["max_wait_seconds"], wait)
+        summary["rejected_requests"] += rejected
+        if backlog > 0:
+            summary["queued_minutes"] += 1
+
+        timeline.append(
+            {
+                "time": moment,
+                "rps": rps,
+                "in_service": in_service,
+                "desired": desired,
+                "backlog": backlog,
+                "wait_seconds": wait,
+                "utilization": utilization,
+                "rejected": rejected,
+            }
+        )
+
+    peak_rps = max((rps for _, rps in points), default=0.0)
+    static = max(spec.min_capacity, math.ceil(peak_rps / per_instance_rps))
+    summary["static_instance_hours"] = static * len(points) / 60.0
+    return {"timeline": timeline, "summary": summary}
+
+
+# =============================================================================
+# 命令行
+# =============================================================================
+
+
+def _read_trace(path: str) -> List[Union[float, Tuple[datetime, float]]]:
+    """CSV: 每行 rps，或 时刻(ISO 8601),rps；首行为表头时跳过"""
+    trace: List[Union[float, Tuple[datetime, float]]] = []
+    with open(path, newline="") as f:
+        for row in csv.reader(f):
+            if not row:
+                continue
+            try:
+                if len(row) == 1:
+                    trace.append(float(row[0]))
+                else:
+                    trace.append((datetime.fromisoformat(row[0]), float(row[1])))
+            except ValueError:
+                if trace:
+                    raise
+    return trace
+
+
+def main(argv: List[str] = None):
+    parser = argparse.ArgumentParser(
+        prog="python -m sm_deploy.autoscaling", description="Autoscaling dry-run simulator"
+    )
+    parser.add_argument("--trace", required=True, help="每分钟请求速率 CSV（rps 或 时刻,rps）")
+    parser.add_argument("--per-instance-rps", type=float, required=True, help="单实例可持续吞吐")
+    parser.add_argument("--min", type=int, default=1, dest="min_capacity")
+    parser.add_argument("--max", type=int, default=4, dest="max_capacity")
+    parser.add_argument("--initial", type=int, help="初始实例数（默认 --min）")
+    parser.add_argument("--target-invocations", type=float, help="每实例每分钟调用数目标")
+    parser.add_argument("--target-cpu", type=float)
+    parser.add_argument("--target-latency-ms", type=float)
+    parser.add_argument("--base-latency-ms", type=float, default=50.0)
+    parser.add_argument("--scale-in-cooldown", type=int, default=300)
+    parser.add_argument("--scale-out-cooldown", type=int, default=60)
+    parser.add_argument("--cold-start", type=float, default=360.0, help="新实例就绪耗时（秒）")
+    parser.add_argument(
+        "--schedule", nargs=3, action="append", default=[], metavar=("EXPR", "MIN", "MAX"),
+        help='定时任务，如 "cron(0 22 * * ? *)" 1 2（UTC）',
+    )
+    parser.add_argument("--timeline", action="store_true", help="输出每分钟明细")
+    args = parser.parse_args(argv)
+
+    spec = AutoScalingSpec(
+        min_capacity=args.min_capacity,
+        max_capacity=args.max_capacity,
+        target_invocations=args.target_invocations,
+        target_cpu=args.target_cpu,
+        target_latency_ms=args.target_latency_ms,
+        scale_in_cooldown=args.scale_in_cooldown,
+        scale_out_cooldown=args.scale_out_cooldown,
+        schedules=[
+            ScheduledScaling(f"schedule-{i}", expr, int(low), int(high))
+            for i, (expr, low, high) in enumerate(args.schedule)
+        ],
+    )
+    result = simulate_autoscaling(
+        _read_trace(args.trace),
+        spec,
+        per_instance_rps=args.per_instance_rps,
+        initial_instances=args.initial,
+        cold_start_seconds=args.cold_start,
+        base_latency_ms=args.base_latency_ms,
+    )
+
+    if args.timeline:
+        for step in result["timeline"]:
+            print(
+                f"  {step['time']:%Y-%m-%d %H:%M}  rps={step['rps']:8.1f}"
+                f"  instances={step['in_service']:3d}/{step['desired']:<3d}"
+                f"  util={step['utilization']:5.0%}  wait={step['wait_seconds']:6.1f}s"
+                f"  rejected={step['rejected']:.0f}"
+            )
+
+    summary = result["summary"]
+    print(
+        f"Instance hours: {summary['instance_hours']:.1f}"
+        f" (static peak provisioning: {summary['static_instance_hours']:.1f})"
+    )
+    print(
+        f"Peak instances: {summary['peak_instances']}"
+        f"  scale-out: {summary['scale_out_events']}  scale-in: {summary['scale_in_events']}"
+    )
+    print(
+        f"Queued minutes: {summary['queued_minutes']}"
+        f"  max wait: {summary['max_wait_seconds']:.1f}s"
+        f"  rejected requests: {summary['rejected_requests']:.0f}"
+    )
+
+
+if __name__ == "__main__":
+    main()
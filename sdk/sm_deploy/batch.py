@@ -4,10 +4,16 @@
 # 批量推理作业创建和管理
 # =============================================================================
 
-import boto3
+import heapq
+import json
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, wait as futures_wait
 from datetime import datetime
-from typing import Optional, List, Dict, Any
+from typing import List, Dict, Any, Tuple
 from .config import get_config, DeployConfig
+from .clients import get_client, call_with_backoff, split_s3_uri
+from .poller import get_poller, StatusPoller, TRANSFORM_JOB
 
 
 def create_batch_transform(
@@ -23,6 +29,9 @@ def create_batch_transform(
     strategy: str = "MultiRecord",
     max_payload_mb: int = 6,
     wait: bool = True,
+    max_concurrent_transforms: int = None,
+    auto_tune: bool = False,
+    tune_predict=None,
 ) -> str:
     """
     创建批量推理作业
@@ -40,6 +49,10 @@ def create_batch_transform(
         strategy: 处理策略 (SingleRecord, MultiRecord)
         max_payload_mb: 最大 payload 大小 (MB)
         wait: 是否等待完成
+        max_concurrent_transforms: 每个实例的并发请求数（默认由 SageMaker 决定）
+        auto_tune: 采样输入自动选择 strategy / max_payload_mb / max_concurrent_transforms
+            （覆盖传入值），并把选择结果写入 Job Tags；完成后追加实测吞吐 Tag
+        tune_predict: 本地推理函数 (body, content_type) -> bytes，auto_tune 时用于实测候选组合
 
     Returns:
         Transform Job 名称
@@ -50,11 +63,36 @@ def create_batch_transform(
             model_name="sklearn-v1",
             input_s3_uri="s3://bucket/input/data.csv"
         )
+
+        # 自动调优
+        job = create_batch_transform(
+            job_name="batch-20240101",
+            model_name="sklearn-v1",
+            input_s3_uri="s3://bucket/input/",
+            instance_type="ml.c5.2xlarge",
+            auto_tune=True,
+        )
     """
     if config is None:
         config = get_config()
 
-    sm = boto3.client("sagemaker", region_name=config.region)
+    tuning = None
+    if auto_tune:
+        from .batch_tuning import tune_batch_transform
+
+        tuning = tune_batch_transform(
+            input_s3_uri,
+            instance_type=instance_type,
+            split_type=split_type,
+            content_type=content_type,
+            predict=tune_predict,
+            config=config,
+        )
+        strategy = tuning["strategy"]
+        max_payload_mb = tuning["max_payload_mb"]
+        max_concurrent_transforms = tuning["max_concurrent_transforms"]
+
+    sm = get_client("sagemaker", config.region)
     prefix = config.get_model_name_prefix()
 
     # 生成完整名称
@@ -68,56 +106,417 @@ def create_batch_transform(
 
     # 创建 Transform Job
     sm.create_transform_job(
-        TransformJobName=full_job_name,
-        ModelName=full_model_name,
-        TransformInput={
+        **_transform_job_params(
+            config=config,
+            full_job_name=full_job_name,
+            full_model_name=full_model_name,
+            input_s3_uri=input_s3_uri,
+            output_s3_uri=output_s3_uri,
+            instance_type=instance_type,
+            instance_count=instance_count,
+            content_type=content_type,
+            split_type=split_type,
+            strategy=strategy,
+            max_payload_mb=max_payload_mb,
+            max_concurrent_transforms=max_concurrent_transforms,
+            tuning=tuning,
+        )
+    )
+
+    print(f"✅ Transform job created: {full_job_name}")
+    print(f"   Input:  {input_s3_uri}")
+    print(f"   Output: {output_s3_uri}")
+
+    if wait:
+        print("⏳ Waiting for transform job to complete...")
+        job_info = get_poller(config).wait_transform_job(full_job_name, timeout=3600)
+
+        # 检查最终状态
+        status = job_info["status"]
+
+        if status == "Completed":
+            print(f"✅ Transform job completed: {full_job_name}")
+            print(f"   Output: {output_s3_uri}")
+            if tuning is not None:
+                # 尽力而为: 打标签失败（权限 / 限流）不影响已完成的 Job
+                try:
+                    _tag_measured_throughput(sm, full_job_name, tuning)
+                except Exception as e:
+                    print(f"⚠️  Failed to tag measured throughput: {e}")
+        else:
+            print(f"❌ Transform job failed: {status}")
+            if job_info["failure_reason"]:
+                print(f"   Reason: {job_info['failure_reason']}")
+
+    return full_job_name
+
+
+def _transform_job_params(
+    config: DeployConfig,
+    full_job_name: str,
+    full_model_name: str,
+    input_s3_uri: str,
+    output_s3_uri: str,
+    instance_type: str,
+    instance_count: int,
+    content_type: str,
+    split_type: str,
+    strategy: str,
+    max_payload_mb: int,
+    s3_data_type: str = "S3Prefix",
+    max_concurrent_transforms: int = None,
+    tuning: Dict[str, Any] = None,
+) -> Dict[str, Any]:
+    """构建 CreateTransformJob 参数"""
+    tags = config.get_default_tags()
+    if tuning is not None:
+        from .batch_tuning import tuning_tags
+
+        tags += tuning_tags(tuning)
+
+    params = {
+        "TransformJobName": full_job_name,
+        "ModelName": full_model_name,
+        "TransformInput": {
             "DataSource": {
                 "S3DataSource": {
-                    "S3DataType": "S3Prefix",
+                    "S3DataType": s3_data_type,
                     "S3Uri": input_s3_uri,
                 }
             },
             "ContentType": content_type,
             "SplitType": split_type,
         },
-        TransformOutput={
+        "TransformOutput": {
             "S3OutputPath": output_s3_uri,
             "AssembleWith": "Line",
         },
-        TransformResources={
+        "TransformResources": {
             "InstanceType": instance_type,
             "InstanceCount": instance_count,
         },
-        BatchStrategy=strategy,
-        MaxPayloadInMB=max_payload_mb,
-        Tags=config.get_default_tags(),
+        "BatchStrategy": strategy,
+        "MaxPayloadInMB": max_payload_mb,
+        "Tags": tags,
+    }
+    if max_concurrent_transforms:
+        params["MaxConcurrentTransforms"] = max_concurrent_transforms
+    return params
+
+
+def _tag_measured_throughput(sm, full_job_name: str, tuning: Dict[str, Any]):
+    """按 Job 实际运行时间和估算记录数，把实测吞吐写入 Job Tags"""
+    job = sm.describe_transform_job(TransformJobName=full_job_name)
+    start, end = job.get("TransformStartTime"), job.get("TransformEndTime")
+    if not start or not end or end <= start:
+        return
+
+    records_per_second = tuning["estimated_records"] / (end - start).total_seconds()
+    sm.add_tags(
+        ResourceArn=job["TransformJobArn"],
+        Tags=[{"Key": "MeasuredRecordsPerSecond", "Value": f"{records_per_second:.0f}"}],
     )
+    print(f"   Throughput: ~{records_per_second:,.0f} records/s")
 
-    print(f"✅ Transform job created: {full_job_name}")
-    print(f"   Input:  {input_s3_uri}")
-    print(f"   Output: {output_s3_uri}")
 
-    if wait:
-        print("⏳ Waiting for transform job to complete...")
-        waiter = sm.get_waiter("transform_job_completed_or_stopped")
-        waiter.wait(
-            TransformJobName=full_job_name,
-            WaiterConfig={"Delay": 30, "MaxAttempts": 120},
+# =============================================================================
+# 分片并行 Batch Transform
+# =============================================================================
+
+
+def _list_input_objects(s3, input_s3_uri: str) -> List[Tuple[str, int]]:
+    """列出输入前缀下的所有对象 [(key, size)]"""
+    bucket, prefix = split_s3_uri(input_s3_uri)
+    objects = []
+    for page in s3.get_paginator("list_objects_v2").paginate(Bucket=bucket, Prefix=prefix):
+        for obj in page.get("Contents", []):
+            if not obj["Key"].endswith("/") and obj["Size"] > 0:
+                objects.append((obj["Key"], obj["Size"]))
+    return objects
+
+
+def partition_objects(objects: List[Tuple[str, int]], num_shards: int) -> List[List[Tuple[str, int]]]:
+    """
+    按大小均衡分片（最大优先 + 放入当前最小分片）
+
+    Args:
+        objects: [(key, size)]
+        num_shards: 分片数
+
+    Returns:
+        分片列表（空分片被丢弃）
+    """
+    heap = [(0, i) for i in range(num_shards)]
+    shards: List[List[Tuple[str, int]]] = [[] for _ in range(num_shards)]
+
+    for key, size in sorted(objects, key=lambda o: o[1], reverse=True):
+        total, index = heapq.heappop(heap)
+        shards[index].append((key, size))
+        heapq.heappush(heap, (total + size, index))
+
+    return [sorted(shard) for shard in shards if shard]
+
+
+def run_sharded_batch_transform(
+    job_name: str,
+    model_name: str,
+    input_s3_uri: str,
+    output_s3_uri: str = None,
+    num_shards: int = None,
+    target_shard_mb: int = 2048,
+    max_concurrent_jobs: int = 4,
+    max_retries: int = 2,
+    retry_backoff: float = 30.0,
+    instance_type: str = "ml.m5.large",
+    instance_count: int = 1,
+    config: DeployConfig = None,
+    content_type: str = "text/csv",
+    split_type: str = "Line",
+    strategy: str = "MultiRecord",
+    max_payload_mb: int = 6,
+    timeout: float = 6 * 3600,
+    s3_client=None,
+    sm_client=None,
+    stop_on_timeout: bool = True,
+    poller: StatusPoller = None,
+) -> Dict[str, Any]:
+    """
+    分片并行执行 Batch Transform
+
+    列出输入前缀下的对象，按大小均衡分成多个分片（每个分片一个 Manifest 文件），
+    在并发预算内同时运行多个 Transform Job，只重试失败的分片，最后写出汇总清单
+    {output}/_COMPLETION.json。
+
+    Args:
+        job_name: 作业名称（不含项目前缀）
+        model_name: 模型名称
+        input_s3_uri: 输入 S3 前缀
+        output_s3_uri: 输出 S3 前缀（默认自动生成，每个分片写入 shard-NNN/ 子目录）
+        num_shards: 分片数（默认按 target_shard_mb 计算）
+        target_shard_mb: 每个分片的目标大小 (MB)
+        max_concurrent_jobs: 同时运行的 Transform Job 上限
+        max_retries: 每个分片的最大重试次数
+        retry_backoff: 分片首次重试前的等待（秒），之后每次翻倍（避免创建失败时立即连续重试）
+        instance_type: 实例类型
+        instance_count: 每个 Job 的实例数量
+        config: 部署配置
+        content_type: 输入数据类型
+        split_type: 分割方式
+        strategy: 处理策略
+        max_payload_mb: 最大 payload 大小 (MB)
+        timeout: 整体超时（秒）
+        s3_client: S3 Client（默认共享 Client，测试时可传入本地替身）
+        sm_client: SageMaker Client（默认共享 Client）
+        stop_on_timeout: 整体超时时停止仍在运行的 Transform Job（False 时保持运行，状态记为 Timeout）
+        poller: 状态轮询器（默认: 传入 sm_client 时新建私有 Poller，否则使用共享 Poller）
+
+    Returns:
+        汇总清单 (dict)，同时写入 {output}/_COMPLETION.json
+
+    Example:
+        report = run_sharded_batch_transform(
+            job_name="nightly-scoring",
+            model_name="sklearn-v1",
+            input_s3_uri="s3://bucket/input/2024-01-01/",
+            max_concurrent_jobs=8,
         )
+        print(report["status"], [s["status"] for s in report["shards"]])
+    """
+    if config is None:
+        config = get_config()
 
-        # 检查最终状态
-        job_info = sm.describe_transform_job(TransformJobName=full_job_name)
-        status = job_info["TransformJobStatus"]
+    s3 = s3_client or get_client("s3", config.region)
+    sm = sm_client or get_client("sagemaker", config.region)
+    own_poller = poller is None and sm_client is not None
+    if poller is None:
+        poller = StatusPoller(config, sm_client=sm) if own_poller else get_poller(config)
+    prefix = config.get_model_name_prefix()
 
-        if status == "Completed":
-            print(f"✅ Transform job completed: {full_job_name}")
-            print(f"   Output: {output_s3_uri}")
-        else:
-            print(f"❌ Transform job failed: {status}")
-            if "FailureReason" in job_info:
-                print(f"   Reason: {job_info['FailureReason']}")
+    timestamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+    full_model_name = model_name if model_name.startswith(prefix) else f"{prefix}-{model_name}"
+    if output_s3_uri is None:
+        output_s3_uri = f"s3://{config.bucket}/batch-transform/{job_name}/{timestamp}/"
+    output_s3_uri = output_s3_uri.rstrip("/") + "/"
 
-    return full_job_name
+    try:
+        # 1. 列出输入并分片
+        objects = _list_input_objects(s3, input_s3_uri)
+        if not objects:
+            raise ValueError(f"No input objects found under {input_s3_uri}")
+
+        total_bytes = sum(size for _, size in objects)
+        if num_shards is None:
+            num_shards = max(1, -(-total_bytes // (target_shard_mb * 1024 * 1024)))
+        shards = partition_objects(objects, min(num_shards, len(objects)))
+
+        # 2. 写 Manifest 文件
+        input_bucket, _ = split_s3_uri(input_s3_uri)
+        output_bucket, output_key = split_s3_uri(output_s3_uri)
+        shard_states = []
+        for index, shard in enumerate(shards):
+            manifest_key = f"{output_key}_manifests/shard-{index:03d}.manifest"
+            manifest = [{"prefix": f"s3://{input_bucket}/"}] + [key for key, _ in shard]
+            s3.put_object(Bucket=output_bucket, Key=manifest_key, Body=json.dumps(manifest).encode("utf-8"))
+            shard_states.append(
+                {
+                    "shard": index,
+                    "objects": len(shard),
+                    "bytes": sum(size for _, size in shard),
+                    "manifest_s3_uri": f"s3://{output_bucket}/{manifest_key}",
+                    "output_s3_uri": f"{output_s3_uri}shard-{index:03d}/",
+                    "job_name": None,
+                    "attempts": 0,
+                    "status": "Pending",
+                    "failure_reason": None,
+                }
+            )
+
+        print(f"✅ Sharded transform: {len(objects)} objects, {total_bytes / 1024 / 1024:.1f} MB, {len(shards)} shards")
+
+        # 3. 在并发预算内运行，失败分片重试
+        pending = deque(range(len(shard_states)))
+        running: Dict[Any, int] = {}
+        retry_at: Dict[int, float] = {}
+        deadline = time.monotonic() + timeout
+
+        def _launch(index: int):
+            state = shard_states[index]
+            state["attempts"] += 1
+            suffix = f"-s{index:03d}" + (f"-r{state['attempts'] - 1}" if state["attempts"] > 1 else "")
+            state["job_name"] = f"{prefix}-{job_name}-{timestamp}{suffix}"
+            state["status"] = "InProgress"
+            try:
+                call_with_backoff(
+                    sm.create_transform_job,
+                    **_transform_job_params(
+                        config=config,
+                        full_job_name=state["job_name"],
+                        full_model_name=full_model_name,
+                        input_s3_uri=state["manifest_s3_uri"],
+                        output_s3_uri=state["output_s3_uri"],
+                        instance_type=instance_type,
+                        instance_count=instance_count,
+                        content_type=content_type,
+                        split_type=split_type,
+                        strategy=strategy,
+                        max_payload_mb=max_payload_mb,
+                        s3_data_type="ManifestFile",
+                    ),
+                )
+            except Exception as e:
+                _on_failure(index, str(e))
+                return
+            print(f"✅ Transform job created: {state['job_name']} ({state['objects']} objects)")
+            running[poller.track_transform_job(state["job_name"])] = index
+
+        def _on_failure(index: int, reason: str):
+            state = shard_states[index]
+            state["status"] = "Failed"
+            state["failure_reason"] = reason
+            if state["attempts"] <= max_retries:
+                delay = retry_backoff * 2 ** (state["attempts"] - 1)
+                print(f"⚠️  Shard {index} failed, retrying in {delay:.0f}s: {reason}")
+                retry_at[index] = time.monotonic() + delay
+                pending.append(index)
+            else:
+                print(f"❌ Shard {index} failed after {state['attempts']} attempts: {reason}")
+
+        def _on_timeout():
+            """整体超时: 停止（或放弃等待）运行中的分片，未启动的分片记为 Timeout"""
+            for index in running.values():
+                state = shard_states[index]
+                poller.untrack(TRANSFORM_JOB, state["job_name"])
+                state["status"] = "Timeout"
+                state["failure_reason"] = f"Timed out after {timeout}s"
+                if not stop_on_timeout:
+                    continue
+                try:
+                    call_with_backoff(sm.stop_transform_job, TransformJobName=state["job_name"])
+                    state["status"] = "Stopped"
+                    print(f"⚠️  Shard {index} timed out, transform job stopped: {state['job_name']}")
+                except Exception as e:
+                    print(f"⚠️  Failed to stop transform job {state['job_name']}: {e}")
+            for index in pending:
+                state = shard_states[index]
+                state["status"] = "Timeout"
+                if state["failure_reason"]:
+                    state["failure_reason"] = f"Timed out before retry: {state['failure_reason']}"
+                else:
+                    state["failure_reason"] = "Timed out before launch"
+            running.clear()
+            pending.clear()
+
+        def _pop_ready():
+            """取出一个已过重试等待时间的分片"""
+            now = time.monotonic()
+            for index in pending:
+                if retry_at.get(index, 0) <= now:
+                    pending.remove(index)
+                    return index
+            return None
+
+        while pending or running:
+            while len(running) < max_concurrent_jobs:
+                index = _pop_ready()
+                if index is None:
+                    break
+                _launch(index)
+            if not pending and not running:
+                break
+
+            # 等到有分片结束、下一个重试到期或整体超时
+            wake_at = deadline
+            if pending and len(running) < max_concurrent_jobs:
+                wake_at = min(wake_at, min(retry_at.get(index, 0) for index in pending))
+            wait_seconds = max(0, wake_at - time.monotonic())
+            if running:
+                done, _ = futures_wait(list(running), timeout=wait_seconds, return_when=FIRST_COMPLETED)
+            else:
+                time.sleep(wait_seconds)
+                done = set()
+            if not done and time.monotonic() >= deadline:
+                _on_timeout()
+                break
+
+            for future in done:
+                index = running.pop(future)
+                if future.exception() is not None:
+                    _on_failure(index, str(future.exception()))
+                elif future.result()["status"] == "Completed":
+                    shard_states[index]["status"] = "Completed"
+                    shard_states[index]["failure_reason"] = None
+                    print(f"✅ Shard {index} completed: {shard_states[index]['job_name']}")
+                else:
+                    _on_failure(index, future.result()["failure_reason"] or future.result()["status"])
+    finally:
+        # 私有 Poller 的线程在任何异常下都要停止
+        if own_poller:
+            poller.stop()
+
+    # 4. 汇总清单
+    completed = sum(1 for s in shard_states if s["status"] == "Completed")
+    report = {
+        "job_name": job_name,
+        "model_name": full_model_name,
+        "input_s3_uri": input_s3_uri,
+        "output_s3_uri": output_s3_uri,
+        "status": "Completed" if completed == len(shard_states) else "PartiallyFailed",
+        "completed_shards": completed,
+        "total_shards": len(shard_states),
+        "total_objects": len(objects),
+        "total_bytes": total_bytes,
+        "shards": shard_states,
+    }
+    s3.put_object(
+        Bucket=output_bucket,
+        Key=f"{output_key}_COMPLETION.json",
+        Body=json.dumps(report, indent=2).encode("utf-8"),
+    )
+
+    print(f"{'✅' if completed == len(shard_states) else '❌'} Sharded transform {report['status']}: "
+          f"{completed}/{len(shard_states)} shards")
+    print(f"   Output: {output_s3_uri}")
+    return report
 
 
 def describe_transform_job(job_name: str, config: DeployConfig = None) -> Dict[str, Any]:
@@ -134,7 +533,7 @@ def describe_transform_job(job_name: str, config: DeployConfig = None) -> Dict[s
     if config is None:
         config = get_config()
 
-    sm = boto3.client("sagemaker", region_name=config.region)
+    sm = get_client("sagemaker", config.region)
 
     return sm.describe_transform_job(TransformJobName=job_name)
 
@@ -153,7 +552,7 @@ def stop_transform_job(job_name: str, config: DeployConfig = None) -> bool:
     if config is None:
         config = get_config()
 
-    sm = boto3.client("sagemaker", region_name=config.region)
+    sm = get_client("sagemaker", config.region)
 
     try:
         sm.stop_transform_job(TransformJobName=job_name)
@@ -178,7 +577,7 @@ def list_transform_jobs(config: DeployConfig = None, max_results: int = 20) -> L
     if config is None:
         config = get_config()
 
-    sm = boto3.client("sagemaker", region_name=config.region)
+    sm = get_client("sagemaker", config.region)
     prefix = config.get_model_name_prefix()
 
     response = sm.list_transform_jobs(
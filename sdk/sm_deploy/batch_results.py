@@ -0,0 +1,324 @@
+# =============================================================================
+# batch_results.py - Batch Transform 结果流式读取
+# =============================================================================
+# 按 Range GET 分块下载输出前缀下的 .out 文件，逐行解析，内存占用有界:
+#   - 预取: 后续分块（可跨对象）在线程池中并行下载，最多 prefetch 个在途
+#   - 关联输入: 同时流式读取对应输入文件，按行与预测结果一一配对
+#   - 输出形式: 逐条记录，或每 chunk_rows 条一个 NumPy 数组 / Arrow Table
+#
+# 要求 SplitType=Line 且 AssembleWith=Line（每条输入记录对应一行输出）。
+# =============================================================================
+
+import csv
+import json
+import re
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from .config import get_config, DeployConfig
+from .clients import get_client, split_s3_uri
+
+MB = 1024 * 1024
+
+# run_sharded_batch_transform 的分片输出目录（Manifest 前缀为 Bucket 根目录）
+_SHARD_DIR = re.compile(r"^shard-\d+/")
+
+
+# =============================================================================
+# 解析
+# =============================================================================
+
+
+def _parse_csv(line: str) -> List[str]:
+    return next(csv.reader([line]))
+
+
+_PARSERS: Dict[str, Callable[[str], Any]] = {
+    "text/csv": _parse_csv,
+    "application/json": json.loads,
+    "application/jsonlines": json.loads,
+}
+
+
+def _get_parser(accept: Optional[str]) -> Callable[[str], Any]:
+    """按 accept 选择逐行解析函数（未知类型返回原始文本）"""
+    if accept is None:
+        return str
+    return _PARSERS.get(accept.split(";", 1)[0].strip().lower(), str)
+
+
+# =============================================================================
+# 分块下载
+# =============================================================================
+
+
+def _list_objects(s3, bucket: str, prefix: str) -> List[Tuple[str, int]]:
+    objects = []
+    for page in s3.get_paginator("list_objects_v2").paginate(Bucket=bucket, Prefix=prefix):
+        for obj in page.get("Contents", []):
+            if not obj["Key"].endswith("/"):
+                objects.append((obj["Key"], obj["Size"]))
+    return sorted(objects)
+
+
+def _iter_chunks(
+    s3,
+    bucket: str,
+    objects: List[Tuple[str, int]],
+    executor: ThreadPoolExecutor,
+    chunk_size: int,
+    prefetch: int,
+) -> Iterator[Tuple[str, bytes, bool]]:
+    """
+    按顺序产出 (key, chunk, is_last)
+
+    所有对象的 Range 依次排队，最多 prefetch 个请求在途，下一个对象的首块
+    会在当前对象读完之前开始下载。
+    """
+    def ranges():
+        for key, size in objects:
+            if size == 0:
+                yield key, None, True
+                continue
+            for start in range(0, size, chunk_size):
+                end = min(start + chunk_size, size) - 1
+                yield key, f"bytes={start}-{end}", end == size - 1
+
+    def fetch(key: str, byte_range: Optional[str]) -> bytes:
+        if byte_range is None:
+            return b""
+        return s3.get_object(Bucket=bucket, Key=key, Range=byte_range)["Body"].read()
+
+    pending = ranges()
+    in_flight = deque()
+    for key, byte_range, last in pending:
+        in_flight.append((key, executor.submit(fetch, key, byte_range), last))
+        if len(in_flight) >= prefetch:
+            break
+
+    while in_flight:
+        key, future, last = in_flight.popleft()
+        for next_key, byte_range, next_last in pending:
+            in_flight.append((next_key, executor.submit(fetch, next_key, byte_range), next_last))
+            break
+        yield key, future.result(), last
+
+
+def _iter_lines(chunks: Iterator[Tuple[str, bytes, bool]]) -> Iterator[bytes]:
+    """把分块拼回行；空行丢弃（与 SplitType=Line 一致）"""
+    carry = b""
+    for _, chunk, last in chunks:
+        lines = (carry + chunk).split(b"\n")
+        carry = lines.pop()
+        if last:
+            lines.append(carry)
+            carry = b""
+        for line in lines:
+            line = line.rstrip(b"\r")
+            if line.strip():
+                yield line
+
+
+# =============================================================================
+# 公共 API
+# =============================================================================
+
+
+def _output_to_input_key(relative: str, input_key_prefix: str, sharded: bool) -> str:
+    """输出相对路径 -> 输入对象 Key（去掉 .out 后缀；分片输出再去掉分片目录）"""
+    relative = relative[: -len(".out")]
+    if sharded and _SHARD_DIR.match(relative):
+        return _SHARD_DIR.sub("", relative, count=1)
+    return input_key_prefix + relative
+
+
+def iter_transform_results(
+    output_s3_uri: str,
+    input_s3_uri: str = None,
+    accept: str = "text/csv",
+    as_format: str = None,
+    chunk_rows: int = 10000,
+    chunk_size: int = 8 * MB,
+    prefetch: int = 4,
+    parse: Callable[[str], Any] = None,
+    sharded: bool = None,
+    config: DeployConfig = None,
+    s3_client=None,
+) -> Iterator[Any]:
+    """
+    流式读取 Batch Transform 输出
+
+    Args:
+        output_s3_uri: Transform 输出前缀（run_sharded_batch_transform 的输出前缀也可以）
+        input_s3_uri: 输入前缀或对象；传入时与输入记录逐行配对
+        accept: 输出格式，决定逐行解析方式（text/csv、application/json、application/jsonlines）
+        as_format: None 逐条产出；"numpy" / "arrow" 每 chunk_rows 条产出一块
+        chunk_rows: 每块行数（as_format 非 None 时）
+        chunk_size: 每个 Range GET 的字节数
+        prefetch: 并行预取的分块数（内存上限约 (prefetch + 1) × chunk_size）
+        parse: 自定义逐行解析函数 str -> Any（覆盖 accept）
+        sharded: 是否为 run_sharded_batch_transform 的输出（shard-NNN/ 下的相对路径为输入的完整 Key）；
+            默认按输出前缀下是否有 _COMPLETION.json 判断
+        config: 部署配置
+        s3_client: S3 Client（默认共享 Client，测试时可传入本地替身）
+
+    Yields:
+        as_format=None: 预测结果；传入 input_s3_uri 时为 (输入行, 预测结果)
+        as_format="numpy": float ndarray（预测须为数值）；配对时为 (输入行列表, ndarray)
+        as_format="arrow": pyarrow.Table，列为 prediction（配对时另有 input 列）
+
+    Example:
+        for row, prediction in iter_transform_results(
+            "s3://bucket/batch-transform/eval/20240101/",
+            input_s3_uri="s3://bucket/input/",
+        ):
+            ...
+
+        for scores in iter_transform_results(output_uri, as_format="numpy", chunk_rows=50000):
+            total += scores.sum()
+    """
+    if as_format not in (None, "numpy", "arrow"):
+        raise ValueError(f"Unsupported as_format: {as_format}")
+
+    if s3_client is None:
+        if config is None:
+            config = get_config()
+        s3_client = get_client("s3", config.region)
+    s3 = s3_client
+    parse = parse or _get_parser(accept)
+
+    output_bucket, output_prefix = split_s3_uri(output_s3_uri)
+    if output_prefix and not output_prefix.endswith("/"):
+        output_prefix += "/"
+    objects = _list_objects(s3, output_bucket, output_prefix)
+    outputs = [(key, size) for key, size in objects if key.endswith(".out")]
+    if not outputs:
+        raise ValueError(f"No .out objects found under {output_s3_uri}")
+    if sharded is None:
+        sharded = any(key == f"{output_prefix}_COMPLETION.json" for key, _ in objects)
+
+    with ThreadPoolExecutor(max(1, prefetch)) as executor:
+        predictions = (
+            parse(line.decode("utf-8"))
+            for line in _iter_lines(_iter_chunks(s3, output_bucket, outputs, executor, chunk_size, prefetch))
+        )
+
+        if input_s3_uri is None:
+            records = predictions
+        else:
+            input_bucket, input_key = split_s3_uri(input_s3_uri)
+            input_key_prefix = input_key[: input_key.rfind("/") + 1]
+            sources = [
+                _output_to_input_key(key[len(output_prefix):], input_key_prefix, sharded) for key, _ in outputs
+            ]
+            sizes = executor.map(lambda key: s3.head_object(Bucket=input_bucket, Key=key)["ContentLength"], sources)
+            inputs = list(zip(sources, sizes))
+            input_lines = (
+                line.decode("utf-8")
+                for line in _iter_lines(_iter_chunks(s3, input_bucket, inputs, executor, chunk_size, prefetch))
+            )
+            records = _zip_strict(input_lines, predictions)
+
+        if as_format is None:
+            yield from records
+        else:
+            for rows in _batched(records, chunk_rows):
+                yield _to_format(rows, as_format, joined=input_s3_uri is not None)
+
+
+def _zip_strict(inputs: Iterator[str], predictions: Iterator[Any]) -> Iterator[Tuple[str, Any]]:
+    """逐行配对；行数不一致说明 AssembleWith 不是 Line 或输出不完整"""
+    sentinel = object()
+    count = 0
+    while True:
+        row = next(inputs, sentinel)
+        prediction = next(predictions, sentinel)
+        if row is sentinel and prediction is sentinel:
+            return
+        if row is sentinel or prediction is sentinel:
+            raise ValueError(
+                f"Input and output record counts differ after {count} records; "
+                "joining requires SplitType=Line and AssembleWith=Line"
+            )
+        count += 1
+        yield row, prediction
+
+
+def _batched(records: Iterator[Any], size: int) -> Iterator[List[Any]]:
+    batch = []
+    for record in records:
+        batch.append(record)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _to_format(rows: List[Any], as_format: str, joined: bool) -> Any:
+    inputs, predictions = (list(c) for c in zip(*rows)) if joined else (None, rows)
+
+    if as_format == "numpy":
+        import numpy as np
+
+        array = np.asarray(predictions, dtype=float)
+        return (inputs, array) if joined else array
+
+    import pyarrow as pa
+
+    columns = {"prediction": predictions}
+    if joined:
+        columns = {"input": inputs, **columns}
+    return pa.table(columns)
+
+
+def iter_transform_job_results(
+    job_name: str,
+    join_input: bool = True,
+    config: DeployConfig = None,
+    sm_client=None,
+    **kwargs,
+) -> Iterator[Any]:
+    """
+    按 Transform Job 名称流式读取结果（输出路径、输入路径和 Accept 取自 Job 详情）
+
+    Args:
+        job_name: 完整作业名称（create_batch_transform 的返回值）
+        join_input: 是否与输入记录配对（Manifest 输入按 Manifest 中的 prefix 定位输入对象）
+        config: 部署配置
+        sm_client: SageMaker Client（默认共享 Client）
+        **kwargs: 传给 iter_transform_results
+
+    Example:
+        job = create_batch_transform(...)
+        for row, prediction in iter_transform_job_results(job):
+            ...
+    """
+    if config is None:
+        config = get_config()
+
+    sm = sm_client or get_client("sagemaker", config.region)
+    job = sm.describe_transform_job(TransformJobName=job_name)
+    output = job["TransformOutput"]
+    data_source = job["TransformInput"]["DataSource"]["S3DataSource"]
+
+    input_s3_uri = None
+    if join_input:
+        input_s3_uri = data_source["S3Uri"]
+        if data_source.get("S3DataType") == "ManifestFile":
+            # 输出按 Manifest 中相对 prefix 的路径命名；Manifest 本身可能在另一个 Bucket
+            s3 = kwargs.get("s3_client") or get_client("s3", config.region)
+            bucket, key = split_s3_uri(input_s3_uri)
+            manifest = json.loads(s3.get_object(Bucket=bucket, Key=key)["Body"].read())
+            if not manifest or not isinstance(manifest[0], dict) or "prefix" not in manifest[0]:
+                raise ValueError(f"Manifest without a prefix entry: {input_s3_uri}")
+            input_s3_uri = manifest[0]["prefix"]
+
+    kwargs.setdefault("accept", output.get("Accept", "text/csv"))
+    return iter_transform_results(
+        output["S3OutputPath"],
+        input_s3_uri=input_s3_uri,
+        config=config,
+        **kwargs,
+    )
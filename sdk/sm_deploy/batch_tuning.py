@@ -0,0 +1,280 @@
+# =============================================================================
+# batch_tuning.py - Batch Transform 参数自动调优
+# =============================================================================
+# 采样输入前缀，统计记录大小分布，为指定实例类型选择:
+#   - MaxPayloadInMB: 不小于最大记录，单请求装下足够多记录以摊薄请求开销
+#   - MaxConcurrentTransforms: 实例 vCPU 数（受 并发 × Payload <= 100 MB 限制）
+#   - BatchStrategy: 小记录用 MultiRecord，大记录/不切分用 SingleRecord
+# 传入本地推理函数时，在采样数据上实测各候选组合的吞吐，选最快的一组。
+# =============================================================================
+
+import math
+import re
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+
+from .config import get_config, DeployConfig
+from .clients import get_client, split_s3_uri
+from .local_batch import (
+    Predict,
+    _RECORDIO_LENGTH_MASK,
+    _call_predict,
+    pack_batches,
+    split_records,
+)
+
+MB = 1024 * 1024
+
+# SageMaker 限制: MaxConcurrentTransforms × MaxPayloadInMB <= 100
+MAX_TOTAL_PAYLOAD_MB = 100
+
+# 每个请求的目标记录数（MultiRecord 时用来估算 Payload 大小）
+TARGET_RECORDS_PER_REQUEST = 1000
+
+_CANDIDATE_PAYLOADS_MB = (1, 2, 4, 6, 12, 25, 50, 100)
+
+_INSTANCE_SIZE_VCPUS = {"medium": 1, "large": 2, "xlarge": 4}
+
+
+def instance_vcpus(instance_type: str) -> int:
+    """
+    按实例规格估算 vCPU 数
+
+    ml.m5.large -> 2, ml.c5.xlarge -> 4, ml.m5.12xlarge -> 48
+    """
+    size = instance_type.rsplit(".", 1)[-1]
+    if size in _INSTANCE_SIZE_VCPUS:
+        return _INSTANCE_SIZE_VCPUS[size]
+    match = re.fullmatch(r"(\d+)xlarge", size)
+    if match:
+        return int(match.group(1)) * 4
+    return 1
+
+
+def _complete_prefix(data: bytes, split_type: str) -> bytes:
+    """截掉 Range GET 末尾不完整的记录"""
+    if split_type == "Line":
+        end = data.rfind(b"\n")
+        return data[: end + 1] if end >= 0 else b""
+
+    # RecordIO: 沿记录头走到最后一个完整记录
+    offset = 0
+    while offset + 8 <= len(data):
+        length = int.from_bytes(data[offset + 4: offset + 8], "little") & _RECORDIO_LENGTH_MASK
+        record_end = offset + 8 + length + (-length % 4)
+        if record_end > len(data):
+            break
+        offset = record_end
+    return data[:offset]
+
+
+def sample_records(
+    input_s3_uri: str,
+    split_type: str = "Line",
+    sample_objects: int = 8,
+    sample_bytes: int = 4 * MB,
+    s3_client=None,
+    region: str = None,
+) -> Dict[str, Any]:
+    """
+    采样输入前缀的记录
+
+    每个对象只用 Range GET 读取前 sample_bytes 字节。
+
+    Returns:
+        {"records": [...], "sizes": [...], "total_bytes": ..., "total_objects": ..., "max_object_bytes": ...}
+
+        split_type=None 时不读取内容，records 为空，sizes 为对象大小。
+    """
+    s3 = s3_client or get_client("s3", region)
+    bucket, prefix = split_s3_uri(input_s3_uri)
+
+    objects = []
+    for page in s3.get_paginator("list_objects_v2").paginate(Bucket=bucket, Prefix=prefix):
+        for obj in page.get("Contents", []):
+            if not obj["Key"].endswith("/") and obj["Size"] > 0:
+                objects.append((obj["Key"], obj["Size"]))
+    if not objects:
+        raise ValueError(f"No input objects found under {input_s3_uri}")
+
+    # 均匀抽取对象
+    step = max(1, len(objects) // sample_objects)
+    sampled = objects[::step][:sample_objects]
+
+    records: List[bytes] = []
+    sizes: List[int] = []
+    for key, size in sampled:
+        if split_type in (None, "None"):
+            # 不切分: 整个对象就是一条记录，只需要大小
+            sizes.append(size)
+            continue
+        body = s3.get_object(Bucket=bucket, Key=key, Range=f"bytes=0-{sample_bytes - 1}")["Body"].read()
+        if size > len(body):
+            body = _complete_prefix(body, split_type)
+        chunk = split_records(body, split_type)
+        records.extend(chunk)
+        sizes.extend(len(r) for r in chunk)
+
+    return {
+        "records": records,
+        "sizes": sizes,
+        "total_bytes": sum(size for _, size in objects),
+        "total_objects": len(objects),
+        "max_object_bytes": max(size for _, size in objects),
+    }
+
+
+def _percentile(sorted_values: List[int], q: float) -> int:
+    index = min(len(sorted_values) - 1, int(math.ceil(q * len(sorted_values))) - 1)
+    return sorted_values[max(0, index)]
+
+
+def _measure(
+    predict: Predict,
+    records: List[bytes],
+    strategy: str,
+    payload_mb: int,
+    concurrency: int,
+    content_type: str,
+) -> float:
+    """在采样记录上实测吞吐 (records/s)"""
+    batches = pack_batches(records, strategy, payload_mb * MB)
+
+    def invoke(body):
+        return _call_predict(predict, body, content_type)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(concurrency) as executor:
+        list(executor.map(invoke, batches))
+    elapsed = time.perf_counter() - start
+    return len(records) / elapsed if elapsed > 0 else float("inf")
+
+
+def tune_batch_transform(
+    input_s3_uri: str,
+    instance_type: str = "ml.m5.large",
+    split_type: str = "Line",
+    content_type: str = "text/csv",
+    predict: Optional[Predict] = None,
+    sample_objects: int = 8,
+    sample_bytes: int = 4 * MB,
+    config: DeployConfig = None,
+    s3_client=None,
+) -> Dict[str, Any]:
+    """
+    为 Batch Transform 选择 MaxPayloadInMB / MaxConcurrentTransforms / BatchStrategy
+
+    Args:
+        input_s3_uri: 输入 S3 前缀
+        instance_type: Transform 实例类型
+        split_type: Line / RecordIO / None
+        content_type: 输入数据类型（实测时传给 predict）
+        predict: 本地推理函数 (body, content_type) -> bytes；传入时实测候选组合的吞吐
+        sample_objects: 采样对象数
+        sample_bytes: 每个对象读取的字节数
+        config: 部署配置
+        s3_client: S3 Client（可传入本地 S3 替身）
+
+    Returns:
+        {"strategy", "max_payload_mb", "max_concurrent_transforms",
+         "record_bytes_p50", "record_bytes_p99", "record_bytes_max",
+         "estimated_records", "measured_records_per_second"（未实测时为 None）}
+
+    Example:
+        tuning = tune_batch_transform("s3://bucket/input/", instance_type="ml.c5.2xlarge")
+        create_batch_transform(..., auto_tune=True)  # 内部调用本函数
+    """
+    if config is None:
+        config = get_config()
+
+    sample = sample_records(
+        input_s3_uri, split_type, sample_objects, sample_bytes,
+        s3_client=s3_client, region=config.region,
+    )
+    records = sample["records"]
+    sizes = sorted(sample["sizes"])
+    if not sizes:
+        raise ValueError(f"No complete records sampled from {input_s3_uri}")
+
+    if split_type in (None, "None"):
+        # 不切分时记录大小就是对象大小，以最大对象为准
+        sizes[-1] = max(sizes[-1], sample["max_object_bytes"])
+
+    p50 = _percentile(sizes, 0.50)
+    p99 = _percentile(sizes, 0.99)
+    largest = sizes[-1]
+    mean = statistics.fmean(sizes)
+    vcpus = instance_vcpus(instance_type)
+
+    # 下限: 必须装得下最大的记录
+    min_payload_mb = max(1, math.ceil(largest / MB))
+    if min_payload_mb > MAX_TOTAL_PAYLOAD_MB:
+        raise ValueError(f"Record of {largest} bytes exceeds the 100 MB payload limit")
+
+    if split_type in (None, "None") or p50 > MB:
+        strategy = "SingleRecord"
+        payload_mb = min_payload_mb
+    else:
+        strategy = "MultiRecord"
+        # 每个请求约 TARGET_RECORDS_PER_REQUEST 条，不超过 SageMaker 默认的 6 MB
+        target_mb = math.ceil(p50 * TARGET_RECORDS_PER_REQUEST / MB)
+        payload_mb = max(min_payload_mb, min(6, target_mb))
+
+    def _concurrency(payload: int) -> int:
+        return max(1, min(vcpus, MAX_TOTAL_PAYLOAD_MB // payload))
+
+    measured = None
+    if predict is not None and records:
+        candidates: List[Tuple[str, int]] = [
+            ("MultiRecord", mb)
+            for mb in sorted({min_payload_mb, *_CANDIDATE_PAYLOADS_MB})
+            if min_payload_mb <= mb <= MAX_TOTAL_PAYLOAD_MB
+        ]
+        candidates.append(("SingleRecord", min_payload_mb))
+
+        results = []
+        for candidate_strategy, candidate_mb in candidates:
+            throughput = _measure(
+                predict, records, candidate_strategy, candidate_mb,
+                _concurrency(candidate_mb), content_type,
+            )
+            results.append((throughput, candidate_strategy, candidate_mb))
+            print(f"   {candidate_strategy:<12} {candidate_mb:>3} MB: {throughput:,.0f} records/s")
+
+        measured, strategy, payload_mb = max(results)
+
+    tuning = {
+        "strategy": strategy,
+        "max_payload_mb": payload_mb,
+        "max_concurrent_transforms": _concurrency(payload_mb),
+        "record_bytes_p50": p50,
+        "record_bytes_p99": p99,
+        "record_bytes_max": largest,
+        "estimated_records": int(sample["total_bytes"] / mean) if mean else 0,
+        "measured_records_per_second": measured,
+    }
+
+    print(
+        f"✅ Batch tuning for {instance_type}: {strategy}, "
+        f"MaxPayloadInMB={payload_mb}, MaxConcurrentTransforms={tuning['max_concurrent_transforms']}"
+    )
+    print(f"   Record size p50/p99/max: {p50}/{p99}/{largest} bytes")
+    return tuning
+
+
+def tuning_tags(tuning: Dict[str, Any]) -> List[Dict[str, str]]:
+    """把调优结果转换为 Job Tags"""
+    tags = [
+        {"Key": "TunedBatchStrategy", "Value": tuning["strategy"]},
+        {"Key": "TunedMaxPayloadInMB", "Value": str(tuning["max_payload_mb"])},
+        {"Key": "TunedMaxConcurrentTransforms", "Value": str(tuning["max_concurrent_transforms"])},
+        {"Key": "RecordBytesP50", "Value": str(tuning["record_bytes_p50"])},
+        {"Key": "RecordBytesP99", "Value": str(tuning["record_bytes_p99"])},
+    ]
+    if tuning.get("measured_records_per_second") is not None:
+        tags.append(
+            {"Key": "LocalRecordsPerSecond", "Value": f"{tuning['measured_records_per_second']:.0f}"}
+        )
+    return tags
@@ -0,0 +1,215 @@
+# =============================================================================
+# batching.py - 客户端微批 (Micro-batching)
+# =============================================================================
+# 将并发的单条推理请求合并为一个 {"instances": [...]} 请求发送，
+# 再把 predictions 按顺序分发回各调用方的 Future
+# =============================================================================
+
+import json
+import queue
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, List, Optional, Tuple
+
+from .config import get_config, DeployConfig
+from .endpoint import invoke_endpoint
+
+# SageMaker Real-Time 推理请求体上限 6 MB
+MAX_PAYLOAD_BYTES = 6 * 1024 * 1024
+
+# {"instances": []} 的固定开销
+_ENVELOPE_BYTES = len(json.dumps({"instances": []}))
+
+_STOP = object()
+
+
+class BatchingInvoker:
+    """
+    微批调用器
+
+    调用方每次提交一条记录，后台线程在 max_batch_size 条或 max_latency_ms 毫秒内
+    （先到为准）合并成一个 {"instances": [...]} 请求，响应中的 predictions
+    按顺序回填到各自的 Future。
+
+    Example:
+        with BatchingInvoker("sklearn-v1", max_batch_size=64, max_latency_ms=10) as invoker:
+            future = invoker.submit([1.0, 2.0, 3.0])
+            prediction = future.result()
+
+            # 或阻塞调用
+            prediction = invoker.predict([1.0, 2.0, 3.0])
+    """
+
+    def __init__(
+        self,
+        endpoint_name: str,
+        config: DeployConfig = None,
+        max_batch_size: int = 64,
+        max_latency_ms: float = 10.0,
+        max_payload_bytes: int = MAX_PAYLOAD_BYTES,
+        max_in_flight: int = 4,
+        invoke_fn: Callable[[str, Any], Any] = None,
+    ):
+        """
+        Args:
+            endpoint_name: Endpoint 名称
+            config: 部署配置（默认自动获取）
+            max_batch_size: 每批最大记录数
+            max_latency_ms: 第一条记录到达后最多等待的毫秒数
+            max_payload_bytes: 每批请求体上限（默认 6 MB）
+            max_in_flight: 同时在途的批请求数
+            invoke_fn: 自定义调用函数 (endpoint_name, payload) -> result（默认 invoke_endpoint）
+        """
+        if max_batch_size < 1:
+            raise ValueError("max_batch_size must be >= 1")
+        if max_payload_bytes <= _ENVELOPE_BYTES:
+            raise ValueError(f"max_payload_bytes must be > {_ENVELOPE_BYTES}")
+
+        self.endpoint_name = endpoint_name
+        self.max_batch_size = max_batch_size
+        self.max_latency = max_latency_ms / 1000.0
+        self.max_payload_bytes = max_payload_bytes
+
+        if invoke_fn is None:
+            config = config or get_config()
+
+            def invoke_fn(name, payload):
+                return invoke_endpoint(name, payload, config=config)
+
+        self._invoke_fn = invoke_fn
+        self._queue: "queue.Queue" = queue.Queue()
+        self._pending: Optional[Tuple[Any, int, Future]] = None
+        self._closed = False
+        # 保证 _STOP 之后不会再有记录入队（否则其 Future 永远不会完成）
+        self._close_lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_in_flight, thread_name_prefix="sm-deploy-batch"
+        )
+        self._worker = threading.Thread(
+            target=self._run, name="sm-deploy-batcher", daemon=True
+        )
+        self._worker.start()
+
+    # -------------------------------------------------------------------------
+    # 公共接口
+    # -------------------------------------------------------------------------
+
+    def submit(self, instance: Any) -> Future:
+        """
+        提交一条记录
+
+        Args:
+            instance: 单条输入（如 [1.0, 2.0, 3.0]），必须可 JSON 序列化
+
+        Returns:
+            Future，结果为该记录对应的 prediction
+        """
+        future: Future = Future()
+        size = len(json.dumps(instance)) + 1  # 逗号分隔符
+        if size + _ENVELOPE_BYTES > self.max_payload_bytes:
+            future.set_exception(
+                ValueError(
+                    f"Record size {size} bytes exceeds max payload {self.max_payload_bytes} bytes"
+                )
+            )
+            return future
+
+        with self._close_lock:
+            if self._closed:
+                raise RuntimeError("BatchingInvoker is closed")
+            self._queue.put((instance, size, future))
+        return future
+
+    def predict(self, instance: Any, timeout: Optional[float] = None) -> Any:
+        """提交一条记录并等待 prediction"""
+        return self.submit(instance).result(timeout=timeout)
+
+    def close(self, wait: bool = True):
+        """
+        停止接收新记录，发送剩余缓冲并关闭
+
+        Args:
+            wait: 是否等待剩余记录发送完成（False 时由后台线程发送剩余缓冲后自行关闭线程池）
+        """
+        with self._close_lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._queue.put(_STOP)
+        if wait:
+            self._worker.join()
+            self._executor.shutdown(wait=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    # -------------------------------------------------------------------------
+    # 后台合并线程
+    # -------------------------------------------------------------------------
+
+    def _run(self):
+        try:
+            while True:
+                batch, stop = self._collect()
+                if batch:
+                    self._executor.submit(self._send, batch)
+                if stop:
+                    return
+        finally:
+            # 线程池只在这里关闭: 剩余缓冲提交完之后才不再接受任务
+            self._executor.shutdown(wait=False)
+
+    def _collect(self) -> Tuple[List[Tuple[Any, int, Future]], bool]:
+        """收集一批记录，返回 (batch, 是否收到停止信号)"""
+        if self._pending is not None:
+            first, self._pending = self._pending, None
+        else:
+            first = self._queue.get()
+            if first is _STOP:
+                return [], True
+
+        batch = [first]
+        payload_size = _ENVELOPE_BYTES + first[1]
+        deadline = time.monotonic() + self.max_latency
+
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                item = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if item is _STOP:
+                return batch, True
+            if payload_size + item[1] > self.max_payload_bytes:
+                # 超出 payload 上限，留到下一批
+                self._pending = item
+                break
+            batch.append(item)
+            payload_size += item[1]
+
+        return batch, False
+
+    def _send(self, batch: List[Tuple[Any, int, Future]]):
+        futures = [future for _, _, future in batch]
+        try:
+            result = self._invoke_fn(
+                self.endpoint_name, {"instances": [instance for instance, _, _ in batch]}
+            )
+            predictions = result.get("predictions") if isinstance(result, dict) else result
+            if not isinstance(predictions, list) or len(predictions) != len(batch):
+                raise ValueError(
+                    f"Expected {len(batch)} predictions from endpoint, got: {type(result).__name__}"
+                )
+        except Exception as e:
+            for future in futures:
+                future.set_exception(e)
+            return
+
+        for future, prediction in zip(futures, predictions):
+            future.set_result(prediction)
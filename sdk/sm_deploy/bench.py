@@ -0,0 +1,723 @@
+# =============================================================================
+# bench.py - Endpoint 压测与容量评估
+# =============================================================================
+# 按给定的到达过程对 Endpoint 施加开环负载（请求按计划时刻发出，不等待
+# 前一个请求返回），统计延迟分布，并据此推荐实例数:
+#
+#   到达过程   constant（等间隔）/ poisson（指数间隔）/ ramp（速率线性增长）
+#   多进程     总速率平均分给各进程，进程内用线程池并发调用；各进程在
+#              预热完成后通过 Barrier 同时开始
+#   延迟       LatencyHistogram（HDR 风格的对数-线性分桶，相对误差 < 1.6%），
+#              从计划发出时刻开始计时，排队等待计入延迟（修正 coordinated omission）
+#   最大吞吐   find_max_throughput(): 速率倍增直到不满足 SLO，再二分查找
+#   实例数     recommend_instances(): 按单实例可持续吞吐和目标利用率计算
+#
+# 命令行（--mock 在本地 Mock Endpoint 上运行，供 CI 使用）:
+#   python -m sm_deploy.bench --endpoint sklearn-v1 --payload req.json --rate 50 --duration 60
+#   python -m sm_deploy.bench --mock --mock-latency-ms 20 --mock-concurrency 8 \
+#       --find-max --slo-p99-ms 100 --target-rps 1000
+# =============================================================================
+
+import argparse
+import json
+import math
+import multiprocessing
+import os
+import random
+import threading
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from .config import DeployConfig
+
+ARRIVALS = ("constant", "poisson", "ramp")
+
+# 报告的分位数
+PERCENTILES = (50.0, 90.0, 99.0, 99.9)
+
+
+# =============================================================================
+# 延迟直方图
+# =============================================================================
+
+
+class LatencyHistogram:
+    """
+    对数-线性分桶的延迟直方图（HDR Histogram 风格）
+
+    以微秒为单位记录。小于 2^sub_bits 的值精确计数；更大的值在每个 2 的幂区间内
+    再均分为 2^(sub_bits-1) 个子桶，相对误差不超过 2^-(sub_bits-1)。计数按桶稀疏
+    存储，可以 pickle 并在进程间合并。
+
+    Example:
+        histogram = LatencyHistogram()
+        histogram.record(0.0123)
+        print(histogram.percentile(99))
+    """
+
+    def __init__(self, sub_bits: int = 7):
+        """
+        Args:
+            sub_bits: 子桶位数（7 对应相对误差约 1.6%）
+        """
+        self.sub_bits = sub_bits
+        self.counts: Dict[int, int] = {}
+        self.count = 0
+        self.sum = 0.0
+        self.min = float("inf")
+        self.max = 0.0
+
+    def _index(self, micros: int) -> int:
+        half = 1 << (self.sub_bits - 1)
+        shift = micros.bit_length() - self.sub_bits
+        if shift <= 0:
+            return micros
+        return (2 * half) + (shift - 1) * half + ((micros >> shift) - half)
+
+    def _bounds(self, index: int):
+        """桶对应的 [下界, 上界) 微秒"""
+        half = 1 << (self.sub_bits - 1)
+        if index < 2 * half:
+            return index, index + 1
+        shift = (index - 2 * half) // half + 1
+        sub = (index - 2 * half) % half + half
+        return sub << shift, (sub + 1) << shift
+
+    def record(self, seconds: float):
+        """记录一个延迟（秒）"""
+        micros = max(0, int(seconds * 1e6))
+        index = self._index(micros)
+        self.counts[index] = self.counts.get(index, 0) + 1
+        self.count += 1
+        self.sum += seconds
+        self.min = min(self.min, seconds)
+        self.max = max(self.max, seconds)
+
+    def merge(self, other: "LatencyHistogram"):
+        """合并另一个直方图（sub_bits 必须相同）"""
+        if other.sub_bits != self.sub_bits:
+            raise ValueError("Cannot merge histograms with different sub_bits")
+        for index, count in other.counts.items():
+            self.counts[index] = self.counts.get(index, 0) + count
+        self.count += other.count
+        self.sum += other.sum
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+    def percentile(self, pct: float) -> float:
+        """分位数（秒，取所在桶的中点，并限制在 [min, max] 内）"""
+        if not self.count:
+            return 0.0
+        rank = max(1, math.ceil(pct / 100.0 * self.count))
+        seen = 0
+        for index in sorted(self.counts):
+            seen += self.counts[index]
+            if seen >= rank:
+                lower, upper = self._bounds(index)
+                value = (lower + upper - 1) / 2.0 / 1e6
+                return min(max(value, self.min), self.max)
+        return self.max
+
+    @property
+    def mean(self) -> float:
+        return self.sum / self.count if self.count else 0.0
+
+    def summary(self) -> Dict[str, float]:
+        """{"p50", "p90", "p99", "p99.9", "mean", "max"}（毫秒）"""
+        result = {f"p{pct:g}": self.percentile(pct) * 1000 for pct in PERCENTILES}
+        result["mean"] = self.mean * 1000
+        result["max"] = self.max * 1000
+        return result
+
+
+# =============================================================================
+# 到达过程
+# =============================================================================
+
+
+def arrival_times(
+    arrival: str,
+    rate: float,
+    duration: float,
+    ramp_to: Optional[float] = None,
+    seed: Optional[int] = None,
+    phase: float = 0.0,
+) -> Iterator[float]:
+    """
+    生成请求的计划发出时刻（相对开始时刻的秒数，递增）
+
+    Args:
+        arrival: constant / poisson / ramp
+        rate: 每秒请求数（ramp 时为起始速率）
+        duration: 持续时间（秒）
+        ramp_to: ramp 的结束速率
+        seed: poisson 的随机种子
+        phase: constant 的首个请求偏移（多进程错开发送时刻）
+    """
+    if arrival not in ARRIVALS:
+        raise ValueError(f"Unsupported arrival: {arrival} (expected one of {', '.join(ARRIVALS)})")
+    if rate <= 0 and not (arrival == "ramp" and ramp_to):
+        raise ValueError("rate must be > 0")
+
+    if arrival == "constant":
+        t = phase
+        n = 0
+        while t < duration:
+            yield t
+            n += 1
+            t = phase + n / rate
+        return
+
+    if arrival == "poisson":
+        rng = random.Random(seed)
+        t = rng.expovariate(rate)
+        while t < duration:
+            yield t
+            t += rng.expovariate(rate)
+        return
+
+    # ramp: 速率 r(t) = r0 + (r1 - r0) * t / duration，第 n 个请求在累计到达数 = n 时发出
+    r0 = rate
+    r1 = ramp_to if ramp_to is not None else rate
+    a = (r1 - r0) / (2.0 * duration)
+    n = 0
+    while True:
+        if a == 0:
+            t = n / r0
+        else:
+            t = (-r0 + math.sqrt(r0 * r0 + 4 * a * n)) / (2 * a)
+        if t >= duration:
+            return
+        yield t
+        n += 1
+
+
+# =============================================================================
+# 调用函数
+# =============================================================================
+
+
+def endpoint_invoker(
+    endpoint_name: str,
+    payload: Any,
+    content_type: str = "application/json",
+    accept: str = "application/json",
+    config: DeployConfig = None,
+    max_in_flight: int = 64,
+) -> Callable[[], Any]:
+    """
+    默认的调用函数工厂: 每次调用发送一次 invoke_endpoint（不自动重试，限流计为错误）
+
+    在每个压测进程内调用一次，返回无参调用函数。自定义工厂需为模块级函数
+    （多进程时按引用传给子进程）。
+    """
+    from .clients import set_max_pool_connections
+    from .endpoint import invoke_endpoint
+
+    set_max_pool_connections(max_in_flight)
+
+    def invoke():
+        return invoke_endpoint(
+            endpoint_name,
+            payload,
+            content_type=content_type,
+            accept=accept,
+            config=config,
+            retry=False,
+        )
+
+    return invoke
+
+
+def _error_kind(error: BaseException) -> str:
+    from .ratelimit import classify_error
+
+    return classify_error(error)
+
+
+# =============================================================================
+# 压测
+# =============================================================================
+
+
+def _run_worker(
+    invoker_factory: Callable[..., Callable[[], Any]],
+    factory_kwargs: Dict[str, Any],
+    arrival: str,
+    rate: float,
+    ramp_to: Optional[float],
+    duration: float,
+    seed: Optional[int],
+    phase: float,
+    max_in_flight: int,
+    warmup_requests: int,
+    barrier=None,
+) -> Dict[str, Any]:
+    """单个进程的压测循环，返回可合并的结果"""
+    invoke = invoker_factory(**factory_kwargs)
+    for _ in range(warmup_requests):
+        try:
+            invoke()
+        except Exception:
+            pass
+
+    latency = LatencyHistogram()
+    service = LatencyHistogram()
+    lock = threading.Lock()
+    state = {"ok": 0, "dropped": 0, "in_flight": 0, "last_done": 0.0}
+    errors: Dict[str, int] = {}
+
+    def run(scheduled: float):
+        started = time.monotonic()
+        try:
+            invoke()
+            kind = None
+        except Exception as e:
+            kind = _error_kind(e)
+        done = time.monotonic()
+        with lock:
+            state["in_flight"] -= 1
+            state["last_done"] = max(state["last_done"], done)
+            if kind is None:
+                state["ok"] += 1
+                latency.record(done - scheduled)
+                service.record(done - started)
+            else:
+                errors[kind] = errors.get(kind, 0) + 1
+
+    if barrier is not None:
+        barrier.wait()
+    start = time.monotonic()
+    sent = 0
+    with ThreadPoolExecutor(max_workers=max_in_flight) as executor:
+        for offset in arrival_times(arrival, rate, duration, ramp_to, seed, phase):
+            scheduled = start + offset
+            delay = scheduled - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+            sent += 1
+            with lock:
+                # 并发已满时丢弃（保持开环，不让发送端被拖慢）
+                if state["in_flight"] >= max_in_flight:
+                    state["dropped"] += 1
+                    continue
+                state["in_flight"] += 1
+            executor.submit(run, scheduled)
+
+    return {
+        "sent": sent,
+        "ok": state["ok"],
+        "dropped": state["dropped"],
+        "errors": errors,
+        "elapsed": max(duration, state["last_done"] - start),
+        "latency": latency,
+        "service": service,
+    }
+
+
+def _process_main(queue, kwargs: Dict[str, Any]):
+    try:
+        queue.put(("ok", _run_worker(**kwargs)))
+    except BaseException:
+        kwargs["barrier"].abort()
+        queue.put(("error", traceback.format_exc()))
+
+
+def run_load(
+    invoker_factory: Callable[..., Callable[[], Any]] = endpoint_invoker,
+    factory_kwargs: Dict[str, Any] = None,
+    rate: float = 10.0,
+    duration: float = 30.0,
+    arrival: str = "poisson",
+    ramp_to: Optional[float] = None,
+    processes: int = 1,
+    max_in_flight: int = 64,
+    warmup_requests: int = 1,
+    seed: Optional[int] = None,
+) -> Dict[str, Any]:
+    """
+    以给定到达过程施加负载并统计结果
+
+    Args:
+        invoker_factory: 调用函数工厂（在每个进程内以 factory_kwargs 调用一次，返回无参调用函数）
+        factory_kwargs: 工厂参数（默认工厂见 endpoint_invoker）
+        rate: 总请求速率（req/s；ramp 时为起始速率）
+        duration: 持续时间（秒）
+        arrival: constant / poisson / ramp
+        ramp_to: ramp 的结束速率
+        processes: 进程数（速率平均分配；>1 时以 spawn 方式启动，参数需可 pickle）
+        max_in_flight: 每个进程的最大并发请求数（超出时丢弃并计数）
+        warmup_requests: 每个进程开始前的预热请求数（不计入结果）
+        seed: poisson 的随机种子
+
+    Returns:
+        {"arrival", "offered_rps", "achieved_rps", "sent", "ok", "dropped", "errors",
+         "error_rate", "elapsed", "latency_ms", "service_ms", "histogram"}
+        latency_ms 从计划发出时刻计时，service_ms 从实际发出时刻计时
+
+    Example:
+        result = run_load(factory_kwargs={"endpoint_name": "sklearn-v1", "payload": data},
+                          rate=200, duration=60, processes=4)
+        print(result["achieved_rps"], result["latency_ms"]["p99"])
+    """
+    if processes < 1:
+        raise ValueError("processes must be >= 1")
+
+    jobs = [
+        dict(
+            invoker_factory=invoker_factory,
+            factory_kwargs=factory_kwargs or {},
+            arrival=arrival,
+            rate=rate / processes,
+            ramp_to=ramp_to / processes if ramp_to is not None else None,
+            duration=duration,
+            seed=None if seed is None else seed + index,
+            phase=index / rate if rate > 0 else 0.0,
+            max_in_flight=max_in_flight,
+            warmup_requests=warmup_requests,
+        )
+        for index in range(processes)
+    ]
+
+    if processes == 1:
+        parts = [_run_worker(**jobs[0])]
+    else:
+        context = multiprocessing.get_context("spawn")
+        barrier = context.Barrier(processes)
+        queue = context.Queue()
+        workers = []
+        for job in jobs:
+            job["barrier"] = barrier
+            worker = context.Process(target=_process_main, args=(queue, job), daemon=True)
+            worker.start()
+            workers.append(worker)
+
+        outcomes = [queue.get() for _ in workers]
+        for worker in workers:
+            worker.join()
+        failures = [detail for status, detail in outcomes if status == "error"]
+        if failures:
+            raise RuntimeError(f"Load worker failed:\n{failures[0]}")
+        parts = [detail for _, detail in outcomes]
+
+    latency = LatencyHistogram()
+    service = LatencyHistogram()
+    errors: Dict[str, int] = {}
+    for part in parts:
+        latency.merge(part["latency"])
+        service.merge(part["service"])
+        for kind, count in part["errors"].items():
+            errors[kind] = errors.get(kind, 0) + count
+
+    sent = sum(part["sent"] for part in parts)
+    ok = sum(part["ok"] for part in parts)
+    dropped = sum(part["dropped"] for part in parts)
+    elapsed = max(part["elapsed"] for part in parts)
+    failed = sum(errors.values()) + dropped
+
+    return {
+        "arrival": arrival,
+        "offered_rps": sent / duration,
+        "achieved_rps": ok / elapsed,
+        "sent": sent,
+        "ok": ok,
+        "dropped": dropped,
+        "errors": errors,
+        "error_rate": failed / sent if sent else 0.0,
+        "elapsed": elapsed,
+        "latency_ms": latency.summary(),
+        "service_ms": service.summary(),
+        "histogram": latency,
+    }
+
+
+# =============================================================================
+# 容量评估
+# =============================================================================
+
+
+def _sustainable(result: Dict[str, Any], slo_p99_ms: float, error_budget: float) -> bool:
+    return (
+        result["latency_ms"]["p99"] <= slo_p99_ms
+        and result["error_rate"] <= error_budget
+        and result["achieved_rps"] >= 0.95 * result["offered_rps"]
+    )
+
+
+def find_max_throughput(
+    invoker_factory: Callable[..., Callable[[], Any]] = endpoint_invoker,
+    factory_kwargs: Dict[str, Any] = None,
+    slo_p99_ms: float = 100.0,
+    start_rate: float = 10.0,
+    max_rate: float = 10000.0,
+    step_duration: float = 20.0,
+    error_budget: float = 0.01,
+    precision: float = 0.05,
+    max_steps: int = 16,
+    on_step: Callable[[Dict[str, Any]], None] = None,
+    **load_kwargs,
+) -> Dict[str, Any]:
+    """
+    查找满足 SLO 的最大可持续吞吐
+
+    速率从 start_rate 起倍增直到某一步不可持续，再在最后一个可持续速率与
+    首个不可持续速率之间二分，直到区间宽度小于 precision。一步可持续指:
+    p99 <= slo_p99_ms、错误率（含丢弃）<= error_budget、实际吞吐 >= 95% 的施加速率。
+
+    Args:
+        invoker_factory / factory_kwargs: 同 run_load
+        slo_p99_ms: p99 延迟目标（毫秒）
+        start_rate: 起始速率（req/s）
+        max_rate: 速率上限
+        step_duration: 每一步的持续时间（秒）
+        error_budget: 允许的错误率
+        precision: 二分查找的相对精度
+        max_steps: 最多步数
+        on_step: 每步完成后的回调（参数为该步的 run_load 结果，附带 rate 和 sustainable）
+        **load_kwargs: 传给 run_load 的其它参数（arrival, processes, max_in_flight ...）
+
+    Returns:
+        {"max_rps", "rate", "slo_p99_ms", "steps": [...]}
+        max_rps 为最后一个可持续步的实际吞吐（没有可持续步时为 0）
+    """
+    steps: List[Dict[str, Any]] = []
+    best: Optional[Dict[str, Any]] = None
+
+    def probe(rate: float) -> bool:
+        result = run_load(
+            invoker_factory, factory_kwargs, rate=rate, duration=step_duration, **load_kwargs
+        )
+        result["rate"] = rate
+        result["sustainable"] = _sustainable(result, slo_p99_ms, error_budget)
+        result.pop("histogram")
+        steps.append(result)
+        if on_step is not None:
+            on_step(result)
+        return result["sustainable"]
+
+    low, high = 0.0, None
+    rate = start_rate
+    while len(steps) < max_steps:
+        if probe(rate):
+            low, best = rate, steps[-1]
+            if rate >= max_rate:
+                break
+            rate = min(max_rate, rate * 2)
+        else:
+            high = rate
+            break
+
+    while high is not None and len(steps) < max_steps and high - low > precision * high:
+        rate = (low + high) / 2
+        if probe(rate):
+            low, best = rate, steps[-1]
+        else:
+            high = rate
+
+    return {
+        "max_rps": best["achieved_rps"] if best else 0.0,
+        "rate": low,
+        "slo_p99_ms": slo_p99_ms,
+        "steps": steps,
+    }
+
+
+def recommend_instances(
+    max_rps: float,
+    target_rps: float,
+    instance_count: int = 1,
+    headroom: float = 0.7,
+    min_instances: int = 1,
+) -> Dict[str, Any]:
+    """
+    按压测结果推荐实例数
+
+    Args:
+        max_rps: 压测得到的最大可持续吞吐
+        target_rps: 生产峰值目标吞吐
+        instance_count: 压测时 Endpoint 的实例数
+        headroom: 目标利用率（0.7 表示峰值时每个实例只用到 70% 的可持续吞吐）
+        min_instances: 最少实例数（多 AZ 高可用时通常为 2）
+
+    Returns:
+        {"instance_count", "per_instance_rps", "target_rps", "headroom", "utilization"}
+        utilization 为推荐实例数下峰值时的利用率
+    """
+    if max_rps <= 0:
+        raise ValueError("max_rps must be > 0 (no sustainable step found)")
+    if not 0 < headroom <= 1:
+        raise ValueError("headroom must be in (0, 1]")
+
+    per_instance = max_rps / instance_count
+    count = max(min_instances, math.ceil(target_rps / (per_instance * headroom)))
+    return {
+        "instance_count": count,
+        "per_instance_rps": per_instance,
+        "target_rps": target_rps,
+        "headroom": headroom,
+        "utilization": target_rps / (per_instance * count),
+    }
+
+
+# =============================================================================
+# 命令行
+# =============================================================================
+
+
+def _mock_config() -> DeployConfig:
+    return DeployConfig(
+        company="acme",
+        team="bench",
+        project="local",
+        region="us-east-1",
+        account_id="000000000000",
+        vpc_id="vpc-local",
+        subnet_ids=["subnet-local"],
+        security_group_ids=["sg-local"],
+        inference_role_arn="arn:aws:iam::000000000000:role/local",
+        execution_role_arn="arn:aws:iam::000000000000:role/local",
+        bucket="local",
+    )
+
+
+def _format_result(result: Dict[str, Any]) -> str:
+    latency = result["latency_ms"]
+    errors = ", ".join(f"{k}={v}" for k, v in sorted(result["errors"].items())) or "-"
+    return (
+        f"offered={result['offered_rps']:8.1f}/s  achieved={result['achieved_rps']:8.1f}/s"
+        f"  p50={latency['p50']:7.2f}  p99={latency['p99']:7.2f}  p99.9={latency['p99.9']:7.2f}"
+        f"  max={latency['max']:7.2f} ms  dropped={result['dropped']}  errors={errors}"
+    )
+
+
+def main(argv: List[str] = None):
+    parser = argparse.ArgumentParser(
+        prog="python -m sm_deploy.bench", description="Endpoint load test and capacity planning"
+    )
+    parser.add_argument("--endpoint", default="model", help="Endpoint 名称")
+    parser.add_argument("--payload", help="请求体文件（默认一个小 JSON 请求）")
+    parser.add_argument("--content-type", default="application/json")
+    parser.add_argument("--accept", default="application/json")
+    parser.add_argument("--arrival", choices=ARRIVALS, default="poisson")
+    parser.add_argument("--rate", type=float, default=10.0, help="总请求速率 (req/s)")
+    parser.add_argument("--ramp-to", type=float, help="ramp 的结束速率")
+    parser.add_argument("--duration", type=float, default=30.0, help="持续时间（秒；--find-max 时为每一步）")
+    parser.add_argument("--processes", type=int, default=1)
+    parser.add_argument("--max-in-flight", type=int, default=64, help="每个进程的最大并发")
+    parser.add_argument("--seed", type=int)
+    parser.add_argument("--find-max", action="store_true", help="查找满足 SLO 的最大吞吐")
+    parser.add_argument("--slo-p99-ms", type=float, default=100.0)
+    parser.add_argument("--error-budget", type=float, default=0.01)
+    parser.add_argument("--max-rate", type=float, default=10000.0)
+    parser.add_argument("--target-rps", type=float, help="生产目标吞吐（给出实例数推荐）")
+    parser.add_argument("--instance-count", type=int, default=1, help="被测 Endpoint 的实例数")
+    parser.add_argument("--headroom", type=float, default=0.7)
+    parser.add_argument("--min-instances", type=int, default=1)
+    parser.add_argument("--json", action="store_true", help="以 JSON 输出结果")
+    parser.add_argument("--mock", action="store_true", help="在本地 Mock Endpoint 上运行")
+    parser.add_argument("--mock-latency-ms", type=float, default=10.0)
+    parser.add_argument("--mock-concurrency", type=int, default=4, help="Mock 同时处理的请求数")
+    args = parser.parse_args(argv)
+
+    if args.payload:
+        with open(args.payload, "rb") as f:
+            payload: Any = f.read()
+    else:
+        payload = {"instances": [[1.0, 2.0, 3.0]]}
+
+    config = None
+    server = None
+    if args.mock:
+        from .mock_server import MockEndpointServer
+
+        server = MockEndpointServer(
+            latency_ms=args.mock_latency_ms, max_concurrency=args.mock_concurrency
+        ).start()
+        # 子进程继承环境变量；本地 mock 无需真实凭证
+        os.environ["AWS_ENDPOINT_URL_SAGEMAKER_RUNTIME"] = server.url
+        os.environ.setdefault("AWS_ACCESS_KEY_ID", "bench")
+        os.environ.setdefault("AWS_SECRET_ACCESS_KEY", "bench")
+        config = _mock_config()
+
+    factory_kwargs = dict(
+        endpoint_name=args.endpoint,
+        payload=payload,
+        content_type=args.content_type,
+        accept=args.accept,
+        config=config,
+        max_in_flight=args.max_in_flight,
+    )
+    load_kwargs = dict(
+        arrival=args.arrival,
+        processes=args.processes,
+        max_in_flight=args.max_in_flight,
+        seed=args.seed,
+    )
+
+    try:
+        if args.find_max:
+            report = find_max_throughput(
+                endpoint_invoker,
+                factory_kwargs,
+                slo_p99_ms=args.slo_p99_ms,
+                start_rate=args.rate,
+                max_rate=args.max_rate,
+                step_duration=args.duration,
+                error_budget=args.error_budget,
+                on_step=None if args.json else lambda step: print(
+                    f"  {'ok  ' if step['sustainable'] else 'FAIL'} rate={step['rate']:8.1f}  "
+                    + _format_result(step)
+                ),
+                **load_kwargs,
+            )
+            max_rps = report["max_rps"]
+        else:
+            report = run_load(
+                endpoint_invoker,
+                factory_kwargs,
+                rate=args.rate,
+                duration=args.duration,
+                ramp_to=args.ramp_to,
+                **load_kwargs,
+            )
+            report.pop("histogram")
+            max_rps = report["achieved_rps"]
+            if not args.json:
+                print("  " + _format_result(report))
+    finally:
+        if server is not None:
+            server.stop()
+
+    if args.target_rps:
+        if max_rps > 0:
+            report["recommendation"] = recommend_instances(
+                max_rps,
+                args.target_rps,
+                instance_count=args.instance_count,
+                headroom=args.headroom,
+                min_instances=args.min_instances,
+            )
+        else:
+            report["recommendation"] = None
+
+    if args.json:
+        print(json.dumps(report, indent=2, default=str))
+        return
+
+    if args.find_max:
+        print(f"Max sustainable throughput: {max_rps:.1f} req/s (p99 <= {args.slo_p99_ms} ms)")
+    recommendation = report.get("recommendation")
+    if recommendation:
+        print(
+            f"Recommended instances: {recommendation['instance_count']}"
+            f" ({recommendation['per_instance_rps']:.1f} req/s per instance,"
+            f" {recommendation['utilization']:.0%} utilization at {args.target_rps:g} req/s)"
+        )
+    elif args.target_rps:
+        print("No sustainable rate found; cannot recommend an instance count")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,238 @@
+# =============================================================================
+# cache.py - 推理结果缓存
+# =============================================================================
+# invoke_endpoint 的可选响应缓存
+# Key = (Endpoint 名称, EndpointConfig 名称, Content-Type, Accept, 请求体哈希)
+# 支持 TTL、LRU 容量限制、命中统计，Endpoint 切换 Config 后自动失效
+# =============================================================================
+
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+import weakref
+from collections import OrderedDict
+from typing import Callable, Dict, Optional, Tuple
+
+# 所有 PredictionCache 实例（update_endpoint 时统一失效）
+_caches: "weakref.WeakSet[PredictionCache]" = weakref.WeakSet()
+
+
+class MemoryCacheBackend:
+    """内存缓存（LRU）"""
+
+    def __init__(self, max_entries: int = 10000):
+        self.max_entries = max_entries
+        self._data: "OrderedDict[str, Tuple[str, bytes, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Tuple[bytes, float]]:
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            self._data.move_to_end(key)
+            return item[1], item[2]
+
+    def set(self, key: str, endpoint_name: str, value: bytes, expires_at: float):
+        with self._lock:
+            self._data[key] = (endpoint_name, value, expires_at)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def delete(self, key: str):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def delete_endpoint(self, endpoint_name: str):
+        with self._lock:
+            for key in [k for k, v in self._data.items() if v[0] == endpoint_name]:
+                del self._data[key]
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class SqliteCacheBackend:
+    """
+    磁盘缓存（sqlite，可跨进程共享）
+
+    Example:
+        backend = SqliteCacheBackend("~/.cache/sm_deploy/predictions.db")
+    """
+
+    def __init__(self, path: str, max_entries: int = 100000):
+        path = os.path.expanduser(path)
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS predictions ("
+            " key TEXT PRIMARY KEY, endpoint TEXT, value BLOB,"
+            " expires_at REAL, accessed_at REAL)"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_predictions_accessed ON predictions (accessed_at)"
+        )
+
+    def get(self, key: str) -> Optional[Tuple[bytes, float]]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, expires_at FROM predictions WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            self._conn.execute(
+                "UPDATE predictions SET accessed_at = ? WHERE key = ?", (time.time(), key)
+            )
+            return bytes(row[0]), row[1]
+
+    def set(self, key: str, endpoint_name: str, value: bytes, expires_at: float):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO predictions VALUES (?, ?, ?, ?, ?)",
+                (key, endpoint_name, value, expires_at, time.time()),
+            )
+            count = self._conn.execute("SELECT COUNT(*) FROM predictions").fetchone()[0]
+            if count > self.max_entries:
+                self._conn.execute(
+                    "DELETE FROM predictions WHERE key IN ("
+                    " SELECT key FROM predictions ORDER BY accessed_at LIMIT ?)",
+                    (count - self.max_entries,),
+                )
+
+    def delete(self, key: str):
+        with self._lock:
+            self._conn.execute("DELETE FROM predictions WHERE key = ?", (key,))
+
+    def delete_endpoint(self, endpoint_name: str):
+        with self._lock:
+            self._conn.execute("DELETE FROM predictions WHERE endpoint = ?", (endpoint_name,))
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM predictions")
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM predictions").fetchone()[0]
+
+
+class PredictionCache:
+    """
+    推理结果缓存
+
+    缓存原始响应字节，命中时按 accept 重新解码（调用方拿到的是独立对象）。
+
+    Example:
+        cache = PredictionCache(ttl=30, max_entries=50000)
+        result = invoke_endpoint("sklearn-v1", data, cache=cache)
+        print(cache.stats())
+    """
+
+    def __init__(
+        self,
+        backend=None,
+        ttl: float = 60.0,
+        max_entries: int = 10000,
+        config_ttl: float = 60.0,
+    ):
+        """
+        Args:
+            backend: 存储后端（默认 MemoryCacheBackend）
+            ttl: 缓存有效期（秒）
+            max_entries: 内存后端的最大条目数
+            config_ttl: Endpoint → EndpointConfig 映射的刷新周期（秒），
+                用于发现 SDK 之外发起的 Endpoint 更新
+        """
+        self.backend = backend or MemoryCacheBackend(max_entries=max_entries)
+        self.ttl = ttl
+        self.config_ttl = config_ttl
+        self.hits = 0
+        self.misses = 0
+        self._configs: Dict[str, Tuple[str, float]] = {}
+        self._lock = threading.Lock()
+        _caches.add(self)
+
+    def get_config_name(self, endpoint_name: str, describe: Callable[[str], dict]) -> str:
+        """获取 Endpoint 当前的 EndpointConfig 名称（按 config_ttl 缓存）"""
+        now = time.monotonic()
+        with self._lock:
+            cached = self._configs.get(endpoint_name)
+        if cached is not None and cached[1] > now:
+            return cached[0]
+
+        config_name = describe(endpoint_name)["EndpointConfigName"]
+        with self._lock:
+            self._configs[endpoint_name] = (config_name, now + self.config_ttl)
+        return config_name
+
+    @staticmethod
+    def make_key(
+        endpoint_name: str,
+        config_name: str,
+        content_type: str,
+        accept: str,
+        body: bytes,
+        target_model: Optional[str] = None,
+        target_variant: Optional[str] = None,
+    ) -> str:
+        digest = hashlib.blake2b(body, digest_size=20).hexdigest()
+        target = target_model or ""
+        if target_variant:
+            target += f"@{target_variant}"
+        return f"{endpoint_name}|{config_name}|{target}|{content_type}|{accept}|{digest}"
+
+    def get(self, key: str) -> Optional[bytes]:
+        item = self.backend.get(key)
+        if item is not None and item[1] > time.time():
+            with self._lock:
+                self.hits += 1
+            return item[0]
+
+        if item is not None:
+            self.backend.delete(key)
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def put(self, key: str, endpoint_name: str, value: bytes):
+        self.backend.set(key, endpoint_name, value, time.time() + self.ttl)
+
+    def invalidate_endpoint(self, endpoint_name: str):
+        """丢弃某个 Endpoint 的全部缓存"""
+        with self._lock:
+            self._configs.pop(endpoint_name, None)
+        self.backend.delete_endpoint(endpoint_name)
+
+    def clear(self):
+        with self._lock:
+            self._configs.clear()
+            self.hits = 0
+            self.misses = 0
+        self.backend.clear()
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+            "entries": len(self.backend),
+        }
+
+
+def invalidate_endpoint_caches(endpoint_name: str):
+    """Endpoint 切换 EndpointConfig 时调用，使所有缓存中该 Endpoint 的条目失效"""
+    for cache in list(_caches):
+        cache.invalidate_endpoint(endpoint_name)
@@ -0,0 +1,199 @@
+# =============================================================================
+# clients.py - boto3 Client 池
+# =============================================================================
+# 进程级共享的 boto3 Client 注册表，按 (service, region) 复用连接池
+# =============================================================================
+
+import os
+import random
+import threading
+import time
+from typing import Callable, Dict, Optional, Tuple
+
+# 默认连接池大小（botocore 默认仅 10，高并发推理时不够用）
+DEFAULT_MAX_POOL_CONNECTIONS = 50
+
+# 按服务覆盖 botocore 重试配置: 推理调用由 ratelimit.EndpointLimiter 统一重试，
+# 关闭 botocore 自带重试，避免两层重试叠加放大
+_SERVICE_RETRIES = {
+    "sagemaker-runtime": {"mode": "standard", "total_max_attempts": 1},
+}
+
+_lock = threading.RLock()
+_session = None
+_session_profile: Optional[str] = None
+_clients: Dict[Tuple[str, Optional[str]], object] = {}
+_max_pool_connections = int(
+    os.environ.get("SM_DEPLOY_MAX_POOL_CONNECTIONS", DEFAULT_MAX_POOL_CONNECTIONS)
+)
+
+
+def _get_session():
+    """获取共享的 boto3 Session（Session 本身非线程安全，仅在锁内使用）"""
+    global _session, _session_profile
+    profile = os.environ.get("AWS_PROFILE")
+    if _session is not None and profile != _session_profile:
+        # AWS_PROFILE 切换后按新 Profile 重建 Session 和 Client
+        _session = None
+        _clients.clear()
+    if _session is None:
+        # 延迟导入 boto3（import sm_deploy 时不加载）
+        import boto3
+
+        _session = boto3.session.Session()
+        _session_profile = profile
+    return _session
+
+
+def get_client(service_name: str, region_name: Optional[str] = None):
+    """
+    获取共享的 boto3 Client
+
+    同一 (service, region) 在进程内只创建一次，之后所有调用复用该 Client
+    及其 HTTP 连接池。boto3 低层 Client 是线程安全的，可在多线程间共享。
+    AWS_PROFILE 变化后自动按新 Profile 重建。
+
+    Args:
+        service_name: 服务名称 (sagemaker, sagemaker-runtime, s3, sts ...)
+        region_name: Region（None 表示使用默认 Region）
+
+    Returns:
+        boto3 Client
+
+    Example:
+        runtime = get_client("sagemaker-runtime", region_name="ap-northeast-1")
+    """
+    key = (service_name, region_name)
+    client = _clients.get(key)
+    if client is not None and _session_profile == os.environ.get("AWS_PROFILE"):
+        return client
+
+    with _lock:
+        session = _get_session()
+        client = _clients.get(key)
+        if client is None:
+            from botocore.config import Config
+
+            client = session.client(
+                service_name,
+                region_name=region_name,
+                config=Config(
+                    max_pool_connections=_max_pool_connections,
+                    retries=_SERVICE_RETRIES.get(service_name),
+                ),
+            )
+            _clients[key] = client
+    return client
+
+
+def get_credentials():
+    """共享 Session 当前解析到的凭证（未配置凭证时为 None）"""
+    with _lock:
+        return _get_session().get_credentials()
+
+
+def set_max_pool_connections(max_pool_connections: int):
+    """
+    设置每个 Client 的最大连接数
+
+    已创建的 Client 会被清除，下次 get_client() 时按新配置重建。
+
+    Args:
+        max_pool_connections: 每个 Client 的 HTTP 连接池大小
+    """
+    global _max_pool_connections
+    if max_pool_connections < 1:
+        raise ValueError("max_pool_connections must be >= 1")
+
+    with _lock:
+        _max_pool_connections = max_pool_connections
+        _clients.clear()
+
+
+def invalidate_clients(
+    service_name: Optional[str] = None,
+    region_name: Optional[str] = None,
+    reset_session: bool = False,
+):
+    """
+    清除缓存的 Client（例如凭证轮换后）
+
+    Args:
+        service_name: 仅清除该服务的 Client（None 表示全部）
+        region_name: 仅清除该 Region 的 Client（None 表示全部）
+        reset_session: 是否重建 Session 并清除全部 Client（重新加载凭证链）
+
+    Example:
+        # 凭证轮换后强制重建所有 Client
+        invalidate_clients(reset_session=True)
+    """
+    global _session
+    with _lock:
+        if reset_session:
+            _session = None
+            _clients.clear()
+            return
+
+        for key in list(_clients):
+            service, region = key
+            if service_name is not None and service != service_name:
+                continue
+            if region_name is not None and region != region_name:
+                continue
+            del _clients[key]
+
+
+# =============================================================================
+# 限流重试
+# =============================================================================
+
+# 视为限流、可退避重试的错误码
+THROTTLING_ERROR_CODES = {
+    "Throttling",
+    "ThrottlingException",
+    "ThrottledException",
+    "TooManyRequestsException",
+    "RequestLimitExceeded",
+    "ProvisionedThroughputExceededException",
+    "SlowDown",
+}
+
+
+def call_with_backoff(
+    fn: Callable,
+    *args,
+    max_attempts: int = 8,
+    base_delay: float = 1.0,
+    max_delay: float = 30.0,
+    **kwargs,
+):
+    """
+    调用 AWS API，遇到限流错误时按指数退避 + 随机抖动重试
+
+    Args:
+        fn: boto3 Client 方法
+        max_attempts: 最大尝试次数
+        base_delay: 首次退避基准（秒）
+        max_delay: 单次退避上限（秒）
+
+    Example:
+        call_with_backoff(sm.create_model, ModelName="...", ...)
+    """
+    from botocore.exceptions import ClientError
+
+    for attempt in range(1, max_attempts + 1):
+        try:
+            return fn(*args, **kwargs)
+        except ClientError as e:
+            code = e.response.get("Error", {}).get("Code", "")
+            if code not in THROTTLING_ERROR_CODES or attempt == max_attempts:
+                raise
+            time.sleep(random.uniform(0, min(max_delay, base_delay * 2 ** (attempt - 1))))
+
+
+def split_s3_uri(s3_uri: str) -> Tuple[str, str]:
+    """s3://bucket/key -> (bucket, key)"""
+    if not s3_uri.startswith("s3://"):
+        raise ValueError(f"Not an S3 URI: {s3_uri}")
+    bucket, _, key = s3_uri[5:].partition("/")
+    return bucket, key
@@ -4,12 +4,18 @@
 # 自动从环境变量、Tags、SageMaker Domain 获取 VPC/子网/安全组配置
 # =============================================================================
 
+import hashlib
 import os
-import boto3
+import re
+import time
 import json
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass, field
-from typing import List, Optional
-from functools import lru_cache
+from typing import Dict, List, Optional
+
+from .clients import get_client, get_credentials
 
 
 @dataclass
@@ -85,18 +91,31 @@ def _get_env_or_default(key: str, default: str) -> str:
     return os.environ.get(key, default)
 
 
-@lru_cache(maxsize=1)
+# 按凭证 / 相关环境变量缓存，凭证或 Profile / Region 切换后重新获取
+_account_ids: Dict[str, str] = {}
+_regions: Dict[tuple, str] = {}
+
+
 def _get_account_id() -> str:
-    """获取当前 AWS Account ID"""
-    sts = boto3.client("sts")
-    return sts.get_caller_identity()["Account"]
+    """获取当前凭证所属的 AWS Account ID"""
+    identity = _credential_identity()
+    account_id = _account_ids.get(identity)
+    if account_id is None:
+        sts = get_client("sts")
+        account_id = _account_ids[identity] = sts.get_caller_identity()["Account"]
+    return account_id
 
 
-@lru_cache(maxsize=1)
 def _get_region() -> str:
     """获取当前 AWS Region"""
-    session = boto3.session.Session()
-    return session.region_name or os.environ.get("AWS_REGION", "ap-northeast-1")
+    env_key = tuple(os.environ.get(k) for k in ("AWS_PROFILE", "AWS_REGION", "AWS_DEFAULT_REGION"))
+    region = _regions.get(env_key)
+    if region is None:
+        import boto3
+
+        session = boto3.session.Session()
+        region = _regions[env_key] = session.region_name or os.environ.get("AWS_REGION", "ap-northeast-1")
+    return region
 
 
 def _discover_from_domain() -> dict:
@@ -105,7 +124,7 @@ def _discover_from_domain() -> dict:
     在 Studio 环境中运行时可自动获取
     """
     try:
-        sm = boto3.client("sagemaker")
+        sm = get_client("sagemaker")
 
         # 尝试从环境变量获取 Domain ID
         domain_id = os.environ.get("DOMAIN_ID")
@@ -150,7 +169,7 @@ def _discover_from_user_profile() -> dict:
         if not user_profile_name or not domain_id:
             return {}
 
-        sm = boto3.client("sagemaker")
+        sm = get_client("sagemaker")
         profile = sm.describe_user_profile(
             DomainId=domain_id, UserProfileName=user_profile_name
         )
@@ -166,26 +185,192 @@ def _discover_from_user_profile() -> dict:
         return {}
 
 
+# =============================================================================
+# 发现结果缓存
+# =============================================================================
+
+# 磁盘缓存有效期（秒）
+_DISCOVERY_TTL = int(os.environ.get("SM_DEPLOY_DISCOVERY_TTL", "3600"))
+
+# 影响 get_config() 结果的环境变量（作为内存缓存 Key 的一部分）
+_CONFIG_ENV_KEYS = (
+    "COMPANY",
+    "TEAM",
+    "PROJECT",
+    "VPC_ID",
+    "PRIVATE_SUBNET_1_ID",
+    "PRIVATE_SUBNET_2_ID",
+    "SG_SAGEMAKER_STUDIO",
+    "IAM_PATH",
+    "BUCKET",
+    "DOMAIN_ID",
+    "USER_PROFILE_NAME",
+)
+
+_CONFIG_CACHE_SIZE = 32
+_config_cache: "OrderedDict[tuple, DeployConfig]" = OrderedDict()
+_config_lock = threading.Lock()
+
+
+def _get_cache_dir() -> str:
+    return os.environ.get(
+        "SM_DEPLOY_CACHE_DIR", os.path.join(os.path.expanduser("~"), ".cache", "sm_deploy")
+    )
+
+
+def _credential_identity() -> str:
+    """
+    当前凭证的标识（Access Key ID 的哈希）
+
+    缓存中的 account_id 和由它构建的 Role ARN 取决于凭证所属账号；环境变量 /
+    实例角色凭证不体现在 AWS_PROFILE 中，需按凭证区分缓存。临时凭证轮换后
+    Access Key 变化，缓存随之失效。
+    """
+    try:
+        credentials = get_credentials()
+        access_key = credentials.access_key if credentials is not None else None
+    except Exception:
+        access_key = None
+    if not access_key:
+        return "anonymous"
+    return hashlib.sha256(access_key.encode("utf-8")).hexdigest()[:16]
+
+
+def _discovery_cache_path(need_domain: bool, need_profile: bool) -> str:
+    """
+    发现结果缓存文件
+
+    按 Region / AWS Profile / 凭证 / Domain / User Profile 区分，并区分本次需要
+    发现的部分（只发现 Account ID 的进程也能复用缓存）。
+    """
+    key = "-".join(
+        [
+            _get_region(),
+            os.environ.get("AWS_PROFILE", "default"),
+            _credential_identity(),
+            os.environ.get("DOMAIN_ID", "any"),
+            os.environ.get("USER_PROFILE_NAME", "none"),
+            f"d{int(need_domain)}p{int(need_profile)}",
+        ]
+    )
+    key = re.sub(r"[^A-Za-z0-9_.-]", "_", key)
+    return os.path.join(_get_cache_dir(), f"discovery-{key}.json")
+
+
+def _load_discovery_cache(path: str) -> Optional[dict]:
+    """读取未过期的发现结果"""
+    try:
+        with open(path) as f:
+            cached = json.load(f)
+    except (OSError, ValueError):
+        return None
+
+    if time.time() - cached.get("timestamp", 0) > _DISCOVERY_TTL:
+        return None
+    return cached
+
+
+def _save_discovery_cache(path: str, discovered: dict):
+    """原子写入发现结果（写入失败不影响主流程）"""
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(dict(discovered, timestamp=time.time()), f)
+        os.replace(tmp_path, path)
+    except OSError:
+        pass
+
+
+def _discover(need_domain: bool, need_profile: bool, refresh: bool = False) -> dict:
+    """
+    执行自动发现（Account ID / Domain / User Profile 并行调用）
+
+    结果按需要发现的部分写入磁盘缓存，TTL 内的后续进程直接复用。
+
+    Args:
+        need_domain: 是否需要 Domain 的 VPC 配置
+        need_profile: 是否需要 User Profile 的 Team/Project
+        refresh: 忽略缓存，强制重新发现
+
+    Returns:
+        {"account_id": ..., "domain": {...}, "profile": {...}}
+    """
+    path = _discovery_cache_path(need_domain, need_profile)
+    if not refresh:
+        cached = _load_discovery_cache(path)
+        if cached is not None:
+            return cached
+    else:
+        _account_ids.clear()
+
+    with ThreadPoolExecutor(max_workers=3) as pool:
+        account_future = pool.submit(_get_account_id)
+        domain_future = pool.submit(_discover_from_domain) if need_domain else None
+        profile_future = pool.submit(_discover_from_user_profile) if need_profile else None
+
+        discovered = {
+            "account_id": account_future.result(),
+            "domain": domain_future.result() if domain_future else {},
+            "profile": profile_future.result() if profile_future else {},
+        }
+
+    # 只缓存完整的结果: 每个需要发现的部分都有结果（避免缓存临时失败）
+    if (
+        discovered["account_id"]
+        and (discovered["domain"] or not need_domain)
+        and (discovered["profile"] or not need_profile)
+    ):
+        _save_discovery_cache(path, discovered)
+
+    return discovered
+
+
+def clear_config_cache(disk: bool = False):
+    """
+    清除配置缓存
+
+    Args:
+        disk: 是否同时删除磁盘上的发现结果缓存
+    """
+    with _config_lock:
+        _config_cache.clear()
+    _account_ids.clear()
+    _regions.clear()
+
+    if disk:
+        for need_domain in (False, True):
+            for need_profile in (False, True):
+                try:
+                    os.remove(_discovery_cache_path(need_domain, need_profile))
+                except OSError:
+                    pass
+
+
 def _format_name(name: str) -> str:
     """格式化名称：kebab-case -> PascalCase"""
     return "".join(word.capitalize() for word in name.replace("_", "-").split("-"))
 
 
-@lru_cache(maxsize=1)
 def get_config(
     company: Optional[str] = None,
     team: Optional[str] = None,
     project: Optional[str] = None,
+    refresh: bool = False,
 ) -> DeployConfig:
     """
     获取部署配置（自动发现 + 环境变量 + 参数覆盖）
 
     优先级: 参数 > 环境变量 > 自动发现
 
+    结果按 (参数, 相关环境变量) 缓存在内存中（LRU），多个 team/project
+    交替使用时不会重复发现；发现结果另有磁盘缓存（SM_DEPLOY_DISCOVERY_TTL 秒）。
+
     Args:
         company: 公司名称（覆盖环境变量）
         team: 团队 ID（覆盖环境变量）
         project: 项目名称（覆盖环境变量）
+        refresh: 忽略内存和磁盘缓存，重新发现
 
     Returns:
         DeployConfig 实例
@@ -194,18 +379,65 @@ def get_config(
         config = get_config()
         # 或指定参数
         config = get_config(team="rc", project="fraud-detection")
+        # 强制刷新
+        config = get_config(refresh=True)
     """
+    env_key = tuple(
+        sorted(
+            (k, v)
+            for k, v in os.environ.items()
+            if k in _CONFIG_ENV_KEYS or (k.startswith("TEAM_") and k.endswith("_FULLNAME"))
+        )
+    )
+    cache_key = (company, team, project, env_key)
+
+    with _config_lock:
+        if not refresh and cache_key in _config_cache:
+            _config_cache.move_to_end(cache_key)
+            return _config_cache[cache_key]
+
+    config = _build_config(company, team, project, refresh)
+
+    with _config_lock:
+        _config_cache[cache_key] = config
+        while len(_config_cache) > _CONFIG_CACHE_SIZE:
+            _config_cache.popitem(last=False)
+    return config
+
+
+# 兼容旧的 lru_cache 接口
+get_config.cache_clear = clear_config_cache
+
+
+def _build_config(
+    company: Optional[str],
+    team: Optional[str],
+    project: Optional[str],
+    refresh: bool,
+) -> DeployConfig:
+    """构建 DeployConfig（get_config 的无缓存实现）"""
+
+    # 1. 自动发现（环境变量已完整提供的部分跳过对应 API 调用）
+    need_domain = not (
+        os.environ.get("VPC_ID")
+        and (os.environ.get("PRIVATE_SUBNET_1_ID") or os.environ.get("PRIVATE_SUBNET_2_ID"))
+        and os.environ.get("SG_SAGEMAKER_STUDIO")
+    )
+    # User Profile 只能在 Studio 环境（有 DOMAIN_ID / USER_PROFILE_NAME）中发现
+    need_profile = not (team and project) and bool(
+        os.environ.get("DOMAIN_ID") and os.environ.get("USER_PROFILE_NAME")
+    )
 
-    # 1. 自动发现
-    domain_config = _discover_from_domain()
-    profile_config = _discover_from_user_profile()
+    discovered = _discover(need_domain, need_profile, refresh)
+    domain_config = discovered["domain"]
+    profile_config = discovered["profile"]
 
     # 2. 获取基础信息
     _company = company or _get_env_or_default("COMPANY", "acme")
     _team = team or profile_config.get("team") or _get_env_or_raise("TEAM")
     _project = project or profile_config.get("project") or _get_env_or_raise("PROJECT")
     _region = _get_region()
-    _account_id = _get_account_id()
+    _account_id = discovered["account_id"]
 
     # 3. 获取 VPC 配置
     _vpc_id = (
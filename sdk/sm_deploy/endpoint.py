@@ -4,22 +4,43 @@
 # Endpoint 创建、更新、删除、调用
 # =============================================================================
 
-import boto3
-import json
+import dataclasses
+import functools
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait as futures_wait
 from datetime import datetime
-from typing import Optional, List, Dict, Any, Union
+from typing import Optional, List, Dict, Any, Union, Callable, Deque, Set, Tuple
 from .config import get_config, DeployConfig
+from .clients import get_client
+from .serializers import serialize, deserialize, body_to_bytes
+from .cache import PredictionCache, invalidate_endpoint_caches
+from .streaming import ResponseStream
+from .async_inference import build_async_inference_config
+from .variants import VariantSpec, build_production_variants
+from .autoscaling import remove_autoscaling
+from .serverless import build_serverless_config, get_cold_start_detector
+from .ratelimit import get_limiter, classify_error, THROTTLE, TRANSIENT
+from . import metrics
+from .poller import get_poller
 
 
 def create_endpoint_config(
     config_name: str,
-    model_name: str,
+    model_name: str = None,
     instance_type: str = "ml.t2.medium",
     instance_count: int = 1,
     config: DeployConfig = None,
     serverless: bool = False,
     serverless_memory_mb: int = 2048,
     serverless_max_concurrency: int = 5,
+    serverless_provisioned_concurrency: int = None,
+    async_inference: bool = False,
+    async_output_s3_uri: str = None,
+    async_max_concurrent_invocations: int = None,
+    variants: List[VariantSpec] = None,
+    shadow_variants: List[VariantSpec] = None,
 ) -> str:
     """
     创建 EndpointConfig
@@ -33,28 +54,54 @@ def create_endpoint_config(
         serverless: 是否 Serverless
         serverless_memory_mb: Serverless 内存
         serverless_max_concurrency: Serverless 并发
+        serverless_provisioned_concurrency: Serverless 预置并发（常驻热容器数，减少冷启动）
+        async_inference: 是否异步推理 Endpoint（AsyncInferenceConfig，见 async_inference.py）
+        async_output_s3_uri: 异步推理结果目录（默认 s3://{bucket}/{output_prefix}/async/{model}/）
+        async_max_concurrent_invocations: 异步推理每个实例的并发请求数
+        variants: 多个生产变体（VariantSpec，见 variants.py；传入时忽略 model_name 和实例参数）
+        shadow_variants: 影子变体（复制 weight 比例的生产流量，响应被丢弃）
 
     Returns:
         完整配置名称
+
+    Example:
+        create_endpoint_config("xgb-ab", variants=[
+            VariantSpec("current", "xgb-v1", "ml.c5.xlarge", instance_count=2, weight=0.9),
+            VariantSpec("compiled", "xgb-v1-neo", "ml.c5.large", instance_count=2, weight=0.1),
+        ])
     """
     if config is None:
         config = get_config()
 
-    sm = boto3.client("sagemaker", region_name=config.region)
+    sm = get_client("sagemaker", config.region)
     prefix = config.get_endpoint_name_prefix()
 
     full_config_name = f"{prefix}-{config_name}"
-    full_model_name = model_name if model_name.startswith(prefix) else f"{prefix}-{model_name}"
-
-    if serverless:
+    if model_name is not None:
+        full_model_name = model_name if model_name.startswith(prefix) else f"{prefix}-{model_name}"
+
+    if serverless and async_inference:
+        raise ValueError("Async inference requires a single-model real-time variant")
+    if variants is None and model_name is None:
+        raise ValueError("model_name or variants is required")
+
+    if variants is not None:
+        production_variants = build_production_variants(variants, prefix)
+        if not production_variants:
+            raise ValueError("variants must not be empty")
+        if async_inference and len(production_variants) > 1:
+            raise ValueError("Async inference requires a single-model real-time variant")
+        full_model_name = production_variants[0]["ModelName"]
+    elif serverless:
         production_variants = [
             {
                 "VariantName": "AllTraffic",
                 "ModelName": full_model_name,
-                "ServerlessConfig": {
-                    "MemorySizeInMB": serverless_memory_mb,
-                    "MaxConcurrency": serverless_max_concurrency,
-                },
+                "ServerlessConfig": build_serverless_config(
+                    serverless_memory_mb,
+                    serverless_max_concurrency,
+                    serverless_provisioned_concurrency,
+                ),
             }
         ]
     else:
@@ -68,11 +115,27 @@ def create_endpoint_config(
             }
         ]
 
-    sm.create_endpoint_config(
-        EndpointConfigName=full_config_name,
-        ProductionVariants=production_variants,
-        Tags=config.get_default_tags(),
-    )
+    params = {
+        "EndpointConfigName": full_config_name,
+        "ProductionVariants": production_variants,
+        "Tags": config.get_default_tags(),
+    }
+    if shadow_variants:
+        shadows = build_production_variants(shadow_variants, prefix)
+        names = {v["VariantName"] for v in production_variants}
+        overlap = names & {v["VariantName"] for v in shadows}
+        if overlap:
+            raise ValueError(f"Shadow variant names overlap production variants: {sorted(overlap)}")
+        params["ShadowProductionVariants"] = shadows
+    if async_inference:
+        params["AsyncInferenceConfig"] = build_async_inference_config(
+            full_model_name,
+            config,
+            output_s3_uri=async_output_s3_uri,
+            max_concurrent_invocations=async_max_concurrent_invocations,
+        )
+
+    sm.create_endpoint_config(**params)
 
     print(f"✅ EndpointConfig created: {full_config_name}")
     return full_config_name
@@ -99,7 +162,7 @@ def create_endpoint(
     if config is None:
         config = get_config()
 
-    sm = boto3.client("sagemaker", region_name=config.region)
+    sm = get_client("sagemaker", config.region)
     prefix = config.get_endpoint_name_prefix()
 
     full_endpoint_name = f"{prefix}-{endpoint_name}"
@@ -119,11 +182,7 @@ def create_endpoint(
 
     if wait:
         print("⏳ Waiting for endpoint to be InService...")
-        waiter = sm.get_waiter("endpoint_in_service")
-        waiter.wait(
-            EndpointName=full_endpoint_name,
-            WaiterConfig={"Delay": 30, "MaxAttempts": 60},
-        )
+        get_poller(config).wait_endpoint(full_endpoint_name, timeout=1800)
         print(f"✅ Endpoint is InService: {full_endpoint_name}")
 
     return full_endpoint_name
@@ -150,7 +209,7 @@ def update_endpoint(
     if config is None:
         config = get_config()
 
-    sm = boto3.client("sagemaker", region_name=config.region)
+    sm = get_client("sagemaker", config.region)
     prefix = config.get_endpoint_name_prefix()
 
     full_endpoint_name = (
@@ -166,16 +225,13 @@ def update_endpoint(
         EndpointName=full_endpoint_name,
         EndpointConfigName=full_config_name,
     )
+    invalidate_endpoint_caches(full_endpoint_name)
 
     print(f"✅ Endpoint updating: {full_endpoint_name}")
 
     if wait:
         print("⏳ Waiting for endpoint update...")
-        waiter = sm.get_waiter("endpoint_in_service")
-        waiter.wait(
-            EndpointName=full_endpoint_name,
-            WaiterConfig={"Delay": 30, "MaxAttempts": 60},
-        )
+        get_poller(config).wait_endpoint(full_endpoint_name, timeout=1800)
         print(f"✅ Endpoint updated: {full_endpoint_name}")
 
     return full_endpoint_name
@@ -202,7 +258,7 @@ def delete_endpoint(
     if config is None:
         config = get_config()
 
-    sm = boto3.client("sagemaker", region_name=config.region)
+    sm = get_client("sagemaker", config.region)
     prefix = config.get_endpoint_name_prefix()
 
     full_endpoint_name = (
@@ -214,8 +270,15 @@ def delete_endpoint(
         endpoint_info = sm.describe_endpoint(EndpointName=full_endpoint_name)
         config_name = endpoint_info["EndpointConfigName"]
 
+        # 注销扩缩容目标（否则策略和告警会残留）
+        try:
+            remove_autoscaling(full_endpoint_name, config=config)
+        except Exception as e:
+            print(f"⚠️  Failed to remove autoscaling: {e}")
+
         # 删除 Endpoint
         sm.delete_endpoint(EndpointName=full_endpoint_name)
+        invalidate_endpoint_caches(full_endpoint_name)
         print(f"✅ Endpoint deleted: {full_endpoint_name}")
 
         # 删除 EndpointConfig
@@ -250,65 +313,247 @@ def delete_endpoint(
 
 def invoke_endpoint(
     endpoint_name: str,
-    data: Union[dict, list, str],
+    data: Any,
     content_type: str = "application/json",
     accept: str = "application/json",
     config: DeployConfig = None,
+    cache: PredictionCache = None,
+    target_model: Optional[str] = None,
+    retry: bool = True,
+    idempotent: bool = True,
+    target_variant: Optional[str] = None,
 ) -> Any:
     """
     调用 Endpoint 进行推理
 
     Args:
         endpoint_name: Endpoint 名称
-        data: 输入数据
+        data: 输入数据（按 content_type 序列化，见 serializers.py）
         content_type: 请求 Content-Type
         accept: 响应 Accept
         config: 部署配置
+        cache: 推理结果缓存（默认不缓存）
+        target_model: 多模型 Endpoint 的目标模型（相对 S3 前缀的路径，如 "customer-42.tar.gz"）
+        retry: 是否自动重试（限流总是可重试，见 ratelimit.py）
+        idempotent: 请求是否幂等（False 时 5xx / 连接错误不重试）
+        target_variant: 指定生产变体（绕过权重路由，用于按变体对比）
 
     Returns:
-        推理结果
+        推理结果（按 accept 反序列化）
+
+    所有调用经过该 Endpoint 的共享限流器（令牌桶 + AIMD 并发 + 带预算的抖动重试），
+    可用 configure_limiter() 调整参数、limiter_stats() 查看计数。
 
     Example:
         result = invoke_endpoint(
             endpoint_name="sklearn-v1",
             data={"instances": [[1.0, 2.0, 3.0]]}
         )
+
+        # NumPy 数组以 .npy 二进制发送，响应直接解码为数组
+        scores = invoke_endpoint(
+            endpoint_name="sklearn-v1",
+            data=features,
+            content_type="application/x-npy",
+            accept="application/x-npy",
+        )
     """
     if config is None:
         config = get_config()
 
-    runtime = boto3.client("sagemaker-runtime", region_name=config.region)
+    runtime = get_client("sagemaker-runtime", config.region)
     prefix = config.get_endpoint_name_prefix()
 
     full_endpoint_name = (
         endpoint_name if endpoint_name.startswith(prefix) else f"{prefix}-{endpoint_name}"
     )
 
-    # 序列化输入
-    if isinstance(data, (dict, list)):
-        body = json.dumps(data)
-    else:
-        body = data
-
-    response = runtime.invoke_endpoint(
-        EndpointName=full_endpoint_name,
-        ContentType=content_type,
-        Accept=accept,
-        Body=body,
-    )
+    # 统计冷启动时（见 serverless.track_cold_starts）也需要计时
+    detector = get_cold_start_detector(full_endpoint_name)
+    timed = metrics.metrics_enabled() or detector is not None
+    if timed:
+        started_at = time.perf_counter()
+
+    body = serialize(data, content_type)
+    if timed:
+        serialized_at = time.perf_counter()
+        metrics.observe(
+            "invoke_latency_seconds", serialized_at - started_at,
+            endpoint=full_endpoint_name, phase="serialize",
+        )
 
-    result = response["Body"].read().decode("utf-8")
+    cache_key = None
+    if cache is not None:
+        body = body_to_bytes(body)
+        config_name = cache.get_config_name(
+            full_endpoint_name,
+            lambda name: get_client("sagemaker", config.region).describe_endpoint(
+                EndpointName=name
+            ),
+        )
+        cache_key = cache.make_key(
+            full_endpoint_name, config_name, content_type, accept, body, target_model, target_variant
+        )
+        cached = cache.get(cache_key)
+        metrics.increment(
+            "cache_requests_total", endpoint=full_endpoint_name,
+            result="miss" if cached is None else "hit",
+        )
+        if cached is not None:
+            return deserialize(cached, accept)
+
+    invoke_params = {
+        "EndpointName": full_endpoint_name,
+        "ContentType": content_type,
+        "Accept": accept,
+        "Body": body,
+    }
+    if target_model:
+        invoke_params["TargetModel"] = target_model
+    if target_variant:
+        invoke_params["TargetVariant"] = target_variant
+
+    send = _rewinding(runtime.invoke_endpoint, body)
+    if timed:
+        # 网络耗时从缓存查询之后开始计；冷启动判定只用最后一次尝试的耗时，
+        # 不含限流排队和重试退避
+        sent_at = time.perf_counter()
+        attempt_at = [sent_at]
+        send = _attempt_timed(send, attempt_at)
 
-    # 尝试解析 JSON
-    if accept == "application/json":
-        try:
-            return json.loads(result)
-        except json.JSONDecodeError:
-            return result
+    try:
+        response = get_limiter(full_endpoint_name, config.region).call(
+            send,
+            idempotent=idempotent,
+            retry=retry,
+            **invoke_params,
+        )
+    except Exception as e:
+        metrics.increment("errors_total", operation="invoke_endpoint", kind=classify_error(e))
+        raise
 
+    if cache_key is None and not timed:
+        return deserialize(response["Body"], accept)
+
+    # 缓存或计时时先读完响应体，网络耗时不计入反序列化
+    raw = response["Body"].read()
+    received_at = time.perf_counter()
+    if cache_key is not None:
+        cache.put(cache_key, full_endpoint_name, raw)
+    if not timed:
+        return deserialize(raw, accept)
+
+    result = deserialize(raw, accept)
+    finished_at = time.perf_counter()
+    if detector is not None:
+        detector.record(received_at - attempt_at[0])
+    for phase, seconds in (
+        ("network", received_at - sent_at),
+        ("deserialize", finished_at - received_at),
+        ("total", finished_at - started_at),
+    ):
+        metrics.observe("invoke_latency_seconds", seconds, endpoint=full_endpoint_name, phase=phase)
     return result
 
 
+def _attempt_timed(fn: Callable, attempt_at: List[float]) -> Callable:
+    """记录每次尝试的发出时刻（重试时覆盖，最终保留最后一次）"""
+
+    def call(**kwargs):
+        attempt_at[0] = time.perf_counter()
+        return fn(**kwargs)
+
+    return call
+
+
+def _rewinding(fn: Callable, body: Any) -> Callable:
+    """重试前把文件对象请求体（如 NpyBody）复位到起始位置"""
+    if not hasattr(body, "seek"):
+        return fn
+    position = body.tell()
+
+    def call(**kwargs):
+        body.seek(position)
+        return fn(**kwargs)
+
+    return call
+
+
+def invoke_endpoint_stream(
+    endpoint_name: str,
+    data: Any,
+    content_type: str = "application/json",
+    accept: str = "application/json",
+    decode: str = "bytes",
+    config: DeployConfig = None,
+    target_variant: Optional[str] = None,
+    inference_component: Optional[str] = None,
+) -> ResponseStream:
+    """
+    流式调用 Endpoint（InvokeEndpointWithResponseStream）
+
+    容器需要支持流式响应（如 LLM 容器的 token 流）。返回的 ResponseStream
+    按需读取，每收到一个分片就能处理，不必等待完整响应。
+
+    Args:
+        endpoint_name: Endpoint 名称
+        data: 输入数据（按 content_type 序列化，见 serializers.py）
+        content_type: 请求 Content-Type
+        accept: 响应 Accept
+        decode: 解码方式 bytes / text / lines / jsonlines（见 streaming.py）
+        config: 部署配置
+        target_variant: 指定生产变体
+        inference_component: 指定推理组件
+
+    Returns:
+        ResponseStream（可迭代；time_to_first_byte 记录首字节时间）
+
+    Example:
+        with invoke_endpoint_stream(
+            "llm-v1", {"inputs": "Hello", "parameters": {"max_new_tokens": 64}},
+            decode="jsonlines",
+        ) as stream:
+            for event in stream:
+                print(event["token"]["text"], end="", flush=True)
+        print(f"TTFB: {stream.time_to_first_byte * 1000:.0f} ms")
+    """
+    if config is None:
+        config = get_config()
+
+    runtime = get_client("sagemaker-runtime", config.region)
+    prefix = config.get_endpoint_name_prefix()
+
+    full_endpoint_name = (
+        endpoint_name if endpoint_name.startswith(prefix) else f"{prefix}-{endpoint_name}"
+    )
+
+    invoke_params = {
+        "EndpointName": full_endpoint_name,
+        "ContentType": content_type,
+        "Accept": accept,
+        "Body": serialize(data, content_type),
+    }
+    if target_variant:
+        invoke_params["TargetVariant"] = target_variant
+    if inference_component:
+        invoke_params["InferenceComponentName"] = inference_component
+
+    started_at = time.perf_counter()
+    response = get_limiter(full_endpoint_name, config.region).call(
+        _rewinding(runtime.invoke_endpoint_with_response_stream, invoke_params["Body"]),
+        **invoke_params,
+    )
+    events = response["Body"]
+
+    return ResponseStream(
+        events,
+        decode=decode,
+        content_type=response.get("ContentType"),
+        started_at=started_at,
+        on_close=events.close,
+    )
+
+
 def describe_endpoint(endpoint_name: str, config: DeployConfig = None) -> Dict[str, Any]:
     """
     获取 Endpoint 详情
@@ -323,7 +568,7 @@ def describe_endpoint(endpoint_name: str, config: DeployConfig = None) -> Dict[s
     if config is None:
         config = get_config()
 
-    sm = boto3.client("sagemaker", region_name=config.region)
+    sm = get_client("sagemaker", config.region)
     prefix = config.get_endpoint_name_prefix()
 
     full_endpoint_name = (
@@ -346,7 +591,7 @@ def list_endpoints(config: DeployConfig = None) -> List[Dict[str, Any]]:
     if config is None:
         config = get_config()
 
-    sm = boto3.client("sagemaker", region_name=config.region)
+    sm = get_client("sagemaker", config.region)
     prefix = config.get_endpoint_name_prefix()
 
     endpoints = []
@@ -366,3 +611,298 @@ def list_endpoints(config: DeployConfig = None) -> List[Dict[str, Any]]:
     return endpoints
 
 
+
+
+# =============================================================================
+# 多副本负载均衡 (EndpointGroup)
+# =============================================================================
+
+def _is_endpoint_failure(error: BaseException) -> bool:
+    """限流、5xx 和连接错误计入熔断；4xx 请求错误（含 424 ModelError）不计入"""
+    return classify_error(error) in (THROTTLE, TRANSIENT)
+
+
+class _Replica:
+    """EndpointGroup 中单个 Endpoint 的状态"""
+
+    def __init__(self, name: str, invoke: Callable[[Any], Any], window: int):
+        self.name = name
+        self.invoke = invoke
+        self.outstanding = 0
+        self.ewma: Optional[float] = None
+        self.latencies: Deque[float] = deque(maxlen=window)
+        self.requests = 0
+        self.failures = 0
+        self.consecutive_failures = 0
+        self.ejected_until = 0.0
+        self.probing = False
+
+
+class EndpointGroup:
+    """
+    多个副本 Endpoint（跨 Region / AZ 部署的同一模型）的客户端负载均衡
+
+    - 选择: 在健康的 Endpoint 中选在途请求最少的，相同时选延迟 EWMA 最低的
+    - 对冲: 请求超过该 Endpoint 的 p95 延迟仍未返回时，向另一个 Endpoint 发送副本，
+      取先返回的结果
+    - 熔断: 连续 failure_threshold 次限流 / 5xx / 连接错误后摘除 eject_seconds 秒，
+      到期后放行一个探测请求，成功则恢复
+    - 故障转移: 上述错误会立即改发到其它 Endpoint（不在同一 Endpoint 上重试）；
+      其它错误（如 4xx）直接抛出
+
+    Example:
+        group = EndpointGroup(["sklearn-v1", ("sklearn-v1", "us-west-2")])
+        result = group.invoke({"instances": [[1, 2, 3]]})
+        print(group.stats())
+    """
+
+    def __init__(
+        self,
+        endpoints: List[Union[str, Tuple[str, str]]],
+        config: DeployConfig = None,
+        content_type: str = "application/json",
+        accept: str = "application/json",
+        hedge: bool = True,
+        hedge_percentile: float = 0.95,
+        min_hedge_delay_ms: float = 10.0,
+        max_hedges: int = 1,
+        failure_threshold: int = 3,
+        eject_seconds: float = 30.0,
+        ewma_alpha: float = 0.2,
+        latency_window: int = 200,
+        max_workers: int = 64,
+        invoke_fn: Callable[[str, Any], Any] = None,
+    ):
+        """
+        Args:
+            endpoints: Endpoint 名称，或 (名称, Region) 表示其它 Region 的副本
+            config: 部署配置（默认自动获取）
+            content_type: 请求 Content-Type
+            accept: 响应 Accept
+            hedge: 是否发送对冲请求
+            hedge_percentile: 对冲延迟取该 Endpoint 延迟的分位数
+            min_hedge_delay_ms: 对冲延迟下限（样本不足时也使用该值）
+            max_hedges: 每个请求最多的对冲副本数
+            failure_threshold: 连续失败多少次后摘除
+            eject_seconds: 摘除时长（秒）
+            ewma_alpha: 延迟 EWMA 平滑系数
+            latency_window: 计算分位数的最近样本数
+            max_workers: 发送请求的线程数
+            invoke_fn: 自定义调用函数 (endpoint_name, data) -> result（默认 invoke_endpoint）
+        """
+        if not endpoints:
+            raise ValueError("EndpointGroup requires at least one endpoint")
+
+        self.hedge = hedge
+        self.hedge_percentile = hedge_percentile
+        self.min_hedge_delay = min_hedge_delay_ms / 1000.0
+        self.max_hedges = max_hedges
+        self.failure_threshold = failure_threshold
+        self.eject_seconds = eject_seconds
+        self.ewma_alpha = ewma_alpha
+
+        if invoke_fn is None:
+            config = config or get_config()
+
+        self._replicas: List[_Replica] = []
+        for entry in endpoints:
+            name, region = (entry, None) if isinstance(entry, str) else entry
+            if invoke_fn is not None:
+                invoke = functools.partial(invoke_fn, name)
+            else:
+                replica_config = dataclasses.replace(config, region=region) if region else config
+                invoke = functools.partial(
+                    invoke_endpoint,
+                    name,
+                    content_type=content_type,
+                    accept=accept,
+                    config=replica_config,
+                    retry=False,
+                )
+            label = f"{name}@{region}" if region else name
+            self._replicas.append(_Replica(label, invoke, latency_window))
+
+        self._lock = threading.Lock()
+        self._max_workers = max_workers
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="sm-deploy-group")
+        # submit() 的 invoke 会阻塞等待 _call，二者不能共用线程池（否则 invoke 占满线程后死锁）
+        self._dispatcher: Optional[ThreadPoolExecutor] = None
+
+    # -------------------------------------------------------------------------
+    # 选择与统计
+    # -------------------------------------------------------------------------
+
+    def _pick(self, exclude: Set[int]) -> Optional[int]:
+        """选择一个 Endpoint（调用方持有锁）；全部被摘除时返回最早到期的作为探测"""
+        now = time.monotonic()
+        healthy, probes = [], []
+        for index, replica in enumerate(self._replicas):
+            if index in exclude:
+                continue
+            if replica.ejected_until <= now and not replica.probing:
+                healthy.append(index)
+            elif not replica.probing:
+                probes.append(index)
+
+        if healthy:
+            index = min(
+                healthy,
+                key=lambda i: (self._replicas[i].outstanding, self._replicas[i].ewma or 0.0),
+            )
+        elif probes:
+            index = min(probes, key=lambda i: self._replicas[i].ejected_until)
+        else:
+            return None
+
+        replica = self._replicas[index]
+        if replica.ejected_until:
+            # 摘除到期（或全部被摘除）: 只放行一个探测请求
+            replica.probing = True
+        replica.outstanding += 1
+        replica.requests += 1
+        return index
+
+    def _hedge_delay(self, index: int) -> float:
+        replica = self._replicas[index]
+        with self._lock:
+            samples = sorted(replica.latencies)
+        if len(samples) < 20:
+            return self.min_hedge_delay
+        position = min(len(samples) - 1, int(self.hedge_percentile * len(samples)))
+        return max(self.min_hedge_delay, samples[position])
+
+    def _call(self, index: int, data: Any) -> Any:
+        replica = self._replicas[index]
+        start = time.perf_counter()
+        try:
+            result = replica.invoke(data)
+        except BaseException as e:
+            with self._lock:
+                replica.outstanding -= 1
+                replica.probing = False
+                if _is_endpoint_failure(e):
+                    replica.failures += 1
+                    replica.consecutive_failures += 1
+                    if replica.consecutive_failures >= self.failure_threshold or replica.ejected_until:
+                        replica.ejected_until = time.monotonic() + self.eject_seconds
+                        print(f"⚠️  Endpoint ejected for {self.eject_seconds:.0f}s: {replica.name}: {e}")
+            raise
+
+        latency = time.perf_counter() - start
+        with self._lock:
+            replica.outstanding -= 1
+            replica.probing = False
+            replica.consecutive_failures = 0
+            replica.ejected_until = 0.0
+            replica.latencies.append(latency)
+            replica.ewma = latency if replica.ewma is None else (
+                self.ewma_alpha * latency + (1 - self.ewma_alpha) * replica.ewma
+            )
+        return result
+
+    def _submit(self, exclude: Set[int], data: Any) -> Optional[Tuple[Future, int]]:
+        with self._lock:
+            index = self._pick(exclude)
+        if index is None:
+            return None
+        exclude.add(index)
+        return self._executor.submit(self._call, index, data), index
+
+    # -------------------------------------------------------------------------
+    # 公共接口
+    # -------------------------------------------------------------------------
+
+    def invoke(self, data: Any, timeout: Optional[float] = None) -> Any:
+        """
+        调用一个副本（必要时对冲 / 故障转移），返回最先成功的结果
+
+        Args:
+            data: 输入数据
+            timeout: 整体超时（秒）
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        tried: Set[int] = set()
+        running: Dict[Future, int] = {}
+        hedges = 0
+        last_error: Optional[BaseException] = None
+
+        first = self._submit(tried, data)
+        if first is None:
+            raise RuntimeError("No endpoint available in EndpointGroup")
+        running[first[0]] = first[1]
+        hedge_at = time.monotonic() + self._hedge_delay(first[1])
+
+        while running:
+            now = time.monotonic()
+            can_hedge = self.hedge and hedges < self.max_hedges and len(tried) < len(self._replicas)
+            wait_for = max(0.0, hedge_at - now) if can_hedge else None
+            if deadline is not None:
+                remaining = max(0.0, deadline - now)
+                wait_for = remaining if wait_for is None else min(wait_for, remaining)
+
+            done, _ = futures_wait(list(running), timeout=wait_for, return_when=FIRST_COMPLETED)
+
+            for future in done:
+                running.pop(future)
+                error = future.exception()
+                if error is None:
+                    return future.result()
+                if not _is_endpoint_failure(error):
+                    raise error
+                last_error = error
+                failover = self._submit(tried, data)
+                if failover is not None:
+                    running[failover[0]] = failover[1]
+
+            if done:
+                continue
+            if deadline is not None and time.monotonic() >= deadline:
+                raise TimeoutError(f"EndpointGroup request timed out after {timeout}s")
+            if can_hedge:
+                hedge = self._submit(tried, data)
+                hedges += 1
+                if hedge is not None:
+                    running[hedge[0]] = hedge[1]
+                    hedge_at = time.monotonic() + self._hedge_delay(hedge[1])
+
+        raise last_error
+
+    def submit(self, data: Any) -> Future:
+        """异步调用，返回 Future"""
+        with self._lock:
+            if self._dispatcher is None:
+                self._dispatcher = ThreadPoolExecutor(
+                    max_workers=self._max_workers, thread_name_prefix="sm-deploy-group-dispatch"
+                )
+            dispatcher = self._dispatcher
+        return dispatcher.submit(self.invoke, data)
+
+    def stats(self) -> List[Dict[str, Any]]:
+        """每个 Endpoint 的状态快照"""
+        now = time.monotonic()
+        with self._lock:
+            return [
+                {
+                    "endpoint": replica.name,
+                    "outstanding": replica.outstanding,
+                    "ewma_ms": replica.ewma * 1000 if replica.ewma is not None else None,
+                    "requests": replica.requests,
+                    "failures": replica.failures,
+                    "ejected": replica.ejected_until > now,
+                }
+                for replica in self._replicas
+            ]
+
+    def close(self, wait: bool = True):
+        """关闭线程池"""
+        with self._lock:
+            dispatcher = self._dispatcher
+        if dispatcher is not None:
+            dispatcher.shutdown(wait=wait)
+        self._executor.shutdown(wait=wait)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
@@ -0,0 +1,346 @@
+# =============================================================================
+# local_batch.py - 本地 Batch Transform 模拟器
+# =============================================================================
+# 按 SageMaker Batch Transform 的规则在本地执行推理，用于快速调整
+# SplitType / BatchStrategy / MaxPayloadInMB / AssembleWith（无需等待实例启动）:
+#   - 输入: 本地目录或 S3 前缀（可传入本地 S3 替身）
+#   - 切分: Line（按换行）/ RecordIO（MXNet RecordIO 记录）/ None（整个文件）
+#   - 打包: SingleRecord（每条一个请求）/ MultiRecord（在 payload 上限内尽量多装）
+#   - 推理: Python 函数（进程池）或本地容器 http://host:port/invocations（线程池）
+#   - 输出: 每个输入文件对应 {relative_path}.out，按 AssembleWith 拼接
+# =============================================================================
+
+import os
+import pickle
+import struct
+import time
+import urllib.request
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Callable, Dict, Iterator, List, Tuple, Union
+
+from .clients import get_client, split_s3_uri
+
+# MXNet RecordIO 魔数
+_RECORDIO_MAGIC = 0xCED7230A
+_RECORDIO_LENGTH_MASK = (1 << 29) - 1
+
+# Predict = (body, content_type) -> bytes 或 (bytes, content_type)，与 mock_server.default_predict 一致
+Predict = Callable[[bytes, str], Union[bytes, Tuple[bytes, str]]]
+
+
+# =============================================================================
+# 切分与打包
+# =============================================================================
+
+
+def split_records(data: bytes, split_type: str = "Line") -> List[bytes]:
+    """
+    按 SageMaker 规则切分记录
+
+    Args:
+        data: 输入文件内容
+        split_type: Line / RecordIO / None
+
+    Returns:
+        记录列表（Line 保留行尾换行，空行丢弃；RecordIO 保留记录头和填充）
+    """
+    if split_type in (None, "None"):
+        return [data] if data else []
+
+    if split_type == "Line":
+        return [line for line in data.splitlines(keepends=True) if line.strip()]
+
+    if split_type == "RecordIO":
+        return list(_split_recordio(data))
+
+    raise ValueError(f"Unsupported split_type: {split_type}")
+
+
+def _split_recordio(data: bytes) -> Iterator[bytes]:
+    """切分 MXNet RecordIO（多段记录 cflag 1/2/3 合并为一条）"""
+    offset = 0
+    start = 0
+    while offset < len(data):
+        if len(data) - offset < 8:
+            raise ValueError(f"Truncated RecordIO header at offset {offset}")
+        magic, lrecord = struct.unpack_from("<II", data, offset)
+        if magic != _RECORDIO_MAGIC:
+            raise ValueError(f"Invalid RecordIO magic at offset {offset}")
+
+        cflag = lrecord >> 29
+        length = lrecord & _RECORDIO_LENGTH_MASK
+        offset += 8 + length + (-length % 4)
+        if offset > len(data):
+            raise ValueError("Truncated RecordIO record")
+
+        # 0: 完整记录, 1: 首段, 2: 中间段, 3: 末段
+        if cflag in (0, 3):
+            yield data[start:offset]
+            start = offset
+
+
+def pack_batches(
+    records: List[bytes],
+    strategy: str = "MultiRecord",
+    max_payload_bytes: int = 6 * 1024 * 1024,
+) -> List[bytes]:
+    """
+    把记录打包成请求体
+
+    Args:
+        records: split_records 的结果
+        strategy: SingleRecord / MultiRecord
+        max_payload_bytes: 每个请求体上限（0 表示不限制）
+
+    Raises:
+        ValueError: 单条记录超过上限（SageMaker 中 Job 会失败）
+    """
+    limit = max_payload_bytes or float("inf")
+    for record in records:
+        if len(record) > limit:
+            raise ValueError(
+                f"Record of {len(record)} bytes exceeds MaxPayloadInMB ({max_payload_bytes} bytes)"
+            )
+
+    if strategy == "SingleRecord":
+        return list(records)
+    if strategy != "MultiRecord":
+        raise ValueError(f"Unsupported strategy: {strategy}")
+
+    batches = []
+    current: List[bytes] = []
+    current_size = 0
+    for record in records:
+        if current and current_size + len(record) > limit:
+            batches.append(b"".join(current))
+            current, current_size = [], 0
+        current.append(record)
+        current_size += len(record)
+    if current:
+        batches.append(b"".join(current))
+    return batches
+
+
+def assemble_outputs(responses: List[bytes], assemble_with: str = "Line") -> bytes:
+    """按 AssembleWith 拼接响应（Line: 每个响应后补换行; None: 直接拼接）"""
+    if assemble_with in (None, "None"):
+        return b"".join(responses)
+    if assemble_with == "Line":
+        return b"".join(r if r.endswith(b"\n") else r + b"\n" for r in responses)
+    raise ValueError(f"Unsupported assemble_with: {assemble_with}")
+
+
+# =============================================================================
+# 推理
+# =============================================================================
+
+# 进程池 worker 中的推理函数（通过 initializer 设置，避免每个请求都 pickle 一次）
+_worker_predict: Predict = None
+
+
+def _init_worker(predict: Predict):
+    global _worker_predict
+    _worker_predict = predict
+
+
+def _predict_in_worker(args: Tuple[bytes, str]) -> bytes:
+    return _call_predict(_worker_predict, *args)
+
+
+def _call_predict(predict: Predict, body: bytes, content_type: str) -> bytes:
+    result = predict(body, content_type)
+    return result[0] if isinstance(result, tuple) else result
+
+
+def _container_predict(url: str, accept: str, timeout: float) -> Predict:
+    """本地容器推理（SageMaker 容器约定: POST /invocations）"""
+    invocations_url = url.rstrip("/")
+    if not invocations_url.endswith("/invocations"):
+        invocations_url += "/invocations"
+
+    def predict(body: bytes, content_type: str) -> bytes:
+        request = urllib.request.Request(
+            invocations_url,
+            data=body,
+            method="POST",
+            headers={"Content-Type": content_type, "Accept": accept},
+        )
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            return response.read()
+
+    return predict
+
+
+# =============================================================================
+# 输入 / 输出
+# =============================================================================
+
+
+def _list_inputs(input_path: str, s3) -> List[Tuple[str, Callable[[], bytes]]]:
+    """[(相对路径, 读取函数)]"""
+    if input_path.startswith("s3://"):
+        bucket, prefix = split_s3_uri(input_path)
+        inputs = []
+        for page in s3.get_paginator("list_objects_v2").paginate(Bucket=bucket, Prefix=prefix):
+            for obj in page.get("Contents", []):
+                key = obj["Key"]
+                if key.endswith("/"):
+                    continue
+                relative = key[len(prefix):].lstrip("/") or os.path.basename(key)
+                inputs.append(
+                    (relative, lambda key=key: s3.get_object(Bucket=bucket, Key=key)["Body"].read())
+                )
+        return sorted(inputs, key=lambda i: i[0])
+
+    if os.path.isfile(input_path):
+        paths = [(os.path.basename(input_path), input_path)]
+    else:
+        paths = []
+        for root, _, files in os.walk(input_path):
+            for name in files:
+                path = os.path.join(root, name)
+                paths.append((os.path.relpath(path, input_path), path))
+
+    def reader(path):
+        def read():
+            with open(path, "rb") as f:
+                return f.read()
+        return read
+
+    return [(relative, reader(path)) for relative, path in sorted(paths)]
+
+
+def _write_output(output_path: str, relative: str, body: bytes, s3) -> str:
+    if output_path.startswith("s3://"):
+        bucket, prefix = split_s3_uri(output_path.rstrip("/") + "/")
+        key = f"{prefix}{relative}.out"
+        s3.put_object(Bucket=bucket, Key=key, Body=body)
+        return f"s3://{bucket}/{key}"
+
+    path = os.path.join(output_path, f"{relative}.out")
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "wb") as f:
+        f.write(body)
+    return path
+
+
+# =============================================================================
+# 主入口
+# =============================================================================
+
+
+def run_local_batch_transform(
+    input_path: str,
+    output_path: str,
+    model: Union[Predict, str],
+    content_type: str = "text/csv",
+    accept: str = "text/csv",
+    split_type: str = "Line",
+    strategy: str = "MultiRecord",
+    max_payload_mb: int = 6,
+    assemble_with: str = "Line",
+    max_concurrent_transforms: int = None,
+    use_processes: bool = None,
+    timeout: float = 60.0,
+    s3_client=None,
+    region: str = None,
+) -> Dict:
+    """
+    在本地模拟 Batch Transform
+
+    Args:
+        input_path: 本地文件/目录，或 s3:// 前缀
+        output_path: 本地目录，或 s3:// 前缀
+        model: 推理函数 (body, content_type) -> bytes，或本地容器 URL（如 http://localhost:8080）
+        content_type: 请求 Content-Type
+        accept: 请求 Accept（仅容器模式）
+        split_type: Line / RecordIO / None
+        strategy: SingleRecord / MultiRecord
+        max_payload_mb: 每个请求体上限 (MB)，0 表示不限制
+        assemble_with: Line / None
+        max_concurrent_transforms: 并发请求数（默认 CPU 核数）
+        use_processes: 是否使用进程池（默认: 推理函数用进程池，容器用线程池）。
+            进程池要求推理函数可 pickle（模块级函数）；lambda / 闭包默认回退到线程池，
+            显式 use_processes=True 时抛出 ValueError
+        timeout: 容器请求超时（秒）
+        s3_client: S3 Client（可传入本地 S3 替身）
+        region: 未传 s3_client 时使用的 Region
+
+    Returns:
+        {"files": [...], "records": ..., "requests": ..., "input_bytes": ...,
+         "output_bytes": ..., "elapsed": ..., "records_per_second": ...}
+
+    Example:
+        # 推理函数需定义在模块顶层才能在进程池中运行
+        from sm_deploy.mock_server import default_predict
+
+        stats = run_local_batch_transform(
+            "data/input/", "data/output/", default_predict,
+            strategy="MultiRecord", max_payload_mb=1,
+        )
+        print(stats["requests"], stats["records_per_second"])
+    """
+    s3 = None
+    if input_path.startswith("s3://") or output_path.startswith("s3://"):
+        s3 = s3_client or get_client("s3", region)
+
+    if isinstance(model, str):
+        predict = _container_predict(model, accept, timeout)
+        use_processes = bool(use_processes)
+    else:
+        predict = model
+        if use_processes is not False:
+            try:
+                pickle.dumps(predict)
+            except Exception as e:
+                if use_processes:
+                    raise ValueError(
+                        f"use_processes=True requires a picklable module-level predict function: {e}"
+                    ) from e
+                print(f"⚠️  Predict function is not picklable, falling back to threads: {e}")
+                use_processes = False
+        use_processes = True if use_processes is None else use_processes
+
+    workers = max_concurrent_transforms or os.cpu_count() or 1
+    max_payload_bytes = int(max_payload_mb * 1024 * 1024)
+
+    if use_processes:
+        executor = ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(predict,))
+        invoke = _predict_in_worker
+    else:
+        executor = ThreadPoolExecutor(workers)
+
+        def invoke(args):
+            return _call_predict(predict, *args)
+
+    stats = {"files": [], "records": 0, "requests": 0, "input_bytes": 0, "output_bytes": 0}
+    start = time.perf_counter()
+
+    with executor:
+        for relative, read in _list_inputs(input_path, s3):
+            data = read()
+            records = split_records(data, split_type)
+            batches = pack_batches(records, strategy, max_payload_bytes)
+
+            # map 保持顺序，输出与输入记录一一对应
+            responses = list(executor.map(invoke, [(b, content_type) for b in batches]))
+            body = assemble_outputs(responses, assemble_with)
+            output = _write_output(output_path, relative, body, s3)
+
+            stats["files"].append(
+                {"input": relative, "output": output, "records": len(records), "requests": len(batches)}
+            )
+            stats["records"] += len(records)
+            stats["requests"] += len(batches)
+            stats["input_bytes"] += len(data)
+            stats["output_bytes"] += len(body)
+
+    elapsed = time.perf_counter() - start
+    stats["elapsed"] = elapsed
+    stats["records_per_second"] = stats["records"] / elapsed if elapsed > 0 else 0.0
+
+    print(
+        f"✅ Local transform: {len(stats['files'])} files, {stats['records']} records, "
+        f"{stats['requests']} requests in {elapsed:.2f}s"
+    )
+    return stats
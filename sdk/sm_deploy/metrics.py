@@ -0,0 +1,348 @@
+# =============================================================================
+# metrics.py - 耗时与计数指标
+# =============================================================================
+# sm_deploy 内部在关键路径上调用 observe() / increment() / timer():
+#   invoke_latency_seconds{endpoint, phase}   serialize / network / deserialize / total
+#   deploy_phase_seconds{model, phase}        create_model / create_endpoint_config /
+#                                             create_endpoint / time_to_in_service
+#   errors_total{operation, kind}             调用失败（kind 见 ratelimit.classify_error）
+#   invoke_retries_total / invoke_throttles_total{endpoint}
+#   cache_requests_total{endpoint, result}    hit / miss
+#   serverless_invoke_seconds{endpoint, start} cold / warm（track_cold_starts 之后）
+#   cold_starts_total{endpoint}
+#
+# 默认关闭: 关闭时每个埋点只做一次全局布尔判断。enable_metrics() 后指标
+# 同时发送给所有导出器:
+#   MetricsRegistry   进程内聚合（直方图 + 计数），可渲染 Prometheus 文本格式
+#   StatsdExporter    StatsD / DogStatsD over UDP（不阻塞、丢包不报错）
+# =============================================================================
+
+import bisect
+import socket
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+# 延迟直方图的桶上界（秒）
+DEFAULT_BUCKETS = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5,
+    1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0, 600.0, 1800.0,
+)
+
+Labels = Tuple[Tuple[str, str], ...]
+
+_enabled = False
+_exporters: List[Any] = []
+_registry: Optional["MetricsRegistry"] = None
+
+
+def _labels(labels: Dict[str, Any]) -> Labels:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+# =============================================================================
+# 进程内注册表
+# =============================================================================
+
+
+class _Histogram:
+    def __init__(self, buckets: Tuple[float, ...]):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.min = float("inf")
+        self.max = 0.0
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+
+    def quantile(self, q: float) -> float:
+        """按桶线性插值估算分位数"""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for index, count in enumerate(self.counts):
+            if seen + count >= rank and count:
+                lower = self.buckets[index - 1] if index > 0 else 0.0
+                upper = self.buckets[index] if index < len(self.buckets) else self.max
+                value = lower + (upper - lower) * (rank - seen) / count
+                return min(max(value, self.min), self.max)
+            seen += count
+        return self.max
+
+
+class MetricsRegistry:
+    """
+    进程内指标聚合
+
+    Example:
+        registry = enable_metrics()
+        invoke_endpoint("sklearn-v1", data)
+        print(registry.snapshot()["histograms"])
+        print(registry.render_prometheus())
+    """
+
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS, namespace: str = "sm_deploy"):
+        """
+        Args:
+            buckets: 直方图桶上界（秒）
+            namespace: Prometheus 指标名前缀
+        """
+        self.buckets = tuple(sorted(buckets))
+        self.namespace = namespace
+        self._lock = threading.Lock()
+        self._histograms: Dict[Tuple[str, Labels], _Histogram] = {}
+        self._counters: Dict[Tuple[str, Labels], float] = {}
+
+    def observe(self, name: str, value: float, labels: Labels):
+        with self._lock:
+            histogram = self._histograms.get((name, labels))
+            if histogram is None:
+                histogram = self._histograms[(name, labels)] = _Histogram(self.buckets)
+            histogram.observe(value)
+
+    def increment(self, name: str, value: float, labels: Labels):
+        with self._lock:
+            self._counters[(name, labels)] = self._counters.get((name, labels), 0) + value
+
+    def reset(self):
+        """清空所有指标"""
+        with self._lock:
+            self._histograms.clear()
+            self._counters.clear()
+
+    def snapshot(self) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        当前指标快照
+
+        Returns:
+            {"histograms": [{"name", "labels", "count", "sum", "min", "max", "p50", "p95", "p99"}],
+             "counters": [{"name", "labels", "value"}]}
+        """
+        with self._lock:
+            histograms = [
+                {
+                    "name": name,
+                    "labels": dict(labels),
+                    "count": h.count,
+                    "sum": h.sum,
+                    "min": h.min if h.count else 0.0,
+                    "max": h.max,
+                    "p50": h.quantile(0.50),
+                    "p95": h.quantile(0.95),
+                    "p99": h.quantile(0.99),
+                }
+                for (name, labels), h in sorted(self._histograms.items())
+            ]
+            counters = [
+                {"name": name, "labels": dict(labels), "value": value}
+                for (name, labels), value in sorted(self._counters.items())
+            ]
+        return {"histograms": histograms, "counters": counters}
+
+    def render_prometheus(self) -> str:
+        """渲染为 Prometheus 文本格式 (text/plain; version=0.0.4)"""
+
+        def fmt_labels(labels: Labels, extra: Tuple[Tuple[str, str], ...] = ()) -> str:
+            items = labels + extra
+            if not items:
+                return ""
+            escaped = (
+                k + '="' + v.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") + '"'
+                for k, v in items
+            )
+            return "{" + ",".join(escaped) + "}"
+
+        lines: List[str] = []
+        with self._lock:
+            histograms = sorted(self._histograms.items())
+            counters = sorted(self._counters.items())
+
+            typed = set()
+            for (name, labels), h in histograms:
+                full = f"{self.namespace}_{name}"
+                if full not in typed:
+                    lines.append(f"# TYPE {full} histogram")
+                    typed.add(full)
+                cumulative = 0
+                for bound, count in zip(self.buckets, h.counts):
+                    cumulative += count
+                    lines.append(f"{full}_bucket{fmt_labels(labels, (('le', repr(bound)),))} {cumulative}")
+                lines.append(f"{full}_bucket{fmt_labels(labels, (('le', '+Inf'),))} {h.count}")
+                lines.append(f"{full}_sum{fmt_labels(labels)} {h.sum}")
+                lines.append(f"{full}_count{fmt_labels(labels)} {h.count}")
+
+            for (name, labels), value in counters:
+                full = f"{self.namespace}_{name}"
+                if full not in typed:
+                    lines.append(f"# TYPE {full} counter")
+                    typed.add(full)
+                lines.append(f"{full}{fmt_labels(labels)} {value:g}")
+
+        return "\n".join(lines) + "\n"
+
+
+# =============================================================================
+# StatsD
+# =============================================================================
+
+
+class StatsdExporter:
+    """
+    StatsD / DogStatsD 导出器（UDP，发送失败静默丢弃）
+
+    *_seconds 直方图以毫秒计时 (|ms) 发送，计数以 |c 发送。
+
+    Example:
+        enable_metrics(exporters=[StatsdExporter("127.0.0.1", 8125)])
+    """
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 8125,
+        prefix: str = "sm_deploy",
+        dogstatsd_tags: bool = True,
+    ):
+        """
+        Args:
+            host: StatsD 地址
+            port: StatsD 端口
+            prefix: 指标名前缀
+            dogstatsd_tags: 是否以 |#k:v 形式附带标签（否则把标签值拼入指标名）
+        """
+        self.address = (host, port)
+        self.prefix = prefix
+        self.dogstatsd_tags = dogstatsd_tags
+        self._socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self._socket.setblocking(False)
+
+    def _format(self, name: str, value: str, kind: str, labels: Labels) -> bytes:
+        if self.dogstatsd_tags:
+            tags = "|#" + ",".join(f"{k}:{v}" for k, v in labels) if labels else ""
+            return f"{self.prefix}.{name}:{value}|{kind}{tags}".encode("utf-8")
+        suffix = "".join(f".{v}" for _, v in labels)
+        return f"{self.prefix}.{name}{suffix}:{value}|{kind}".encode("utf-8")
+
+    def _send(self, payload: bytes):
+        try:
+            self._socket.sendto(payload, self.address)
+        except OSError:
+            pass
+
+    def observe(self, name: str, value: float, labels: Labels):
+        if name.endswith("_seconds"):
+            self._send(self._format(name[: -len("_seconds")] + "_ms", f"{value * 1000:.3f}", "ms", labels))
+        else:
+            self._send(self._format(name, f"{value:g}", "h", labels))
+
+    def increment(self, name: str, value: float, labels: Labels):
+        self._send(self._format(name, f"{value:g}", "c", labels))
+
+    def close(self):
+        self._socket.close()
+
+
+# =============================================================================
+# 开关与埋点
+# =============================================================================
+
+
+def enable_metrics(exporters: List[Any] = None, registry: bool = True) -> Optional[MetricsRegistry]:
+    """
+    开启指标
+
+    Args:
+        exporters: 额外的导出器（如 StatsdExporter；需实现 observe / increment）
+        registry: 是否同时聚合到进程内 MetricsRegistry
+
+    Returns:
+        进程内 MetricsRegistry（registry=False 时为 None）
+    """
+    global _enabled, _exporters, _registry
+    _registry = MetricsRegistry() if registry else None
+    _exporters = ([_registry] if _registry is not None else []) + list(exporters or [])
+    _enabled = bool(_exporters)
+    return _registry
+
+
+def disable_metrics():
+    """关闭指标（埋点退化为一次布尔判断）"""
+    global _enabled, _exporters, _registry
+    _enabled = False
+    _exporters = []
+    _registry = None
+
+
+def metrics_enabled() -> bool:
+    return _enabled
+
+
+def get_registry() -> Optional[MetricsRegistry]:
+    """当前的进程内 MetricsRegistry（未开启时为 None）"""
+    return _registry
+
+
+def observe(name: str, value: float, **labels):
+    """记录一个观测值（耗时单位为秒，名称以 _seconds 结尾）"""
+    if not _enabled:
+        return
+    key = _labels(labels)
+    for exporter in _exporters:
+        exporter.observe(name, value, key)
+
+
+def increment(name: str, value: float = 1, **labels):
+    """计数 +value"""
+    if not _enabled:
+        return
+    key = _labels(labels)
+    for exporter in _exporters:
+        exporter.increment(name, value, key)
+
+
+class _Timer:
+    __slots__ = ("name", "labels", "start")
+
+    def __init__(self, name: str, labels: Dict[str, Any]):
+        self.name = name
+        self.labels = labels
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        observe(self.name, time.perf_counter() - self.start, **self.labels)
+
+
+class _NoopTimer:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        pass
+
+
+_NOOP_TIMER = _NoopTimer()
+
+
+def timer(name: str, **labels):
+    """
+    计时上下文管理器（关闭时返回共享的空实现）
+
+    Example:
+        with timer("deploy_phase_seconds", model=name, phase="create_model"):
+            sm.create_model(...)
+    """
+    if not _enabled:
+        return _NOOP_TIMER
+    return _Timer(name, labels)
@@ -0,0 +1,244 @@
+# =============================================================================
+# mock_server.py - 本地 Mock SageMaker Runtime
+# =============================================================================
+# 本地 HTTP 服务，模拟 POST /endpoints/{name}/invocations 和
+# POST /endpoints/{name}/invocations-response-stream（AWS event-stream 编码），
+# 用于基准测试和 CI（无需真实 Endpoint）
+# =============================================================================
+
+import json
+import struct
+import threading
+import time
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, Iterable, Optional, Tuple
+from urllib.parse import unquote
+
+
+def default_predict(body: bytes, content_type: str) -> Tuple[bytes, str]:
+    """
+    默认推理逻辑（模拟 sklearn 容器）
+
+    JSON 输入 {"instances": [[...], ...]} 返回 {"predictions": [每行求和, ...]}，
+    其他输入原样返回。
+    """
+    if content_type.startswith("application/json"):
+        data = json.loads(body.decode("utf-8") or "null")
+        if isinstance(data, dict) and "instances" in data:
+            predictions = [
+                sum(row) if isinstance(row, list) else row for row in data["instances"]
+            ]
+            return json.dumps({"predictions": predictions}).encode("utf-8"), "application/json"
+    return body, content_type
+
+
+def default_stream_predict(body: bytes, content_type: str) -> Iterable[bytes]:
+    """
+    默认流式推理逻辑（模拟 LLM 容器的 token 流）
+
+    default_predict 的结果按空格切成 token，每个 token 输出一行
+    {"token": {"text": ...}}，并故意把每行拆成两个分片，便于验证增量解码。
+    """
+    payload, _ = default_predict(body, content_type)
+    for token in payload.decode("utf-8", "replace").split(" "):
+        line = json.dumps({"token": {"text": token + " "}}).encode("utf-8") + b"\n"
+        middle = len(line) // 2
+        yield line[:middle]
+        yield line[middle:]
+
+
+def encode_event(headers: Dict[str, str], payload: bytes) -> bytes:
+    """
+    编码一条 AWS event-stream 消息
+
+    结构: total_length | headers_length | prelude_crc | headers | payload | message_crc
+    （长度为 big-endian uint32，CRC 为 CRC32，头部值均为 string 类型）
+    """
+    encoded_headers = b""
+    for name, value in headers.items():
+        name_bytes, value_bytes = name.encode("utf-8"), value.encode("utf-8")
+        encoded_headers += (
+            struct.pack("!B", len(name_bytes)) + name_bytes
+            + struct.pack("!BH", 7, len(value_bytes)) + value_bytes
+        )
+
+    total_length = 12 + len(encoded_headers) + len(payload) + 4
+    prelude = struct.pack("!II", total_length, len(encoded_headers))
+    message = prelude + struct.pack("!I", zlib.crc32(prelude)) + encoded_headers + payload
+    return message + struct.pack("!I", zlib.crc32(message))
+
+
+def _payload_part_event(chunk: bytes) -> bytes:
+    return encode_event(
+        {
+            ":event-type": "PayloadPart",
+            ":content-type": "application/octet-stream",
+            ":message-type": "event",
+        },
+        chunk,
+    )
+
+
+def _model_stream_error_event(message: str) -> bytes:
+    return encode_event(
+        {
+            ":exception-type": "ModelStreamError",
+            ":content-type": "application/json",
+            ":message-type": "exception",
+        },
+        json.dumps({"Message": message, "ErrorCode": "ModelError"}).encode("utf-8"),
+    )
+
+
+class MockEndpointServer:
+    """
+    本地 Mock Endpoint 服务
+
+    Example:
+        with MockEndpointServer(latency_ms=5) as server:
+            os.environ["AWS_ENDPOINT_URL_SAGEMAKER_RUNTIME"] = server.url
+            invoke_endpoint("sklearn-v1", {"instances": [[1, 2, 3]]}, config=config)
+    """
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        latency_ms: float = 0.0,
+        predict: Callable[[bytes, str], Tuple[bytes, str]] = None,
+        stream_predict: Callable[[bytes, str], Iterable[bytes]] = None,
+        chunk_delay_ms: float = 0.0,
+        max_concurrency: Optional[int] = None,
+    ):
+        """
+        Args:
+            host: 监听地址
+            port: 监听端口（0 表示自动分配）
+            latency_ms: 每个请求模拟的推理耗时（毫秒；流式请求为首个分片前的耗时）
+            predict: 推理函数 (body, content_type) -> (response_body, response_content_type)
+            stream_predict: 流式推理函数 (body, content_type) -> 分片迭代器
+            chunk_delay_ms: 流式响应相邻分片之间的间隔（毫秒）
+            max_concurrency: 同时处理的请求数上限（模拟实例的 worker 数，超出的请求排队；默认不限）
+        """
+        self.latency_ms = latency_ms
+        self.predict = predict or default_predict
+        self.stream_predict = stream_predict or default_stream_predict
+        self.chunk_delay_ms = chunk_delay_ms
+        self._slots = threading.Semaphore(max_concurrency) if max_concurrency else None
+        self.request_count = 0
+        self._count_lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._server = ThreadingHTTPServer((host, port), self._make_handler())
+        self._server.daemon_threads = True
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def _make_handler(self):
+        server = self
+
+        class _Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            # 响应头和响应体分两次写出，关闭 Nagle 避免与客户端延迟 ACK 叠加出 ~40ms 延迟
+            disable_nagle_algorithm = True
+
+            def log_message(self, format, *args):
+                pass
+
+            def do_POST(self):
+                parts = self.path.strip("/").split("/")
+                if (
+                    len(parts) != 3
+                    or parts[0] != "endpoints"
+                    or parts[2] not in ("invocations", "invocations-response-stream")
+                ):
+                    self._send(404, b'{"message": "Not found"}', "application/json")
+                    return
+
+                length = int(self.headers.get("Content-Length", 0))
+                body = self.rfile.read(length)
+                content_type = self.headers.get("Content-Type", "application/json")
+
+                with server._count_lock:
+                    server.request_count += 1
+
+                if server._slots is None:
+                    self._handle(parts, body, content_type)
+                    return
+                with server._slots:
+                    self._handle(parts, body, content_type)
+
+            def _handle(self, parts, body: bytes, content_type: str):
+                if server.latency_ms:
+                    time.sleep(server.latency_ms / 1000.0)
+
+                if parts[2] == "invocations-response-stream":
+                    self._stream(body, content_type)
+                    return
+
+                try:
+                    payload, response_type = server.predict(body, content_type)
+                except Exception as e:
+                    message = json.dumps({"message": f"{unquote(parts[1])}: {e}"})
+                    self._send(424, message.encode("utf-8"), "application/json", "ModelError")
+                    return
+
+                self._send(200, payload, response_type)
+
+            def _stream(self, body: bytes, content_type: str):
+                """以 chunked 编码逐个发送 PayloadPart 事件；推理出错时发送 ModelStreamError"""
+                self.send_response(200)
+                self.send_header("Content-Type", "application/vnd.amazon.eventstream")
+                self.send_header("X-Amzn-SageMaker-Content-Type", self.headers.get("Accept", content_type))
+                self.send_header("Transfer-Encoding", "chunked")
+                self.end_headers()
+
+                def write_chunk(data: bytes):
+                    self.wfile.write(f"{len(data):x}\r\n".encode("ascii") + data + b"\r\n")
+                    self.wfile.flush()
+
+                try:
+                    for index, chunk in enumerate(server.stream_predict(body, content_type)):
+                        if index and server.chunk_delay_ms:
+                            time.sleep(server.chunk_delay_ms / 1000.0)
+                        write_chunk(_payload_part_event(chunk))
+                except (BrokenPipeError, ConnectionResetError):
+                    # 客户端提前关闭流
+                    return
+                except Exception as e:
+                    write_chunk(_model_stream_error_event(str(e)))
+                write_chunk(b"")
+
+            def _send(self, status: int, payload: bytes, content_type: str, error_type: str = ""):
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(payload)))
+                if error_type:
+                    self.send_header("x-amzn-ErrorType", error_type)
+                self.end_headers()
+                self.wfile.write(payload)
+
+        return _Handler
+
+    def start(self) -> "MockEndpointServer":
+        """在后台线程启动服务"""
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """停止服务"""
+        self._server.shutdown()
+        self._server.server_close()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
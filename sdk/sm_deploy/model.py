@@ -4,10 +4,18 @@
 # 封装 SageMaker Model 创建，自动注入 VPC 配置
 # =============================================================================
 
-import boto3
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed, wait as futures_wait
 from datetime import datetime
 from typing import Optional, List, Dict, Any
 from .config import get_config, DeployConfig
+from .clients import get_client, call_with_backoff
+from .cache import invalidate_endpoint_caches
+from .poller import get_poller, ENDPOINT
+from .async_inference import build_async_inference_config
+from .autoscaling import AutoScalingSpec, configure_autoscaling, remove_autoscaling
+from .serverless import build_serverless_config
+from . import metrics
 
 
 def create_model(
@@ -17,17 +25,23 @@ def create_model(
     config: DeployConfig = None,
     environment: Dict[str, str] = None,
     enable_network_isolation: bool = False,
+    multi_model: bool = False,
+    uncompressed: bool = False,
 ) -> str:
     """
     创建 SageMaker Model（自动注入 VPC 配置）
 
     Args:
         model_name: 模型名称（不含项目前缀，会自动添加）
-        model_data_url: S3 模型文件路径 (s3://bucket/path/model.tar.gz)
-        image_uri: Docker 镜像 URI
+        model_data_url: S3 模型文件路径 (s3://bucket/path/model.tar.gz)；
+            multi_model=True 时为模型目录前缀 (s3://bucket/path/)
+        image_uri: Docker 镜像 URI（多模型需容器支持 Multi-Model Server）
         config: 部署配置（默认自动获取）
         environment: 容器环境变量
         enable_network_isolation: 是否启用网络隔离
+        multi_model: 是否创建多模型 (Mode: MultiModel) Model
+        uncompressed: model_data_url 为未压缩的模型目录前缀（CompressionType=None，
+            容器启动时无需解压，见 packaging.package_model）
 
     Returns:
         完整的模型名称
@@ -42,19 +56,37 @@ def create_model(
     if config is None:
         config = get_config()
 
-    sm = boto3.client("sagemaker", region_name=config.region)
+    sm = get_client("sagemaker", config.region)
 
     # 自动添加项目前缀（符合 IAM 策略要求）
     full_model_name = f"{config.get_model_name_prefix()}-{model_name}"
 
     # 构建 Model 参数
+    container = {
+        "Image": image_uri,
+        "ModelDataUrl": model_data_url,
+        "Environment": environment or {},
+    }
+    if multi_model and uncompressed:
+        raise ValueError("Multi-model containers require compressed model archives")
+    if multi_model:
+        # 多模型: ModelDataUrl 为 S3 前缀，调用时通过 TargetModel 指定具体模型
+        container["Mode"] = "MultiModel"
+        container["ModelDataUrl"] = model_data_url.rstrip("/") + "/"
+    elif uncompressed:
+        # 不压缩: 前缀下的文件原样下载到 /opt/ml/model
+        del container["ModelDataUrl"]
+        container["ModelDataSource"] = {
+            "S3DataSource": {
+                "S3Uri": model_data_url.rstrip("/") + "/",
+                "S3DataType": "S3Prefix",
+                "CompressionType": "None",
+            }
+        }
+
     create_params = {
         "ModelName": full_model_name,
-        "PrimaryContainer": {
-            "Image": image_uri,
-            "ModelDataUrl": model_data_url,
-            "Environment": environment or {},
-        },
+        "PrimaryContainer": container,
         "ExecutionRoleArn": config.inference_role_arn,
         "Tags": config.get_default_tags(),
         # 强制 VPC 配置（IAM 策略要求）
@@ -63,7 +95,7 @@ def create_model(
     }
 
     try:
-        response = sm.create_model(**create_params)
+        response = call_with_backoff(sm.create_model, **create_params)
         print(f"✅ Model created: {full_model_name}")
         print(f"   ARN: {response['ModelArn']}")
         return full_model_name
@@ -85,7 +117,14 @@ def deploy_model(
     serverless: bool = False,
     serverless_memory_mb: int = 2048,
     serverless_max_concurrency: int = 5,
+    serverless_provisioned_concurrency: int = None,
     wait: bool = True,
+    multi_model: bool = False,
+    async_inference: bool = False,
+    async_output_s3_uri: str = None,
+    async_max_concurrent_invocations: int = None,
+    autoscaling: AutoScalingSpec = None,
+    uncompressed: bool = False,
 ) -> str:
     """
     一键部署模型到 Endpoint
@@ -101,7 +140,14 @@ def deploy_model(
         serverless: 是否使用 Serverless 模式
         serverless_memory_mb: Serverless 内存大小
         serverless_max_concurrency: Serverless 最大并发
+        serverless_provisioned_concurrency: Serverless 预置并发（常驻热容器数，减少冷启动，见 serverless.py）
         wait: 是否等待部署完成
+        multi_model: 多模型 Endpoint（model_data_url 为 S3 前缀，多个模型共享实例）
+        async_inference: 异步推理 Endpoint（请求/结果经 S3，见 async_inference.py）
+        async_output_s3_uri: 异步推理结果目录（默认 s3://{bucket}/{output_prefix}/async/{endpoint}/）
+        async_max_concurrent_invocations: 异步推理每个实例的并发请求数
+        autoscaling: 自动扩缩容配置（InService 后设置，需要 wait=True，见 autoscaling.py）
+        uncompressed: model_data_url 为未压缩的模型目录前缀（见 packaging.package_model）
 
     Returns:
         Endpoint 名称
@@ -122,21 +168,127 @@ def deploy_model(
             image_uri="123456789.dkr.ecr.region.amazonaws.com/sklearn:latest",
             serverless=True
         )
+
+        # Multi-Model Endpoint（s3://bucket/models/mme/ 下的多个 *.tar.gz）
+        endpoint = deploy_model(
+            model_name="customer-models",
+            model_data_url="s3://bucket/models/mme/",
+            image_uri="123456789.dkr.ecr.region.amazonaws.com/sklearn-mms:latest",
+            instance_type="ml.m5.xlarge",
+            multi_model=True
+        )
+        invoke_endpoint(endpoint, data, target_model="customer-42.tar.gz")
+
+        # Async Inference Endpoint（大 payload / 长耗时）
+        endpoint = deploy_model(
+            model_name="whisper-large",
+            model_data_url="s3://bucket/whisper.tar.gz",
+            image_uri="123456789.dkr.ecr.region.amazonaws.com/whisper:latest",
+            instance_type="ml.g5.xlarge",
+            async_inference=True
+        )
+        handle = invoke_endpoint_async(endpoint, audio_bytes, content_type="audio/wav")
+
+        # 按调用量自动扩缩容（1-8 台，每实例每分钟 1500 次调用）
+        endpoint = deploy_model(
+            model_name="sklearn-v1",
+            model_data_url="s3://bucket/model.tar.gz",
+            image_uri="123456789.dkr.ecr.region.amazonaws.com/sklearn:latest",
+            instance_type="ml.m5.large",
+            autoscaling=AutoScalingSpec(min_capacity=1, max_capacity=8, target_invocations=1500),
+        )
     """
     if config is None:
         config = get_config()
+    _check_autoscaling(autoscaling, serverless, wait)
 
-    sm = boto3.client("sagemaker", region_name=config.region)
-
-    # 1. 创建 Model
-    full_model_name = create_model(
+    # 1-3. 创建 Model / EndpointConfig / Endpoint
+    # time_to_in_service 与 deploy_models 一致，从开始创建资源计时
+    started_at = time.monotonic()
+    endpoint_name = _deploy_resources(
         model_name=model_name,
         model_data_url=model_data_url,
         image_uri=image_uri,
+        instance_type=instance_type,
+        instance_count=instance_count,
         config=config,
         environment=environment,
+        serverless=serverless,
+        serverless_memory_mb=serverless_memory_mb,
+        serverless_max_concurrency=serverless_max_concurrency,
+        serverless_provisioned_concurrency=serverless_provisioned_concurrency,
+        multi_model=multi_model,
+        async_inference=async_inference,
+        async_output_s3_uri=async_output_s3_uri,
+        async_max_concurrent_invocations=async_max_concurrent_invocations,
+        uncompressed=uncompressed,
     )
 
+    # 4. 等待部署完成
+    if wait:
+        print("⏳ Waiting for endpoint to be InService...")
+        get_poller(config).wait_endpoint(endpoint_name, timeout=1800)
+        metrics.observe(
+            "deploy_phase_seconds", time.monotonic() - started_at,
+            model=endpoint_name, phase="time_to_in_service",
+        )
+        print(f"✅ Endpoint is InService: {endpoint_name}")
+
+    if autoscaling is not None:
+        configure_autoscaling(endpoint_name, autoscaling, config=config)
+
+    return endpoint_name
+
+
+def _check_autoscaling(autoscaling: Optional[AutoScalingSpec], serverless: bool, wait: bool):
+    """扩缩容目标只能在 InService 之后注册，且只适用于实例变体"""
+    if autoscaling is None:
+        return
+    if serverless:
+        raise ValueError("Autoscaling instance counts requires a real-time (non-serverless) variant")
+    if not wait:
+        raise ValueError("autoscaling requires wait=True (targets can only be registered once InService)")
+
+
+def _deploy_resources(
+    model_name: str,
+    model_data_url: str,
+    image_uri: str,
+    instance_type: str,
+    instance_count: int,
+    config: DeployConfig,
+    environment: Dict[str, str],
+    serverless: bool,
+    serverless_memory_mb: int,
+    serverless_max_concurrency: int,
+    serverless_provisioned_concurrency: int = None,
+    multi_model: bool = False,
+    async_inference: bool = False,
+    async_output_s3_uri: str = None,
+    async_max_concurrent_invocations: int = None,
+    uncompressed: bool = False,
+) -> str:
+    """创建 Model → EndpointConfig → Endpoint（不等待），返回 Endpoint 名称"""
+    if serverless and multi_model:
+        raise ValueError("Serverless endpoints do not support multi-model containers")
+    if async_inference and (serverless or multi_model):
+        raise ValueError("Async inference requires a single-model real-time variant")
+
+    sm = get_client("sagemaker", config.region)
+
+    # 1. 创建 Model（所有阶段指标统一使用完整模型名，即 Endpoint 名称）
+    full_model_name = f"{config.get_model_name_prefix()}-{model_name}"
+    with metrics.timer("deploy_phase_seconds", model=full_model_name, phase="create_model"):
+        create_model(
+            model_name=model_name,
+            model_data_url=model_data_url,
+            image_uri=image_uri,
+            config=config,
+            environment=environment,
+            multi_model=multi_model,
+            uncompressed=uncompressed,
+        )
+
     # 2. 创建 EndpointConfig
     timestamp = datetime.now().strftime("%Y%m%d-%H%M%S")
     endpoint_config_name = f"{full_model_name}-config-{timestamp}"
@@ -148,10 +300,11 @@ def deploy_model(
             {
                 "VariantName": "AllTraffic",
                 "ModelName": full_model_name,
-                "ServerlessConfig": {
-                    "MemorySizeInMB": serverless_memory_mb,
-                    "MaxConcurrency": serverless_max_concurrency,
-                },
+                "ServerlessConfig": build_serverless_config(
+                    serverless_memory_mb,
+                    serverless_max_concurrency,
+                    serverless_provisioned_concurrency,
+                ),
             }
         ]
     else:
@@ -166,42 +319,184 @@ def deploy_model(
             }
         ]
 
-    sm.create_endpoint_config(
-        EndpointConfigName=endpoint_config_name,
-        ProductionVariants=production_variants,
-        Tags=config.get_default_tags(),
-    )
+    config_params = {
+        "EndpointConfigName": endpoint_config_name,
+        "ProductionVariants": production_variants,
+        "Tags": config.get_default_tags(),
+    }
+    if async_inference:
+        config_params["AsyncInferenceConfig"] = build_async_inference_config(
+            endpoint_name,
+            config,
+            output_s3_uri=async_output_s3_uri,
+            max_concurrent_invocations=async_max_concurrent_invocations,
+        )
+
+    with metrics.timer("deploy_phase_seconds", model=full_model_name, phase="create_endpoint_config"):
+        call_with_backoff(sm.create_endpoint_config, **config_params)
     print(f"✅ EndpointConfig created: {endpoint_config_name}")
 
     # 3. 创建或更新 Endpoint
-    try:
-        sm.create_endpoint(
-            EndpointName=endpoint_name,
-            EndpointConfigName=endpoint_config_name,
-            Tags=config.get_default_tags(),
-        )
-        print(f"✅ Endpoint creating: {endpoint_name}")
-    except sm.exceptions.ClientError as e:
-        if "Cannot create already existing" in str(e):
+    with metrics.timer("deploy_phase_seconds", model=full_model_name, phase="create_endpoint"):
+        try:
+            call_with_backoff(
+                sm.create_endpoint,
+                EndpointName=endpoint_name,
+                EndpointConfigName=endpoint_config_name,
+                Tags=config.get_default_tags(),
+            )
+            print(f"✅ Endpoint creating: {endpoint_name}")
+        except sm.exceptions.ClientError as e:
+            if "Cannot create already existing" not in str(e):
+                raise
             print(f"⚠️  Endpoint exists, updating: {endpoint_name}")
-            sm.update_endpoint(
+            # 已注册扩缩容的变体无法被替换，先注销（需要时由调用方重新设置）
+            remove_autoscaling(endpoint_name, config=config)
+            call_with_backoff(
+                sm.update_endpoint,
                 EndpointName=endpoint_name,
                 EndpointConfigName=endpoint_config_name,
             )
-
-    # 4. 等待部署完成
-    if wait:
-        print("⏳ Waiting for endpoint to be InService...")
-        waiter = sm.get_waiter("endpoint_in_service")
-        waiter.wait(
-            EndpointName=endpoint_name,
-            WaiterConfig={"Delay": 30, "MaxAttempts": 60},
-        )
-        print(f"✅ Endpoint is InService: {endpoint_name}")
+            invalidate_endpoint_caches(endpoint_name)
 
     return endpoint_name
 
 
+def deploy_models(
+    specs: List[Dict[str, Any]],
+    max_workers: int = 8,
+    config: DeployConfig = None,
+    wait: bool = True,
+    timeout: float = 3600.0,
+) -> List[Dict[str, Any]]:
+    """
+    并行部署多个模型
+
+    创建调用并发执行（遇到限流自动退避重试），所有 Endpoint 由共享的
+    StatusPoller 通过 ListEndpoints 批量检查状态，而不是每个模型一个 waiter。
+
+    Args:
+        specs: 部署参数列表，每项为 deploy_model 的关键字参数
+            （model_name, model_data_url, image_uri 必填，config/wait 不需要）
+        max_workers: 并发创建的线程数
+        config: 部署配置
+        wait: 是否等待所有 Endpoint 完成
+        timeout: 等待超时（秒）
+
+    Returns:
+        每个模型的部署结果（顺序与 specs 一致）:
+        {"model_name", "endpoint_name", "status", "failure_reason", "time_to_in_service"}
+
+    Example:
+        results = deploy_models(
+            [
+                {"model_name": f"segment-{i}", "model_data_url": url, "image_uri": image}
+                for i, url in enumerate(model_urls)
+            ],
+            max_workers=10,
+        )
+        failed = [r for r in results if r["status"] != "InService"]
+    """
+    if config is None:
+        config = get_config()
+    for spec in specs:
+        _check_autoscaling(spec.get("autoscaling"), spec.get("serverless", False), wait)
+
+    results = [
+        {
+            "model_name": spec["model_name"],
+            "endpoint_name": None,
+            "status": "Pending",
+            "failure_reason": None,
+            "time_to_in_service": None,
+        }
+        for spec in specs
+    ]
+    started_at = [0.0] * len(specs)
+
+    def _deploy(index: int):
+        spec = specs[index]
+        started_at[index] = time.monotonic()
+        results[index]["endpoint_name"] = _deploy_resources(
+            model_name=spec["model_name"],
+            model_data_url=spec["model_data_url"],
+            image_uri=spec["image_uri"],
+            instance_type=spec.get("instance_type", "ml.t2.medium"),
+            instance_count=spec.get("instance_count", 1),
+            config=config,
+            environment=spec.get("environment"),
+            serverless=spec.get("serverless", False),
+            serverless_memory_mb=spec.get("serverless_memory_mb", 2048),
+            serverless_max_concurrency=spec.get("serverless_max_concurrency", 5),
+            serverless_provisioned_concurrency=spec.get("serverless_provisioned_concurrency"),
+            multi_model=spec.get("multi_model", False),
+            uncompressed=spec.get("uncompressed", False),
+            async_inference=spec.get("async_inference", False),
+            async_output_s3_uri=spec.get("async_output_s3_uri"),
+            async_max_concurrent_invocations=spec.get("async_max_concurrent_invocations"),
+        )
+        results[index]["status"] = "Creating"
+
+    # 1. 并发创建资源
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        futures = {pool.submit(_deploy, i): i for i in range(len(specs))}
+        for future in as_completed(futures):
+            error = future.exception()
+            if error is not None:
+                index = futures[future]
+                results[index]["status"] = "Failed"
+                results[index]["failure_reason"] = str(error)
+                metrics.increment("errors_total", operation="deploy_model", kind="create")
+                print(f"❌ Deploy failed: {specs[index]['model_name']}: {error}")
+
+    # 2. 统一等待
+    pending = {
+        r["endpoint_name"]: i for i, r in enumerate(results) if r["status"] == "Creating"
+    }
+    if wait and pending:
+        print(f"⏳ Waiting for {len(pending)} endpoints to be InService...")
+        poller = get_poller(config)
+        futures = {poller.track_endpoint(name): name for name in pending}
+        done, not_done = futures_wait(futures, timeout=timeout)
+
+        for future in done:
+            index = pending[futures[future]]
+            if future.exception() is not None:
+                results[index]["status"] = "Failed"
+                results[index]["failure_reason"] = str(future.exception())
+                continue
+
+            status = future.result()
+            results[index]["status"] = status["status"]
+            results[index]["failure_reason"] = status["failure_reason"]
+            if status["status"] == "InService":
+                results[index]["time_to_in_service"] = status["finished_at"] - started_at[index]
+                metrics.observe(
+                    "deploy_phase_seconds", results[index]["time_to_in_service"],
+                    model=status["name"], phase="time_to_in_service",
+                )
+                print(f"✅ Endpoint is InService: {status['name']}")
+                if specs[index].get("autoscaling") is not None:
+                    try:
+                        configure_autoscaling(status["name"], specs[index]["autoscaling"], config=config)
+                    except Exception as e:
+                        results[index]["failure_reason"] = f"Autoscaling: {e}"
+                        print(f"❌ Autoscaling failed: {status['name']}: {e}")
+            else:
+                metrics.increment("errors_total", operation="deploy_model", kind=status["status"])
+                print(f"❌ Endpoint {status['status']}: {status['name']}: {status['failure_reason']}")
+
+        for future in not_done:
+            name = futures[future]
+            poller.untrack(ENDPOINT, name)
+            results[pending[name]]["status"] = "Timeout"
+            results[pending[name]]["failure_reason"] = f"Not InService after {timeout:.0f}s"
+
+    succeeded = sum(1 for r in results if r["status"] == "InService")
+    print(f"✅ Deployed {succeeded}/{len(specs)} models")
+    return results
+
+
 def delete_model(model_name: str, config: DeployConfig = None) -> bool:
     """
     删除 SageMaker Model
@@ -216,7 +511,7 @@ def delete_model(model_name: str, config: DeployConfig = None) -> bool:
     if config is None:
         config = get_config()
 
-    sm = boto3.client("sagemaker", region_name=config.region)
+    sm = get_client("sagemaker", config.region)
 
     # 如果没有项目前缀，添加它
     prefix = config.get_model_name_prefix()
@@ -247,7 +542,7 @@ def list_models(config: DeployConfig = None) -> List[Dict[str, Any]]:
     if config is None:
         config = get_config()
 
-    sm = boto3.client("sagemaker", region_name=config.region)
+    sm = get_client("sagemaker", config.region)
     prefix = config.get_model_name_prefix()
 
     models = []
@@ -0,0 +1,196 @@
+# =============================================================================
+# multi_model.py - 多模型 Endpoint (Multi-Model Endpoint) 辅助工具
+# =============================================================================
+# 管理多模型 Endpoint 的 S3 模型目录和本地模型清单 (manifest)
+#
+# 目录结构:
+#   s3://{bucket}/{model_prefix}/multi-model/{name}/
+#     ├── customer-1-{sha256[:12]}.tar.gz
+#     ├── customer-2-{sha256[:12]}.tar.gz
+#     └── ...
+#
+# 文件名带内容哈希: 多模型 Endpoint 按 target_model 缓存已加载的模型，
+# 覆盖同一 Key 后实例仍可能继续使用旧模型，因此每个版本使用新的 Key。
+# =============================================================================
+
+import json
+import os
+import re
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from .config import get_config, DeployConfig
+from .clients import get_client, split_s3_uri
+from .packaging import sha256_file
+
+# {name}-{sha256[:12]}.tar.gz
+_VERSIONED_KEY = re.compile(r"^(?P<name>.+)-(?P<version>[0-9a-f]{12})\.tar\.gz$")
+
+
+def get_multi_model_prefix(name: str, config: DeployConfig = None) -> str:
+    """
+    获取多模型 Endpoint 的 S3 模型目录
+
+    Returns:
+        s3://{bucket}/{model_prefix}/multi-model/{name}/
+    """
+    if config is None:
+        config = get_config()
+    return f"s3://{config.bucket}/{config.model_prefix}/multi-model/{name}/"
+
+
+class ModelManifest:
+    """
+    本地模型清单
+
+    以 JSON 文件记录多模型 Endpoint 目录下每个模型当前版本的 target_model、
+    S3 路径、大小和哈希，用于确定 invoke_endpoint(target_model=...) 应使用的
+    版本，避免每次列举 S3。
+
+    Example:
+        manifest = ModelManifest("mme-manifest.json", get_multi_model_prefix("customers"))
+        upload_target_model("model-42.tar.gz", manifest, target_name="customer-42")
+        manifest.names()                       # ["customer-42.tar.gz"]
+        manifest.resolve("customer-42.tar.gz")  # "customer-42-3f5a9c0e1b2d.tar.gz"
+    """
+
+    def __init__(self, path: str, s3_prefix: str = None):
+        """
+        Args:
+            path: 本地清单文件路径
+            s3_prefix: 多模型目录（已有清单文件时可省略）
+        """
+        self.path = path
+        self.models: Dict[str, Dict[str, Any]] = {}
+        self.s3_prefix = s3_prefix
+
+        if os.path.exists(path):
+            with open(path) as f:
+                data = json.load(f)
+            self.s3_prefix = s3_prefix or data.get("s3_prefix")
+            self.models = data.get("models", {})
+
+        if not self.s3_prefix:
+            raise ValueError("s3_prefix is required for a new manifest")
+        self.s3_prefix = self.s3_prefix.rstrip("/") + "/"
+
+    def add(self, name: str, size: int, sha256: str = None, target_model: str = None):
+        """
+        记录一个模型的当前版本
+
+        Args:
+            name: 模型名称（如 customer-1.tar.gz）
+            size: 文件大小
+            sha256: 内容哈希
+            target_model: 相对目录的版本化路径（默认与 name 相同）
+        """
+        target_model = target_model or name
+        self.models[name] = {
+            "target_model": target_model,
+            "s3_uri": f"{self.s3_prefix}{target_model}",
+            "size": size,
+            "sha256": sha256,
+            "updated_at": datetime.now().isoformat(timespec="seconds"),
+        }
+
+    def remove(self, name: str):
+        self.models.pop(name, None)
+
+    def get(self, name: str) -> Optional[Dict[str, Any]]:
+        return self.models.get(name)
+
+    def resolve(self, name: str) -> str:
+        """模型名称 -> 当前版本的 target_model（invoke_endpoint 的参数）"""
+        known = self.models.get(name)
+        if known is None:
+            raise KeyError(f"Unknown target model: {name}")
+        return known.get("target_model", name)
+
+    def names(self) -> List[str]:
+        return sorted(self.models)
+
+    def save(self):
+        """原子写入清单文件"""
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({"s3_prefix": self.s3_prefix, "models": self.models}, f, indent=2)
+        os.replace(tmp_path, self.path)
+
+    def sync_from_s3(self, config: DeployConfig = None) -> "ModelManifest":
+        """按 S3 目录的实际内容重建清单（同一模型取最新版本，保留已知的 sha256）"""
+        if config is None:
+            config = get_config()
+
+        s3 = get_client("s3", config.region)
+        bucket, prefix = split_s3_uri(self.s3_prefix)
+
+        models = {}
+        for page in s3.get_paginator("list_objects_v2").paginate(Bucket=bucket, Prefix=prefix):
+            for obj in page.get("Contents", []):
+                target_model = obj["Key"][len(prefix):]
+                if not target_model or target_model.endswith("/"):
+                    continue
+                match = _VERSIONED_KEY.match(target_model)
+                name = f"{match.group('name')}.tar.gz" if match else target_model
+                updated_at = obj["LastModified"].isoformat(timespec="seconds")
+                if name in models and models[name]["updated_at"] > updated_at:
+                    continue
+                known = self.models.get(name, {})
+                same_version = known.get("target_model", name) == target_model and known.get("size") == obj["Size"]
+                models[name] = {
+                    "target_model": target_model,
+                    "s3_uri": f"{self.s3_prefix}{target_model}",
+                    "size": obj["Size"],
+                    "sha256": known.get("sha256") if same_version else None,
+                    "updated_at": updated_at,
+                }
+
+        self.models = models
+        self.save()
+        return self
+
+
+def upload_target_model(
+    local_path: str,
+    manifest: ModelManifest,
+    target_name: str = None,
+    config: DeployConfig = None,
+) -> str:
+    """
+    上传一个模型文件到多模型目录并更新清单
+
+    每个版本写入新的 Key {name}-{sha256[:12]}.tar.gz（不覆盖旧版本，避免 Endpoint
+    继续使用已缓存的旧模型）；内容未变化（sha256 相同）时跳过上传。
+    旧版本文件保留在 S3，不再使用后可自行删除。
+
+    Args:
+        local_path: 本地 model.tar.gz
+        manifest: 模型清单
+        target_name: 目标模型名称（默认使用文件名，自动补 .tar.gz）
+        config: 部署配置
+
+    Returns:
+        当前版本的 target_model（invoke_endpoint 的 target_model 参数）
+    """
+    if config is None:
+        config = get_config()
+
+    name = target_name or os.path.basename(local_path)
+    if not name.endswith(".tar.gz"):
+        name = f"{name}.tar.gz"
+
+    sha256 = sha256_file(local_path)
+    known = manifest.get(name)
+    if known and known.get("sha256") == sha256:
+        print(f"⚠️  Target model unchanged, skip upload: {name}")
+        return manifest.resolve(name)
+
+    target_model = f"{name[:-len('.tar.gz')]}-{sha256[:12]}.tar.gz"
+    bucket, prefix = split_s3_uri(manifest.s3_prefix)
+    s3 = get_client("s3", config.region)
+    s3.upload_file(local_path, bucket, f"{prefix}{target_model}")
+
+    manifest.add(name, os.path.getsize(local_path), sha256, target_model=target_model)
+    manifest.save()
+    print(f"✅ Target model uploaded: {manifest.s3_prefix}{target_model}")
+    return target_model
@@ -0,0 +1,448 @@
+# =============================================================================
+# packaging.py - 模型文件打包与上传
+# =============================================================================
+# package_model() 把本地模型目录上传为 create_model / deploy_model 可用的模型数据:
+#
+#   内容哈希   按 (相对路径, 大小, 文件 sha256) 计算目录哈希，相同内容只上传一次；
+#              hash_cache 记录 (路径, 大小, mtime) -> sha256，未修改的大文件不重复读取
+#   压缩       tar.gz 以流的方式边打包边上传（不生成本地临时文件），分片并行上传；
+#              tar 条目按路径排序、时间戳归零，相同内容得到相同的 tar
+#   不压缩     各文件直接上传到 S3 前缀，Model 使用 CompressionType=None 的
+#              S3DataSource，容器无需下载后解压；与上一版本相同的文件在 S3 内复制
+#
+# 目录结构:
+#   s3://{bucket}/{model_prefix}/artifacts/{name}/
+#     ├── {hash}/model.tar.gz        压缩
+#     ├── {hash}-raw/...             不压缩（目录原样）
+#     └── {hash}[-raw].json          上传完成标记（文件清单），存在即跳过上传
+# =============================================================================
+
+import gzip
+import hashlib
+import json
+import math
+import os
+import tarfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from .config import get_config, DeployConfig
+from .clients import get_client
+
+# S3 分片上传限制
+MIN_PART_SIZE = 5 * 1024 * 1024
+MAX_PARTS = 10000
+
+_HASH_CHUNK = 8 * 1024 * 1024
+
+
+# =============================================================================
+# 内容哈希
+# =============================================================================
+
+
+def _list_files(source_dir: str) -> List[Tuple[str, str, os.stat_result]]:
+    """目录下的所有文件 [(相对路径, 绝对路径, stat)]，按相对路径排序"""
+    files = []
+    for root, dirs, names in os.walk(source_dir):
+        dirs.sort()
+        for name in names:
+            path = os.path.join(root, name)
+            if os.path.isfile(path):
+                rel = os.path.relpath(path, source_dir).replace(os.sep, "/")
+                files.append((rel, path, os.stat(path)))
+    files.sort(key=lambda item: item[0])
+    return files
+
+
+def sha256_file(path: str) -> str:
+    """文件内容的 sha256（分块读取）"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(_HASH_CHUNK), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def hash_model_dir(
+    source_dir: str,
+    hash_cache: str = None,
+    max_workers: int = 8,
+) -> Tuple[str, Dict[str, Dict[str, Any]]]:
+    """
+    计算模型目录的内容哈希
+
+    Args:
+        source_dir: 本地模型目录
+        hash_cache: 文件哈希缓存（JSON 文件路径，应位于 source_dir 之外）；
+            大小和 mtime 未变的文件直接使用缓存的 sha256
+        max_workers: 并行计算哈希的线程数
+
+    Returns:
+        (目录 sha256, {相对路径: {"size", "sha256"}})
+    """
+    return _hash_files(_model_files(source_dir), hash_cache, max_workers)
+
+
+def _model_files(source_dir: str) -> List[Tuple[str, str, os.stat_result]]:
+    if not os.path.isdir(source_dir):
+        raise ValueError(f"Not a directory: {source_dir}")
+    files = _list_files(source_dir)
+    if not files:
+        raise ValueError(f"No files in {source_dir}")
+    return files
+
+
+def _hash_files(
+    files: List[Tuple[str, str, os.stat_result]],
+    hash_cache: str,
+    max_workers: int,
+) -> Tuple[str, Dict[str, Dict[str, Any]]]:
+    """按 _list_files 的结果计算目录哈希（上传时使用同一份文件列表）"""
+    cache: Dict[str, Dict[str, Any]] = {}
+    if hash_cache and os.path.exists(hash_cache):
+        with open(hash_cache) as f:
+            cache = json.load(f)
+
+    def file_hash(item) -> str:
+        rel, path, stat = item
+        known = cache.get(rel)
+        if known and known["size"] == stat.st_size and known["mtime_ns"] == stat.st_mtime_ns:
+            return known["sha256"]
+        return sha256_file(path)
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        hashes = list(pool.map(file_hash, files))
+
+    digest = hashlib.sha256()
+    entries = {}
+    for (rel, _, stat), sha256 in zip(files, hashes):
+        digest.update(f"{rel}\0{stat.st_size}\0{sha256}\n".encode("utf-8"))
+        entries[rel] = {"size": stat.st_size, "sha256": sha256}
+
+    if hash_cache:
+        cache = {
+            rel: {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "sha256": sha256}
+            for (rel, _, stat), sha256 in zip(files, hashes)
+        }
+        tmp_path = f"{hash_cache}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(cache, f)
+        os.replace(tmp_path, hash_cache)
+
+    return digest.hexdigest(), entries
+
+
+# =============================================================================
+# 流式分片上传
+# =============================================================================
+
+
+class MultipartWriter:
+    """
+    可写文件对象，写入的数据按 part_size 切片后并行上传为 S3 分片
+
+    最多 max_concurrency 个分片同时上传，另有一个分片在缓冲区中，
+    内存占用约 (max_concurrency + 1) × part_size。写入端在分片槽位用满时阻塞。
+
+    Example:
+        with MultipartWriter(s3, bucket, key) as writer:
+            with tarfile.open(fileobj=writer, mode="w|") as tar:
+                tar.add("model/")
+    """
+
+    def __init__(
+        self,
+        s3,
+        bucket: str,
+        key: str,
+        part_size: int = 64 * 1024 * 1024,
+        max_concurrency: int = 8,
+        extra_args: Dict[str, Any] = None,
+    ):
+        if part_size < MIN_PART_SIZE:
+            raise ValueError(f"part_size must be >= {MIN_PART_SIZE}")
+        self.s3 = s3
+        self.bucket = bucket
+        self.key = key
+        self.part_size = part_size
+        self.size = 0
+        self._buffer = bytearray()
+        self._futures = []
+        self._slots = threading.BoundedSemaphore(max_concurrency)
+        self._pool = ThreadPoolExecutor(max_workers=max_concurrency)
+        self.upload_id = s3.create_multipart_upload(Bucket=bucket, Key=key, **(extra_args or {}))["UploadId"]
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._buffer += data
+        self.size += len(data)
+        while len(self._buffer) >= self.part_size:
+            self._submit(bytes(self._buffer[: self.part_size]))
+            del self._buffer[: self.part_size]
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def _submit(self, body: bytes):
+        if len(self._futures) >= MAX_PARTS:
+            raise ValueError(f"Upload exceeds {MAX_PARTS} parts; increase part_size")
+        self._slots.acquire()
+        # 已有分片失败时尽早停止
+        for future in self._futures:
+            if future.done() and future.exception() is not None:
+                self._slots.release()
+                raise future.exception()
+        future = self._pool.submit(self._upload_part, len(self._futures) + 1, body)
+        future.add_done_callback(lambda _: self._slots.release())
+        self._futures.append(future)
+
+    def _upload_part(self, number: int, body: bytes) -> Dict[str, Any]:
+        response = self.s3.upload_part(
+            Bucket=self.bucket, Key=self.key, UploadId=self.upload_id, PartNumber=number, Body=body
+        )
+        return {"PartNumber": number, "ETag": response["ETag"]}
+
+    def complete(self) -> Dict[str, Any]:
+        """上传剩余数据并合并分片"""
+        if self._buffer or not self._futures:
+            self._submit(bytes(self._buffer))
+            self._buffer = bytearray()
+        parts = [future.result() for future in self._futures]
+        self._pool.shutdown()
+        return self.s3.complete_multipart_upload(
+            Bucket=self.bucket, Key=self.key, UploadId=self.upload_id, MultipartUpload={"Parts": parts}
+        )
+
+    def abort(self):
+        """取消上传（已上传的分片由 S3 删除）"""
+        self._pool.shutdown(cancel_futures=True)
+        self.s3.abort_multipart_upload(Bucket=self.bucket, Key=self.key, UploadId=self.upload_id)
+
+    def __enter__(self) -> "MultipartWriter":
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is not None:
+            self.abort()
+            return
+        try:
+            self.complete()
+        except BaseException:
+            self.abort()
+            raise
+
+
+def _check_unchanged(path: str, stat: os.stat_result):
+    """上传前确认文件与计算哈希时一致（否则上传内容与完成标记中的哈希不符）"""
+    current = os.stat(path)
+    if current.st_size != stat.st_size or current.st_mtime_ns != stat.st_mtime_ns:
+        raise ValueError(f"File changed while packaging: {path}")
+
+
+def _stream_tarball(
+    s3,
+    files: List[Tuple[str, str, os.stat_result]],
+    bucket: str,
+    key: str,
+    part_size: int,
+    max_concurrency: int,
+    compresslevel: int,
+) -> int:
+    """把已计算哈希的文件列表以 tar.gz 流式写入 S3，返回压缩后大小"""
+    with MultipartWriter(s3, bucket, key, part_size, max_concurrency) as writer:
+        # mtime=0 使相同内容的 gzip 输出逐字节相同
+        with gzip.GzipFile(fileobj=writer, mode="wb", compresslevel=compresslevel, mtime=0) as gz:
+            with tarfile.open(fileobj=gz, mode="w|", format=tarfile.PAX_FORMAT) as tar:
+                for rel, path, stat in files:
+                    _check_unchanged(path, stat)
+                    info = tarfile.TarInfo(rel)
+                    info.size = stat.st_size
+                    info.mode = stat.st_mode & 0o777
+                    with open(path, "rb") as f:
+                        tar.addfile(info, f)
+    return writer.size
+
+
+# =============================================================================
+# 不压缩上传
+# =============================================================================
+
+
+def _latest_manifest(s3, bucket: str, root: str) -> Optional[Dict[str, Any]]:
+    """同一模型最近一次不压缩上传的文件清单（用于复制未变化的文件）"""
+    latest = None
+    for page in s3.get_paginator("list_objects_v2").paginate(Bucket=bucket, Prefix=root, Delimiter="/"):
+        for obj in page.get("Contents", []):
+            if obj["Key"].endswith("-raw.json") and (latest is None or obj["LastModified"] > latest["LastModified"]):
+                latest = obj
+    if latest is None:
+        return None
+    return json.loads(s3.get_object(Bucket=bucket, Key=latest["Key"])["Body"].read())
+
+
+def _upload_files(
+    s3,
+    files: List[Tuple[str, str, os.stat_result]],
+    entries: Dict[str, Dict[str, Any]],
+    bucket: str,
+    prefix: str,
+    previous: Optional[Dict[str, Any]],
+    part_size: int,
+    max_concurrency: int,
+) -> Tuple[int, int]:
+    """上传目录下的文件（与上一版本相同的在 S3 内复制），返回 (上传数, 复制数)"""
+    from boto3.s3.transfer import TransferConfig
+
+    paths = {rel: (path, stat) for rel, path, stat in files}
+    previous_files = (previous or {}).get("files", {})
+    previous_prefix = (previous or {}).get("prefix")
+
+    # 大文件依次上传，每个文件内部分片并行；小文件之间并行
+    large = TransferConfig(
+        multipart_threshold=part_size, multipart_chunksize=part_size, max_concurrency=max_concurrency
+    )
+    small = TransferConfig(multipart_threshold=part_size, use_threads=False)
+
+    def transfer(rel: str, transfer_config) -> str:
+        key = f"{prefix}{rel}"
+        known = previous_files.get(rel)
+        if previous_prefix and known and known["sha256"] == entries[rel]["sha256"]:
+            s3.copy({"Bucket": bucket, "Key": f"{previous_prefix}{rel}"}, bucket, key, Config=transfer_config)
+            return "copied"
+        path, stat = paths[rel]
+        _check_unchanged(path, stat)
+        s3.upload_file(path, bucket, key, Config=transfer_config)
+        return "uploaded"
+
+    outcomes = []
+    small_files = [rel for rel, entry in entries.items() if entry["size"] < part_size]
+    with ThreadPoolExecutor(max_workers=max_concurrency) as pool:
+        futures = [pool.submit(transfer, rel, small) for rel in small_files]
+        for rel, entry in sorted(entries.items(), key=lambda item: -item[1]["size"]):
+            if entry["size"] >= part_size:
+                outcomes.append(transfer(rel, large))
+        outcomes.extend(future.result() for future in futures)
+    return outcomes.count("uploaded"), outcomes.count("copied")
+
+
+# =============================================================================
+# 打包上传
+# =============================================================================
+
+
+def get_artifact_prefix(name: str, config: DeployConfig = None) -> str:
+    """
+    获取模型的打包上传目录
+
+    Returns:
+        s3://{bucket}/{model_prefix}/artifacts/{name}/
+    """
+    if config is None:
+        config = get_config()
+    return f"s3://{config.bucket}/{config.model_prefix}/artifacts/{name}/"
+
+
+def _object_exists(s3, bucket: str, key: str) -> bool:
+    try:
+        s3.head_object(Bucket=bucket, Key=key)
+        return True
+    except s3.exceptions.ClientError as e:
+        if e.response.get("Error", {}).get("Code") in ("404", "NoSuchKey", "NotFound"):
+            return False
+        raise
+
+
+def package_model(
+    source_dir: str,
+    name: str,
+    compress: bool = True,
+    config: DeployConfig = None,
+    hash_cache: str = None,
+    part_size_mb: int = 64,
+    max_concurrency: int = 8,
+    compresslevel: int = 1,
+) -> Dict[str, Any]:
+    """
+    打包并上传本地模型目录（内容未变化时跳过上传）
+
+    Args:
+        source_dir: 本地模型目录（目录内容即容器中 /opt/ml/model 的内容）
+        name: 模型名称（S3 目录名）
+        compress: True 上传 model.tar.gz；False 直接上传文件（CompressionType=None）
+        config: 部署配置
+        hash_cache: 文件哈希缓存路径（见 hash_model_dir）
+        part_size_mb: 分片大小（MB，文件很大时自动增大以满足 10000 个分片的限制）
+        max_concurrency: 并行上传的分片数
+        compresslevel: gzip 压缩级别（模型权重压缩率通常很低，默认用最快的 1）
+
+    Returns:
+        {"model_data_url", "uncompressed", "sha256", "size", "files", "uploaded", "copied", "skipped"}
+        model_data_url / uncompressed 可直接传给 deploy_model / create_model
+
+    Example:
+        artifact = package_model("./model", "sklearn-v1", compress=False, hash_cache=".model-hashes.json")
+        deploy_model("sklearn-v1", artifact["model_data_url"], image_uri,
+                     uncompressed=artifact["uncompressed"])
+    """
+    if config is None:
+        config = get_config()
+
+    s3 = get_client("s3", config.region)
+    # 哈希和上传使用同一份文件列表
+    files = _model_files(source_dir)
+    sha256, entries = _hash_files(files, hash_cache, max_workers=max_concurrency)
+    total = sum(entry["size"] for entry in entries.values())
+
+    root = f"{config.model_prefix}/artifacts/{name}/"
+    version = sha256[:16] if compress else f"{sha256[:16]}-raw"
+    prefix = f"{root}{version}/"
+    marker_key = f"{root}{version}.json"
+    model_data_url = f"s3://{config.bucket}/{prefix}" + ("model.tar.gz" if compress else "")
+    result = {
+        "model_data_url": model_data_url,
+        "uncompressed": not compress,
+        "sha256": sha256,
+        "size": total,
+        "files": len(entries),
+        "uploaded": 0,
+        "copied": 0,
+        "skipped": False,
+    }
+
+    if _object_exists(s3, config.bucket, marker_key):
+        print(f"⚠️  Model artifact unchanged, skip upload: {model_data_url}")
+        result["skipped"] = True
+        return result
+
+    # 分片数不超过上限（gzip 对不可压缩数据略有膨胀，留 1% 余量）
+    part_size = max(part_size_mb * 1024 * 1024, MIN_PART_SIZE, math.ceil(total * 1.01 / (MAX_PARTS - 1)))
+
+    print(f"📦 Uploading model artifact: {source_dir} ({total / 1024 ** 2:.1f} MB, {len(entries)} files)")
+    if compress:
+        result["size"] = _stream_tarball(
+            s3, files, config.bucket, f"{prefix}model.tar.gz", part_size, max_concurrency, compresslevel
+        )
+        result["uploaded"] = len(entries)
+    else:
+        previous = _latest_manifest(s3, config.bucket, root)
+        result["uploaded"], result["copied"] = _upload_files(
+            s3, files, entries, config.bucket, prefix, previous, part_size, max_concurrency
+        )
+
+    # 标记最后写入: 存在即表示上传完整
+    marker = {
+        "sha256": sha256,
+        "compressed": compress,
+        "prefix": prefix,
+        "files": entries,
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+    }
+    s3.put_object(Bucket=config.bucket, Key=marker_key, Body=json.dumps(marker).encode("utf-8"))
+    print(f"✅ Model artifact uploaded: {model_data_url} ({result['uploaded']} uploaded, {result['copied']} copied)")
+    return result
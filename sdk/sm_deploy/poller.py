@@ -0,0 +1,339 @@
+# =============================================================================
+# poller.py - 共享状态轮询器
+# =============================================================================
+# 统一跟踪多个 Endpoint / Transform Job 的状态，替代每次调用各自的 boto3 waiter:
+#   - 多个资源到期时用一次 List* 调用批量刷新（单个资源用 Describe*）
+#   - 自适应退避: 前期快速轮询，之后逐步放慢
+#   - 通过 Future / 回调通知完成
+#   - 时钟可注入，便于用模拟时钟测试
+# =============================================================================
+
+import threading
+import time
+from concurrent.futures import Future
+from typing import Callable, Dict, List, Optional, Tuple
+
+from .config import get_config, DeployConfig
+from .clients import get_client, call_with_backoff
+
+ENDPOINT = "endpoint"
+TRANSFORM_JOB = "transform_job"
+
+# 终态
+_TERMINAL_STATUSES = {
+    ENDPOINT: {"InService", "Failed", "OutOfService"},
+    TRANSFORM_JOB: {"Completed", "Failed", "Stopped"},
+}
+
+
+class _Tracked:
+    """被跟踪的资源"""
+
+    def __init__(self, kind: str, name: str, now: float, interval: float):
+        self.kind = kind
+        self.name = name
+        self.future: Future = Future()
+        self.tracked_at = now
+        self.interval = interval
+        self.next_poll = now + interval
+        self.status: Optional[str] = None
+        # 跟踪该资源的调用方数（每次 track 加一，untrack 减一，归零时停止轮询）
+        self.refs = 0
+
+
+class StatusPoller:
+    """
+    共享状态轮询器
+
+    Example:
+        poller = get_poller(config)
+        future = poller.track_endpoint("rc-fraud-detection-sklearn-v1")
+        result = future.result(timeout=1800)
+        # {"name": ..., "kind": "endpoint", "status": "InService", "failure_reason": None,
+        #  "finished_at": ..., "elapsed": ...}
+
+    模拟时钟测试（见 sm_deploy.testing）:
+        clock = FakeClock()
+        sm = FakeSageMaker(clock)
+        sm.set_endpoint("ep", "Creating")
+        sm.set_endpoint("ep", "InService", at=120)
+        poller = StatusPoller(config, sm_client=sm, clock=clock, background=False)
+        future = poller.track_endpoint("ep")
+        while not future.done():
+            clock.advance(poller.poll_once())
+    """
+
+    def __init__(
+        self,
+        config: DeployConfig = None,
+        sm_client=None,
+        min_interval: float = 5.0,
+        max_interval: float = 30.0,
+        backoff: float = 1.5,
+        batch_threshold: int = 2,
+        clock: Callable[[], float] = time.monotonic,
+        background: bool = True,
+    ):
+        """
+        Args:
+            config: 部署配置（决定 Region 和 List* 的名称前缀）
+            sm_client: SageMaker Client（默认共享 Client）
+            min_interval: 首次轮询间隔（秒）
+            max_interval: 最大轮询间隔（秒）
+            backoff: 每次轮询后间隔的放大倍数
+            batch_threshold: 同类资源同时到期数 >= 该值时改用 List* 批量刷新
+            clock: 时钟函数（测试时可注入模拟时钟）
+            background: 是否启动后台轮询线程（False 时需手动调用 poll_once）
+        """
+        self.config = config or get_config()
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.backoff = backoff
+        self.batch_threshold = batch_threshold
+        self._sm = sm_client
+        self._clock = clock
+        self._tracked: Dict[Tuple[str, str], _Tracked] = {}
+        self._cond = threading.Condition()
+        self._stopped = False
+        self._thread = None
+        if background:
+            self._thread = threading.Thread(
+                target=self._run, name="sm-deploy-poller", daemon=True
+            )
+            self._thread.start()
+
+    @property
+    def sm(self):
+        return self._sm or get_client("sagemaker", self.config.region)
+
+    # -------------------------------------------------------------------------
+    # 跟踪
+    # -------------------------------------------------------------------------
+
+    def track_endpoint(self, endpoint_name: str, callback: Callable[[dict], None] = None) -> Future:
+        """跟踪 Endpoint 直到 InService / Failed / OutOfService"""
+        return self._track(ENDPOINT, endpoint_name, callback)
+
+    def track_transform_job(self, job_name: str, callback: Callable[[dict], None] = None) -> Future:
+        """跟踪 Transform Job 直到 Completed / Failed / Stopped"""
+        return self._track(TRANSFORM_JOB, job_name, callback)
+
+    def _track(self, kind: str, name: str, callback: Callable[[dict], None]) -> Future:
+        with self._cond:
+            tracked = self._tracked.get((kind, name))
+            if tracked is None:
+                tracked = _Tracked(kind, name, self._clock(), self.min_interval)
+                self._tracked[(kind, name)] = tracked
+            tracked.refs += 1
+            self._cond.notify_all()
+
+        if callback is not None:
+            tracked.future.add_done_callback(
+                lambda f: callback(f.result()) if f.exception() is None else None
+            )
+        return tracked.future
+
+    def untrack(self, kind: str, name: str):
+        """
+        放弃一次跟踪（不改变 Future 状态）
+
+        同一资源的 Future 由所有 track 调用方共享，只有全部调用方都放弃后才停止轮询，
+        其它等待者和回调不受影响。
+        """
+        with self._cond:
+            tracked = self._tracked.get((kind, name))
+            if tracked is None:
+                return
+            tracked.refs -= 1
+            if tracked.refs <= 0:
+                self._tracked.pop((kind, name), None)
+
+    def wait_endpoint(self, endpoint_name: str, timeout: float = 1800.0) -> dict:
+        """
+        等待 Endpoint InService
+
+        Raises:
+            RuntimeError: Endpoint 进入 Failed / OutOfService
+            concurrent.futures.TimeoutError: 超时
+        """
+        future = self.track_endpoint(endpoint_name)
+        try:
+            result = future.result(timeout=timeout)
+        finally:
+            if not future.done():
+                self.untrack(ENDPOINT, endpoint_name)
+
+        if result["status"] != "InService":
+            raise RuntimeError(
+                f"Endpoint {endpoint_name} is {result['status']}: {result['failure_reason']}"
+            )
+        return result
+
+    def wait_transform_job(self, job_name: str, timeout: float = 3600.0) -> dict:
+        """等待 Transform Job 结束（Completed / Failed / Stopped）"""
+        future = self.track_transform_job(job_name)
+        try:
+            return future.result(timeout=timeout)
+        finally:
+            if not future.done():
+                self.untrack(TRANSFORM_JOB, job_name)
+
+    # -------------------------------------------------------------------------
+    # 轮询
+    # -------------------------------------------------------------------------
+
+    def poll_once(self) -> float:
+        """
+        刷新所有到期资源的状态
+
+        Returns:
+            距下一个资源到期的秒数（没有被跟踪的资源时返回 max_interval）
+        """
+        now = self._clock()
+        with self._cond:
+            due = [t for t in self._tracked.values() if t.next_poll <= now]
+
+        by_kind: Dict[str, List[_Tracked]] = {}
+        for tracked in due:
+            by_kind.setdefault(tracked.kind, []).append(tracked)
+
+        for kind, items in by_kind.items():
+            try:
+                if len(items) >= self.batch_threshold:
+                    self._refresh_batch(kind, items)
+                else:
+                    for tracked in items:
+                        self._refresh_one(tracked)
+            except Exception as e:
+                # 限流重试后仍失败: 本轮跳过，下一轮再试
+                print(f"⚠️  Status poll failed ({kind}): {e}")
+
+        # 自适应退避
+        now = self._clock()
+        for tracked in due:
+            if not tracked.future.done():
+                tracked.interval = min(self.max_interval, tracked.interval * self.backoff)
+                tracked.next_poll = now + tracked.interval
+
+        with self._cond:
+            if not self._tracked:
+                return self.max_interval
+            return max(0.0, min(t.next_poll for t in self._tracked.values()) - now)
+
+    def _refresh_one(self, tracked: _Tracked):
+        try:
+            if tracked.kind == ENDPOINT:
+                info = call_with_backoff(self.sm.describe_endpoint, EndpointName=tracked.name)
+                status = info["EndpointStatus"]
+            else:
+                info = call_with_backoff(self.sm.describe_transform_job, TransformJobName=tracked.name)
+                status = info["TransformJobStatus"]
+        except Exception as e:
+            if "Could not find" in str(e) or "does not exist" in str(e):
+                self._finish(tracked, exception=e)
+                return
+            raise
+        self._update(tracked, status, info.get("FailureReason"))
+
+    def _refresh_batch(self, kind: str, items: List[_Tracked]):
+        """用 List* 一次刷新该类型的所有资源"""
+        prefix = self.config.get_endpoint_name_prefix()
+        statuses: Dict[str, Tuple[str, Optional[str]]] = {}
+
+        if kind == ENDPOINT:
+            pages = self.sm.get_paginator("list_endpoints").paginate(NameContains=prefix)
+            for page in call_with_backoff(list, pages):
+                for ep in page["Endpoints"]:
+                    statuses[ep["EndpointName"]] = (ep["EndpointStatus"], None)
+        else:
+            pages = self.sm.get_paginator("list_transform_jobs").paginate(
+                NameContains=prefix, StatusEquals="InProgress"
+            )
+            for page in call_with_backoff(list, pages):
+                for job in page["TransformJobSummaries"]:
+                    statuses[job["TransformJobName"]] = (job["TransformJobStatus"], None)
+
+        for tracked in items:
+            if tracked.name not in statuses:
+                # 刚创建尚未出现在列表中，或已离开 InProgress: 单独确认
+                self._refresh_one(tracked)
+                continue
+
+            status, reason = statuses[tracked.name]
+            if status == "Failed" and kind == ENDPOINT:
+                # ListEndpoints 不返回失败原因
+                self._refresh_one(tracked)
+            else:
+                self._update(tracked, status, reason)
+
+    def _update(self, tracked: _Tracked, status: str, failure_reason: Optional[str]):
+        if status != tracked.status:
+            tracked.status = status
+            # 状态变化后恢复快速轮询
+            tracked.interval = self.min_interval / self.backoff
+
+        if status in _TERMINAL_STATUSES[tracked.kind]:
+            now = self._clock()
+            self._finish(
+                tracked,
+                result={
+                    "name": tracked.name,
+                    "kind": tracked.kind,
+                    "status": status,
+                    "failure_reason": failure_reason,
+                    "finished_at": now,
+                    "elapsed": now - tracked.tracked_at,
+                },
+            )
+
+    def _finish(self, tracked: _Tracked, result: dict = None, exception: Exception = None):
+        with self._cond:
+            self._tracked.pop((tracked.kind, tracked.name), None)
+        if tracked.future.done():
+            return
+        if exception is not None:
+            tracked.future.set_exception(exception)
+        else:
+            tracked.future.set_result(result)
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._tracked and not self._stopped:
+                    self._cond.wait()
+                if self._stopped:
+                    return
+
+            delay = self.poll_once()
+
+            with self._cond:
+                if self._stopped:
+                    return
+                # 有新资源加入时提前唤醒
+                self._cond.wait(timeout=delay)
+
+    def stop(self):
+        """停止后台线程"""
+        with self._cond:
+            self._stopped = True
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join()
+
+
+_pollers: Dict[Tuple[str, str], StatusPoller] = {}
+_pollers_lock = threading.Lock()
+
+
+def get_poller(config: DeployConfig = None) -> StatusPoller:
+    """获取共享的 StatusPoller（按 Region + 项目前缀，每进程一个）"""
+    if config is None:
+        config = get_config()
+
+    key = (config.region, config.get_endpoint_name_prefix())
+    with _pollers_lock:
+        poller = _pollers.get(key)
+        if poller is None:
+            poller = StatusPoller(config)
+            _pollers[key] = poller
+    return poller
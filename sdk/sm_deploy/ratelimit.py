@@ -0,0 +1,322 @@
+# =============================================================================
+# ratelimit.py - 推理调用的限流与自适应重试
+# =============================================================================
+# 每个 Endpoint 一个 EndpointLimiter（进程内共享）:
+#   - 令牌桶: 限制请求速率（可选）
+#   - AIMD 并发: 收到限流时并发上限乘性减小，成功时加性恢复
+#   - 重试: 限流总是重试；5xx / 连接错误仅在幂等时重试；ModelError 和 4xx 不重试
+#     退避为指数 + 全抖动，并受重试预算限制（重试数不超过请求数的一定比例），
+#     避免突发负载下的重试风暴
+#   - 计数: 请求、重试、限流、错误次数，以及当前并发上限
+# =============================================================================
+
+import random
+import threading
+import time
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from .clients import THROTTLING_ERROR_CODES
+from . import metrics
+
+# 错误分类
+THROTTLE = "throttle"
+TRANSIENT = "transient"
+MODEL_ERROR = "model_error"
+CLIENT_ERROR = "client_error"
+
+# 可重试的 5xx
+_TRANSIENT_STATUSES = {500, 502, 503, 504}
+
+# 视为临时故障的网络错误（botocore 异常类名）
+_CONNECTION_ERRORS = {
+    "EndpointConnectionError",
+    "ConnectTimeoutError",
+    "ReadTimeoutError",
+    "ConnectionClosedError",
+}
+
+
+def classify_error(error: BaseException) -> str:
+    """
+    将调用异常分类为 throttle / transient / model_error / client_error
+
+    - throttle: 限流错误码或 HTTP 429（请求未被处理，可安全重试）
+    - transient: 500/502/503/504 或连接错误（仅幂等请求可重试）
+    - model_error: 容器返回错误（ModelError / 424），重试通常无效
+    - client_error: 其它错误（参数、权限等）
+    """
+    response = getattr(error, "response", None)
+    if isinstance(response, dict):
+        code = response.get("Error", {}).get("Code", "")
+        status = response.get("ResponseMetadata", {}).get("HTTPStatusCode", 0)
+        if code in THROTTLING_ERROR_CODES or status == 429:
+            return THROTTLE
+        if code == "ModelError" or status == 424:
+            return MODEL_ERROR
+        if status in _TRANSIENT_STATUSES or code in ("InternalFailure", "ServiceUnavailable"):
+            return TRANSIENT
+        return CLIENT_ERROR
+    if type(error).__name__ in _CONNECTION_ERRORS or isinstance(error, (ConnectionError, TimeoutError)):
+        return TRANSIENT
+    return CLIENT_ERROR
+
+
+class EndpointLimiter:
+    """
+    单个 Endpoint 的限流器和重试策略
+
+    Example:
+        limiter = get_limiter("rc-fraud-detection-sklearn-v1")
+        result = limiter.call(runtime.invoke_endpoint, EndpointName=..., Body=...)
+        print(limiter.stats())
+    """
+
+    def __init__(
+        self,
+        name: str = "",
+        rate: Optional[float] = None,
+        burst: Optional[int] = None,
+        max_concurrency: int = 256,
+        min_concurrency: int = 1,
+        decrease_factor: float = 0.5,
+        max_attempts: int = 4,
+        base_delay: float = 0.05,
+        max_delay: float = 5.0,
+        retry_budget: float = 0.2,
+        max_retry_tokens: float = 10.0,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ):
+        """
+        Args:
+            name: Endpoint 名称（仅用于统计）
+            rate: 每秒最多请求数（含重试；None 表示不限速）
+            burst: 令牌桶容量（默认等于 rate，至少 1）
+            max_concurrency: 并发上限的最大值（初始值）
+            min_concurrency: 并发上限的最小值
+            decrease_factor: 限流时并发上限的乘数
+            max_attempts: 每次调用的最大尝试次数（含首次）
+            base_delay: 首次重试退避基准（秒）
+            max_delay: 单次退避上限（秒）
+            retry_budget: 每个请求为重试预算存入的令牌数（0.2 表示重试不超过请求数的 20%）
+            max_retry_tokens: 重试预算容量（允许的突发重试数）
+            clock: 时钟（可注入，便于测试）
+            sleep: 等待函数（可注入，便于测试）
+        """
+        if min_concurrency < 1 or max_concurrency < min_concurrency:
+            raise ValueError("require 1 <= min_concurrency <= max_concurrency")
+        if not 0 < decrease_factor < 1:
+            raise ValueError("decrease_factor must be in (0, 1)")
+
+        self.name = name
+        self.rate = rate
+        self.burst = max(1.0, float(burst if burst is not None else (rate or 1)))
+        self.max_concurrency = max_concurrency
+        self.min_concurrency = min_concurrency
+        self.decrease_factor = decrease_factor
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.retry_budget = retry_budget
+        self.max_retry_tokens = max_retry_tokens
+        self._clock = clock
+        self._sleep = sleep
+
+        self._cond = threading.Condition()
+        self._limit = float(max_concurrency)
+        self._in_flight = 0
+        self._last_decrease = float("-inf")
+        self._tokens = self.burst
+        self._refilled_at = clock()
+        self._retry_tokens = max_retry_tokens
+        self._counters = {
+            "requests": 0,
+            "attempts": 0,
+            "retries": 0,
+            "throttles": 0,
+            "transient_errors": 0,
+            "model_errors": 0,
+            "client_errors": 0,
+            "budget_exhausted": 0,
+        }
+
+    # -------------------------------------------------------------------------
+    # 令牌桶与并发
+    # -------------------------------------------------------------------------
+
+    def _take_token(self):
+        """取一个速率令牌，不足时等待"""
+        if self.rate is None:
+            return
+        while True:
+            with self._cond:
+                now = self._clock()
+                self._tokens = min(self.burst, self._tokens + (now - self._refilled_at) * self.rate)
+                self._refilled_at = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            self._sleep(wait)
+
+    def _acquire(self):
+        with self._cond:
+            while self._in_flight >= int(self._limit):
+                self._cond.wait()
+            self._in_flight += 1
+
+    def _release(self, outcome: Optional[str], started_at: float):
+        with self._cond:
+            self._in_flight -= 1
+            if outcome == THROTTLE:
+                # 只有在上次减小之后发出的请求被限流才再次减小（每个往返最多减一次）
+                if started_at >= self._last_decrease:
+                    self._limit = max(self.min_concurrency, self._limit * self.decrease_factor)
+                    self._last_decrease = self._clock()
+            elif outcome is None:
+                # 每 limit 个成功请求上限 +1
+                self._limit = min(self.max_concurrency, self._limit + 1.0 / self._limit)
+            self._cond.notify_all()
+
+    # -------------------------------------------------------------------------
+    # 调用
+    # -------------------------------------------------------------------------
+
+    def _backoff(self, attempt: int) -> float:
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** (attempt - 1)))
+
+    def call(self, fn: Callable, *args, idempotent: bool = True, retry: bool = True, **kwargs) -> Any:
+        """
+        在限流和重试策略下调用 fn
+
+        Args:
+            fn: 调用函数（如 runtime.invoke_endpoint）
+            idempotent: 请求是否幂等（决定 5xx / 连接错误是否重试）
+            retry: 是否重试（False 时只做限流和计数）
+        """
+        with self._cond:
+            self._counters["requests"] += 1
+            self._retry_tokens = min(self.max_retry_tokens, self._retry_tokens + self.retry_budget)
+
+        attempt = 0
+        while True:
+            attempt += 1
+            self._take_token()
+            self._acquire()
+            start = self._clock()
+            try:
+                result = fn(*args, **kwargs)
+            except BaseException as e:
+                kind = classify_error(e)
+                self._release(kind, start)
+                if not isinstance(e, Exception) or not self._should_retry(kind, attempt, idempotent, retry):
+                    raise
+                self._sleep(self._backoff(attempt))
+                continue
+
+            self._release(None, start)
+            with self._cond:
+                self._counters["attempts"] += 1
+            return result
+
+    def _should_retry(self, kind: str, attempt: int, idempotent: bool, retry: bool) -> bool:
+        with self._cond:
+            self._counters["attempts"] += 1
+            self._counters[
+                {
+                    THROTTLE: "throttles",
+                    TRANSIENT: "transient_errors",
+                    MODEL_ERROR: "model_errors",
+                    CLIENT_ERROR: "client_errors",
+                }[kind]
+            ] += 1
+
+            retryable = kind == THROTTLE or (kind == TRANSIENT and idempotent)
+            if not retry or not retryable or attempt >= self.max_attempts:
+                should_retry = False
+            elif self._retry_tokens < 1:
+                self._counters["budget_exhausted"] += 1
+                should_retry = False
+            else:
+                self._retry_tokens -= 1
+                self._counters["retries"] += 1
+                should_retry = True
+
+        if kind == THROTTLE:
+            metrics.increment("invoke_throttles_total", endpoint=self.name)
+        if should_retry:
+            metrics.increment("invoke_retries_total", endpoint=self.name)
+        return should_retry
+
+    def stats(self) -> Dict[str, Any]:
+        """计数和当前状态"""
+        with self._cond:
+            return {
+                "endpoint": self.name,
+                **self._counters,
+                "concurrency_limit": int(self._limit),
+                "in_flight": self._in_flight,
+                "retry_tokens": round(self._retry_tokens, 2),
+            }
+
+
+# =============================================================================
+# 进程级注册表
+# =============================================================================
+
+_lock = threading.Lock()
+_limiters: Dict[Tuple[str, Optional[str]], EndpointLimiter] = {}
+_defaults: Dict[Tuple[str, Optional[str]], Dict[str, Any]] = {}
+
+
+def get_limiter(endpoint_name: str, region: Optional[str] = None) -> EndpointLimiter:
+    """
+    获取 Endpoint 的共享限流器（首次使用时按 configure_limiter 的参数创建）
+
+    Args:
+        endpoint_name: 完整 Endpoint 名称
+        region: Region
+    """
+    key = (endpoint_name, region)
+    limiter = _limiters.get(key)
+    if limiter is not None:
+        return limiter
+
+    with _lock:
+        limiter = _limiters.get(key)
+        if limiter is None:
+            options = _defaults.get(key, _defaults.get((endpoint_name, None), {}))
+            limiter = EndpointLimiter(endpoint_name, **options)
+            _limiters[key] = limiter
+    return limiter
+
+
+def configure_limiter(endpoint_name: str, region: Optional[str] = None, **kwargs):
+    """
+    设置 Endpoint 的限流 / 重试参数（丢弃已有限流器，下次调用按新参数创建，计数清零）
+
+    Args:
+        endpoint_name: 完整 Endpoint 名称
+        region: Region（None 表示所有 Region）
+        **kwargs: EndpointLimiter 参数（rate, burst, max_concurrency, max_attempts ...）
+
+    Example:
+        configure_limiter("rc-fraud-detection-sklearn-v1", rate=200, max_concurrency=32)
+    """
+    EndpointLimiter(endpoint_name, **kwargs)  # 提前校验参数
+
+    with _lock:
+        _defaults[(endpoint_name, region)] = kwargs
+        for name, limiter_region in list(_limiters):
+            if name == endpoint_name and region in (None, limiter_region):
+                del _limiters[(name, limiter_region)]
+
+
+def limiter_stats() -> Dict[str, Dict[str, Any]]:
+    """所有 Endpoint 的计数 {endpoint[@region]: stats}"""
+    with _lock:
+        items = list(_limiters.items())
+    return {
+        f"{name}@{region}" if region else name: limiter.stats()
+        for (name, region), limiter in items
+    }
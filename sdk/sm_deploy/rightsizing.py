@@ -0,0 +1,522 @@
+# =============================================================================
+# rightsizing.py - Serverless 内存 / 并发选型
+# =============================================================================
+# Serverless 的内存大小同时决定 CPU 配额，直接影响推理延迟和单次调用成本。
+# sweep_serverless() 依次以不同 (内存, 最大并发) 部署同一模型，施加相同的
+# 固定负载（bench.run_load），统计每个配置的:
+#   延迟       p50 / p90 / p99（从计划发出时刻计时，含冷启动和排队）
+#   冷启动     部署后首个请求的耗时，负载期间的冷启动次数（ColdStartDetector）
+#   成本       每千次调用费用 = 内存 GB × 热请求平均耗时 × GB-秒单价 + 数据处理费
+# 并推荐满足延迟 SLO 的最便宜配置。
+#
+# 部署 / 删除 / 调用均可注入，--mock 在进程内的假 Endpoint 上运行（延迟与
+# 内存成反比、首个请求冷启动、超过最大并发时限流），供 CI 使用。
+#
+# 命令行:
+#   python -m sm_deploy.rightsizing --model sklearn-v1 --data s3://bucket/model.tar.gz \
+#       --image 123456789.dkr.ecr.region.amazonaws.com/sklearn:latest \
+#       --memory 1024 2048 4096 --rate 5 --duration 300 --slo-p99-ms 300
+#   python -m sm_deploy.rightsizing --mock --memory 1024 2048 3072 4096 --slo-p99-ms 150
+# =============================================================================
+
+import argparse
+import itertools
+import json
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Sequence, Union
+
+from .config import get_config, DeployConfig
+from .bench import run_load, endpoint_invoker
+from .serverless import ColdStartDetector
+
+# Serverless 可选的内存大小（MB）
+MEMORY_SIZES = (1024, 2048, 3072, 4096, 5120, 6144)
+MAX_CONCURRENCY_LIMIT = 200
+
+# us-east-1 x86 价格（USD），其它 Region / 架构通过参数覆盖
+PRICE_PER_GB_SECOND = 0.00002
+PRICE_PER_GB_PROCESSED = 0.016
+
+_GB = 1024 ** 3
+
+
+# =============================================================================
+# 成本
+# =============================================================================
+
+
+def cost_per_1k(
+    memory_mb: int,
+    duration_seconds: float,
+    data_bytes: int = 0,
+    price_per_gb_second: float = PRICE_PER_GB_SECOND,
+    price_per_gb_processed: float = PRICE_PER_GB_PROCESSED,
+) -> float:
+    """
+    每千次调用的估算费用（USD）
+
+    Args:
+        memory_mb: 内存大小
+        duration_seconds: 单次调用的计费时长（推理耗时，不含冷启动）
+        data_bytes: 单次调用的请求 + 响应字节数
+        price_per_gb_second: 计算单价（每 GB-秒）
+        price_per_gb_processed: 数据处理单价（每 GB）
+    """
+    compute = memory_mb / 1024 * duration_seconds * price_per_gb_second
+    data = data_bytes / _GB * price_per_gb_processed
+    return 1000 * (compute + data)
+
+
+def _size(value: Any) -> int:
+    if value is None:
+        return 0
+    if isinstance(value, (bytes, bytearray)):
+        return len(value)
+    if isinstance(value, str):
+        return len(value.encode("utf-8"))
+    try:
+        return len(json.dumps(value, default=str).encode("utf-8"))
+    except (TypeError, ValueError):
+        return 0
+
+
+# =============================================================================
+# 选型
+# =============================================================================
+
+
+def _tracked_invoker(
+    detector: ColdStartDetector,
+    invoker_factory: Callable[..., Callable[[], Any]],
+    **factory_kwargs,
+) -> Callable[[], Any]:
+    """为调用函数计时并交给 ColdStartDetector 分类（只用于单进程压测）"""
+    invoke = invoker_factory(**factory_kwargs)
+
+    def tracked():
+        started = time.monotonic()
+        response = invoke()
+        detector.record(time.monotonic() - started)
+        return response
+
+    return tracked
+
+
+def _configs(memory_sizes: Sequence[int], max_concurrency: Union[int, Sequence[int]]) -> List[tuple]:
+    concurrencies = [max_concurrency] if isinstance(max_concurrency, int) else list(max_concurrency)
+    for memory_mb in memory_sizes:
+        if memory_mb not in MEMORY_SIZES:
+            raise ValueError(f"memory size must be one of {MEMORY_SIZES}, got {memory_mb}")
+    for concurrency in concurrencies:
+        if not 1 <= concurrency <= MAX_CONCURRENCY_LIMIT:
+            raise ValueError(f"max_concurrency must be between 1 and {MAX_CONCURRENCY_LIMIT}")
+    if not memory_sizes or not concurrencies:
+        raise ValueError("require at least one memory size and max_concurrency")
+    return list(itertools.product(memory_sizes, concurrencies))
+
+
+def _meets(result: Dict[str, Any], slo_p99_ms: float, error_budget: float, max_cold_start_ms: Optional[float]) -> bool:
+    if "error" in result:
+        return False
+    if result["latency_ms"]["p99"] > slo_p99_ms or result["error_rate"] > error_budget:
+        return False
+    return max_cold_start_ms is None or result["first_request_ms"] <= max_cold_start_ms
+
+
+def recommend_config(
+    results: List[Dict[str, Any]],
+    slo_p99_ms: float,
+    error_budget: float = 0.01,
+    max_cold_start_ms: Optional[float] = None,
+) -> Optional[Dict[str, Any]]:
+    """
+    满足 SLO 的最便宜配置（费用相同时取 p99 更低者；都不满足时为 None）
+
+    Args:
+        results: sweep_serverless 的 results
+        slo_p99_ms: p99 延迟上限（毫秒）
+        error_budget: 可接受的错误率（含限流）
+        max_cold_start_ms: 部署后首个请求耗时上限（毫秒，可选）
+    """
+    candidates = [r for r in results if _meets(r, slo_p99_ms, error_budget, max_cold_start_ms)]
+    if not candidates:
+        return None
+    return min(candidates, key=lambda r: (r["cost_per_1k"], r["latency_ms"]["p99"]))
+
+
+def sweep_serverless(
+    model_name: str,
+    model_data_url: str = None,
+    image_uri: str = None,
+    payload: Any = None,
+    memory_sizes: Sequence[int] = (1024, 2048, 3072, 4096, 6144),
+    max_concurrency: Union[int, Sequence[int]] = 5,
+    rate: float = 5.0,
+    duration: float = 120.0,
+    arrival: str = "constant",
+    slo_p99_ms: float = 500.0,
+    error_budget: float = 0.01,
+    max_cold_start_ms: Optional[float] = None,
+    content_type: str = "application/json",
+    accept: str = "application/json",
+    environment: Dict[str, str] = None,
+    min_cold_seconds: float = 1.0,
+    price_per_gb_second: float = PRICE_PER_GB_SECOND,
+    price_per_gb_processed: float = PRICE_PER_GB_PROCESSED,
+    keep_endpoints: bool = False,
+    config: DeployConfig = None,
+    deploy_fn: Callable[[str, int, int], str] = None,
+    teardown_fn: Callable[[str], Any] = None,
+    invoker_factory: Callable[..., Callable[[], Any]] = endpoint_invoker,
+    on_result: Callable[[Dict[str, Any]], None] = None,
+) -> Dict[str, Any]:
+    """
+    依次部署各 (内存, 最大并发) 配置，施加相同负载并推荐满足 SLO 的最便宜配置
+
+    每个配置部署为独立的 Serverless Endpoint（{model_name}-m{内存}-c{并发}），
+    先发送一个请求测量冷启动，再按 rate / duration 施加负载，结束后删除
+    （keep_endpoints=True 时保留）。某个配置部署或压测失败时记录错误并继续。
+
+    Args:
+        model_name: 模型名称（各配置在其后加 -m{内存}-c{并发} 后缀）
+        model_data_url: S3 模型文件路径（使用默认 deploy_fn 时必填）
+        image_uri: Docker 镜像 URI（使用默认 deploy_fn 时必填）
+        payload: 请求体（每个请求相同）
+        memory_sizes: 候选内存大小（MB，见 MEMORY_SIZES）
+        max_concurrency: 最大并发（int 或候选列表，与内存组合）
+        rate: 请求速率（req/s）
+        duration: 每个配置的压测时长（秒）
+        arrival: 到达过程（constant / poisson，见 bench.run_load）
+        slo_p99_ms: p99 延迟上限（毫秒）
+        error_budget: 可接受的错误率（含限流）
+        max_cold_start_ms: 部署后首个请求耗时上限（毫秒，可选）
+        content_type: 请求 Content-Type
+        accept: 响应 Accept
+        environment: 容器环境变量
+        min_cold_seconds: 冷启动判定的最小耗时（秒，见 ColdStartDetector）
+        price_per_gb_second: 计算单价（每 GB-秒）
+        price_per_gb_processed: 数据处理单价（每 GB）
+        keep_endpoints: 压测后保留 Endpoint
+        config: 部署配置
+        deploy_fn: 部署函数 (name, memory_mb, max_concurrency) -> endpoint_name（默认 deploy_model）
+        teardown_fn: 删除函数 (endpoint_name)（默认 delete_endpoint，同时删除 Model）
+        invoker_factory: 调用函数工厂（以 endpoint_name / payload / content_type / accept /
+            config / max_in_flight 调用，见 bench.endpoint_invoker）
+        on_result: 每个配置完成后的回调
+
+    Returns:
+        {"results": [...], "recommended": result 或 None, "slo_p99_ms"}
+        每个 result 为 {"memory_mb", "max_concurrency", "endpoint_name", "first_request_ms",
+        "latency_ms", "error_rate", "throttled", "achieved_rps", "cold_starts", "cold_ms",
+        "warm_ms", "billed_ms", "cost_per_1k", "meets_slo"}，失败时为 {..., "error"}
+
+    Example:
+        report = sweep_serverless(
+            "sklearn-v1", "s3://bucket/model.tar.gz", image_uri,
+            payload={"instances": [[1, 2, 3, 4]]},
+            memory_sizes=(1024, 2048, 4096), rate=5, duration=300, slo_p99_ms=300,
+        )
+        print(report["recommended"]["memory_mb"])
+    """
+    configs = _configs(memory_sizes, max_concurrency)
+    if config is None and (deploy_fn is None or teardown_fn is None or invoker_factory is endpoint_invoker):
+        config = get_config()
+
+    if deploy_fn is None:
+        if not model_data_url or not image_uri:
+            raise ValueError("model_data_url and image_uri are required without deploy_fn")
+        from .model import deploy_model
+
+        def deploy_fn(name: str, memory_mb: int, concurrency: int) -> str:
+            return deploy_model(
+                model_name=name,
+                model_data_url=model_data_url,
+                image_uri=image_uri,
+                config=config,
+                environment=environment,
+                serverless=True,
+                serverless_memory_mb=memory_mb,
+                serverless_max_concurrency=concurrency,
+            )
+
+    if teardown_fn is None:
+        from .endpoint import delete_endpoint
+
+        def teardown_fn(endpoint_name: str):
+            delete_endpoint(endpoint_name, delete_model=True, config=config)
+
+    request_bytes = _size(payload)
+    results = []
+    for memory_mb, concurrency in configs:
+        print(f"🔬 Sizing {model_name}: {memory_mb} MB, max concurrency {concurrency}")
+        result: Dict[str, Any] = {"memory_mb": memory_mb, "max_concurrency": concurrency}
+        endpoint_name = None
+        try:
+            endpoint_name = deploy_fn(f"{model_name}-m{memory_mb}-c{concurrency}", memory_mb, concurrency)
+            result["endpoint_name"] = endpoint_name
+            result.update(
+                _measure(
+                    endpoint_name,
+                    memory_mb,
+                    concurrency,
+                    invoker_factory=invoker_factory,
+                    factory_kwargs=dict(
+                        endpoint_name=endpoint_name,
+                        payload=payload,
+                        content_type=content_type,
+                        accept=accept,
+                        config=config,
+                        max_in_flight=concurrency * 4,
+                    ),
+                    rate=rate,
+                    duration=duration,
+                    arrival=arrival,
+                    request_bytes=request_bytes,
+                    min_cold_seconds=min_cold_seconds,
+                    price_per_gb_second=price_per_gb_second,
+                    price_per_gb_processed=price_per_gb_processed,
+                )
+            )
+            result["meets_slo"] = _meets(result, slo_p99_ms, error_budget, max_cold_start_ms)
+        except Exception as e:
+            print(f"❌ Sizing failed for {memory_mb} MB / {concurrency}: {e}")
+            result["error"] = str(e)
+            result["meets_slo"] = False
+        finally:
+            if endpoint_name and not keep_endpoints:
+                try:
+                    teardown_fn(endpoint_name)
+                except Exception as e:
+                    print(f"⚠️  Failed to delete {endpoint_name}: {e}")
+
+        results.append(result)
+        if on_result is not None:
+            on_result(result)
+
+    recommended = recommend_config(results, slo_p99_ms, error_budget, max_cold_start_ms)
+    if recommended is not None:
+        print(
+            f"✅ Recommended: {recommended['memory_mb']} MB, max concurrency "
+            f"{recommended['max_concurrency']} (${recommended['cost_per_1k']:.4f} per 1k)"
+        )
+    else:
+        print(f"⚠️  No configuration meets p99 <= {slo_p99_ms} ms")
+    return {"results": results, "recommended": recommended, "slo_p99_ms": slo_p99_ms}
+
+
+def _measure(
+    endpoint_name: str,
+    memory_mb: int,
+    concurrency: int,
+    invoker_factory: Callable[..., Callable[[], Any]],
+    factory_kwargs: Dict[str, Any],
+    rate: float,
+    duration: float,
+    arrival: str,
+    request_bytes: int,
+    min_cold_seconds: float,
+    price_per_gb_second: float,
+    price_per_gb_processed: float,
+) -> Dict[str, Any]:
+    """对单个已部署的配置测量冷启动、延迟和费用"""
+    detector = ColdStartDetector(endpoint_name, min_cold_seconds=min_cold_seconds)
+    tracked_kwargs = dict(detector=detector, invoker_factory=invoker_factory, **factory_kwargs)
+
+    # 部署后的首个请求落在新容器上，即冷启动耗时
+    invoke = _tracked_invoker(**tracked_kwargs)
+    started = time.monotonic()
+    response = invoke()
+    first_request = time.monotonic() - started
+
+    # 压测在单进程内运行，ColdStartDetector 才能看到所有请求
+    load = run_load(
+        _tracked_invoker,
+        tracked_kwargs,
+        rate=rate,
+        duration=duration,
+        arrival=arrival,
+        processes=1,
+        max_in_flight=factory_kwargs["max_in_flight"],
+        warmup_requests=0,
+    )
+    starts = detector.stats()
+
+    # 冷启动时间不计费；热请求平均耗时含网络开销，估算偏保守
+    billed_ms = starts["warm_ms"]["mean"] if starts["requests"] > starts["cold"] else load["service_ms"]["mean"]
+    return {
+        "first_request_ms": first_request * 1000,
+        "latency_ms": load["latency_ms"],
+        "error_rate": load["error_rate"],
+        "throttled": load["errors"].get("throttle", 0),
+        "achieved_rps": load["achieved_rps"],
+        "cold_starts": starts["cold"],
+        "cold_ms": starts["cold_ms"],
+        "warm_ms": starts["warm_ms"],
+        "billed_ms": billed_ms,
+        "cost_per_1k": cost_per_1k(
+            memory_mb,
+            billed_ms / 1000,
+            request_bytes + _size(response),
+            price_per_gb_second,
+            price_per_gb_processed,
+        ),
+    }
+
+
+# =============================================================================
+# 本地假 Endpoint
+# =============================================================================
+
+
+class _MockThrottle(Exception):
+    """与 botocore ClientError 相同的 response 结构，classify_error 归为 throttle"""
+
+    def __init__(self, endpoint_name: str):
+        super().__init__(f"{endpoint_name}: maximum concurrency exceeded")
+        self.response = {
+            "Error": {"Code": "ThrottlingException"},
+            "ResponseMetadata": {"HTTPStatusCode": 429},
+        }
+
+
+class MockServerless:
+    """
+    进程内的假 Serverless Endpoint（不发送网络请求）
+
+    延迟 = overhead_ms + compute_ms × 1024 / 内存（CPU 配额与内存成正比）；
+    每个新容器的首个请求额外等待 cold_start_ms；超过最大并发时抛出限流错误。
+
+    Example:
+        mock = MockServerless(compute_ms=80, cold_start_ms=2000)
+        report = sweep_serverless("demo", deploy_fn=mock.deploy, teardown_fn=mock.delete,
+                                  invoker_factory=mock.invoker, min_cold_seconds=0.5)
+    """
+
+    def __init__(self, compute_ms: float = 80.0, overhead_ms: float = 5.0, cold_start_ms: float = 1500.0):
+        self.compute_ms = compute_ms
+        self.overhead_ms = overhead_ms
+        self.cold_start_ms = cold_start_ms
+        self.endpoints: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    def deploy(self, name: str, memory_mb: int, max_concurrency: int) -> str:
+        self.endpoints[name] = {
+            "latency": (self.overhead_ms + self.compute_ms * 1024 / memory_mb) / 1000,
+            "max_concurrency": max_concurrency,
+            "in_flight": 0,
+            "containers": 0,
+        }
+        return name
+
+    def delete(self, endpoint_name: str):
+        self.endpoints.pop(endpoint_name, None)
+
+    def invoker(self, endpoint_name: str, **kwargs) -> Callable[[], Any]:
+        endpoint = self.endpoints[endpoint_name]
+
+        def invoke():
+            with self._lock:
+                if endpoint["in_flight"] >= endpoint["max_concurrency"]:
+                    raise _MockThrottle(endpoint_name)
+                endpoint["in_flight"] += 1
+                # 并发超过已启动的容器数时启动新容器
+                cold = endpoint["in_flight"] > endpoint["containers"]
+                if cold:
+                    endpoint["containers"] += 1
+            try:
+                time.sleep(endpoint["latency"] + (self.cold_start_ms / 1000 if cold else 0.0))
+                return {"predictions": [0.5]}
+            finally:
+                with self._lock:
+                    endpoint["in_flight"] -= 1
+
+        return invoke
+
+
+# =============================================================================
+# 命令行
+# =============================================================================
+
+
+def _format_result(result: Dict[str, Any]) -> str:
+    head = f"{result['memory_mb']:5d} MB  c={result['max_concurrency']:<3d}"
+    if "error" in result:
+        return f"{head}  ERROR {result['error']}"
+    latency = result["latency_ms"]
+    return (
+        f"{head}  p50={latency['p50']:7.1f}  p99={latency['p99']:7.1f} ms"
+        f"  first={result['first_request_ms']:7.0f} ms  cold={result['cold_starts']:<3d}"
+        f"  errors={result['error_rate']:.1%}  ${result['cost_per_1k']:.5f}/1k"
+        f"  {'ok' if result['meets_slo'] else 'FAIL'}"
+    )
+
+
+def main(argv: List[str] = None):
+    parser = argparse.ArgumentParser(
+        prog="python -m sm_deploy.rightsizing", description="Serverless memory / concurrency sizing sweep"
+    )
+    parser.add_argument("--model", default="sizing", help="模型名称")
+    parser.add_argument("--data", help="S3 模型文件路径")
+    parser.add_argument("--image", help="Docker 镜像 URI")
+    parser.add_argument("--payload", help="请求体文件（默认一个小 JSON 请求）")
+    parser.add_argument("--content-type", default="application/json")
+    parser.add_argument("--accept", default="application/json")
+    parser.add_argument("--memory", type=int, nargs="+", default=[1024, 2048, 3072, 4096, 6144])
+    parser.add_argument("--max-concurrency", type=int, nargs="+", default=[5])
+    parser.add_argument("--rate", type=float, default=5.0, help="请求速率 (req/s)")
+    parser.add_argument("--duration", type=float, default=120.0, help="每个配置的压测时长（秒）")
+    parser.add_argument("--arrival", choices=("constant", "poisson"), default="constant")
+    parser.add_argument("--slo-p99-ms", type=float, default=500.0)
+    parser.add_argument("--error-budget", type=float, default=0.01)
+    parser.add_argument("--max-cold-start-ms", type=float)
+    parser.add_argument("--min-cold-seconds", type=float, default=1.0)
+    parser.add_argument("--price-per-gb-second", type=float, default=PRICE_PER_GB_SECOND)
+    parser.add_argument("--price-per-gb-processed", type=float, default=PRICE_PER_GB_PROCESSED)
+    parser.add_argument("--keep-endpoints", action="store_true")
+    parser.add_argument("--json", action="store_true", help="以 JSON 输出结果")
+    parser.add_argument("--mock", action="store_true", help="在进程内的假 Endpoint 上运行")
+    parser.add_argument("--mock-compute-ms", type=float, default=80.0, help="1024 MB 时的推理耗时")
+    parser.add_argument("--mock-cold-start-ms", type=float, default=1500.0)
+    args = parser.parse_args(argv)
+
+    if args.payload:
+        with open(args.payload, "rb") as f:
+            payload: Any = f.read()
+    else:
+        payload = {"instances": [[1.0, 2.0, 3.0]]}
+
+    hooks: Dict[str, Any] = {}
+    if args.mock:
+        mock = MockServerless(compute_ms=args.mock_compute_ms, cold_start_ms=args.mock_cold_start_ms)
+        hooks = dict(deploy_fn=mock.deploy, teardown_fn=mock.delete, invoker_factory=mock.invoker)
+
+    report = sweep_serverless(
+        args.model,
+        args.data,
+        args.image,
+        payload=payload,
+        memory_sizes=args.memory,
+        max_concurrency=args.max_concurrency,
+        rate=args.rate,
+        duration=args.duration,
+        arrival=args.arrival,
+        slo_p99_ms=args.slo_p99_ms,
+        error_budget=args.error_budget,
+        max_cold_start_ms=args.max_cold_start_ms,
+        content_type=args.content_type,
+        accept=args.accept,
+        min_cold_seconds=args.min_cold_seconds,
+        price_per_gb_second=args.price_per_gb_second,
+        price_per_gb_processed=args.price_per_gb_processed,
+        keep_endpoints=args.keep_endpoints,
+        on_result=None if args.json else lambda result: print("  " + _format_result(result)),
+        **hooks,
+    )
+
+    if args.json:
+        print(json.dumps(report, indent=2, default=str))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,277 @@
+# =============================================================================
+# serializers.py - 请求/响应序列化
+# =============================================================================
+# 按 content_type / accept 注册的序列化器和反序列化器
+#
+# 内置类型:
+#   application/json                      dict/list/ndarray <-> JSON
+#   text/csv                              ndarray/行列表 -> CSV（响应返回文本）
+#   application/x-npy                     ndarray <-> .npy（零拷贝发送）
+#   application/x-msgpack                 需要 msgpack
+#   application/vnd.apache.arrow.stream   需要 pyarrow
+# =============================================================================
+
+import csv
+import io
+import json
+from typing import Any, Callable, Dict, Union
+
+Body = Union[bytes, str, io.RawIOBase]
+
+_serializers: Dict[str, Callable[[Any], Body]] = {}
+_deserializers: Dict[str, Callable[[Any], Any]] = {}
+
+
+def _mime(content_type: str) -> str:
+    """去掉参数部分: 'text/csv; charset=utf-8' -> 'text/csv'"""
+    return content_type.split(";", 1)[0].strip().lower()
+
+
+def register_serializer(content_type: str, fn: Callable[[Any], Body]):
+    """
+    注册请求序列化器
+
+    Args:
+        content_type: 请求 Content-Type
+        fn: data -> bytes / str / 可 seek 的二进制文件对象
+
+    Example:
+        register_serializer("application/x-protobuf", lambda msg: msg.SerializeToString())
+    """
+    _serializers[_mime(content_type)] = fn
+
+
+def register_deserializer(accept: str, fn: Callable[[Any], Any]):
+    """
+    注册响应反序列化器
+
+    Args:
+        accept: 响应 Accept
+        fn: 可 read() 的响应流 -> 结果
+    """
+    _deserializers[_mime(accept)] = fn
+
+
+def serialize(data: Any, content_type: str) -> Body:
+    """
+    按 content_type 序列化请求体
+
+    bytes / str / 文件对象视为已序列化，原样发送；未注册类型的 dict/list 按 JSON 发送。
+    """
+    if isinstance(data, (bytes, bytearray, memoryview, str)) or hasattr(data, "read"):
+        return data
+
+    fn = _serializers.get(_mime(content_type))
+    if fn is None:
+        if isinstance(data, (dict, list)):
+            return json.dumps(data)
+        raise ValueError(
+            f"No serializer registered for content type '{content_type}'; "
+            "pass bytes/str or use register_serializer()"
+        )
+    return fn(data)
+
+
+def deserialize(body: Any, accept: str) -> Any:
+    """
+    按 accept 反序列化响应体
+
+    Args:
+        body: 响应流（StreamingBody 等可 read() 的对象）或 bytes
+        accept: 响应 Accept
+
+    Returns:
+        未注册的类型按 UTF-8 文本返回
+    """
+    if isinstance(body, (bytes, bytearray)):
+        body = io.BytesIO(body)
+
+    fn = _deserializers.get(_mime(accept))
+    if fn is None:
+        return _read_text(body)
+    return fn(body)
+
+
+def body_to_bytes(body: Body) -> bytes:
+    """将 serialize() 的结果转为 bytes（文件对象读取后复位）"""
+    if isinstance(body, str):
+        return body.encode("utf-8")
+    if hasattr(body, "read"):
+        position = body.tell() if body.seekable() else None
+        raw = body.read()
+        if position is not None:
+            body.seek(position)
+        return raw
+    return bytes(body)
+
+
+def _read_text(stream) -> str:
+    return stream.read().decode("utf-8")
+
+
+def _is_ndarray(data: Any) -> bool:
+    return type(data).__module__ == "numpy" and type(data).__name__ == "ndarray"
+
+
+# =============================================================================
+# JSON
+# =============================================================================
+
+
+def _serialize_json(data: Any) -> str:
+    if _is_ndarray(data):
+        data = data.tolist()
+    return json.dumps(data)
+
+
+def _deserialize_json(stream) -> Any:
+    result = _read_text(stream)
+    try:
+        return json.loads(result)
+    except json.JSONDecodeError:
+        return result
+
+
+# =============================================================================
+# CSV
+# =============================================================================
+
+
+def _serialize_csv(data: Any) -> bytes:
+    buffer = io.StringIO()
+    if _is_ndarray(data):
+        import numpy as np
+
+        np.savetxt(buffer, data if data.ndim > 1 else data.reshape(1, -1), delimiter=",", fmt="%.17g")
+    else:
+        writer = csv.writer(buffer, lineterminator="\n")
+        rows = data if data and isinstance(data[0], (list, tuple)) else [data]
+        writer.writerows(rows)
+    return buffer.getvalue().encode("utf-8")
+
+
+# =============================================================================
+# NumPy .npy
+# =============================================================================
+
+
+class NpyBody(io.RawIOBase):
+    """
+    .npy 格式请求体
+
+    由 .npy 头和数组内存视图拼接而成，发送时直接从数组缓冲区读取，
+    不生成中间 Python 列表或完整字节副本。支持 seek/tell（botocore 签名和重试需要）。
+    """
+
+    def __init__(self, array):
+        import numpy as np
+
+        if array.dtype.hasobject:
+            raise ValueError("application/x-npy does not support object arrays")
+
+        array = np.ascontiguousarray(array)
+        header = io.BytesIO()
+        np.lib.format.write_array_header_1_0(
+            header, np.lib.format.header_data_from_array_1_0(array)
+        )
+        self._array = array
+        self._parts = [memoryview(header.getvalue()), memoryview(array.reshape(-1).view(np.uint8))]
+        self._length = sum(len(p) for p in self._parts)
+        self._pos = 0
+
+    def __len__(self) -> int:
+        return self._length
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self._pos
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        if whence == io.SEEK_CUR:
+            offset += self._pos
+        elif whence == io.SEEK_END:
+            offset += self._length
+        self._pos = max(0, min(offset, self._length))
+        return self._pos
+
+    def readinto(self, buffer) -> int:
+        target = memoryview(buffer).cast("B")
+        written = 0
+        offset = self._pos
+        for part in self._parts:
+            if written == len(target):
+                break
+            if offset >= len(part):
+                offset -= len(part)
+                continue
+            chunk = part[offset : offset + len(target) - written]
+            target[written : written + len(chunk)] = chunk
+            written += len(chunk)
+            offset = 0
+        self._pos += written
+        return written
+
+
+def _serialize_npy(data: Any) -> NpyBody:
+    import numpy as np
+
+    return NpyBody(data if _is_ndarray(data) else np.asarray(data))
+
+
+def _deserialize_npy(stream) -> Any:
+    import numpy as np
+
+    return np.lib.format.read_array(stream, allow_pickle=False)
+
+
+# =============================================================================
+# msgpack / Arrow（可选依赖）
+# =============================================================================
+
+
+def _serialize_msgpack(data: Any) -> bytes:
+    import msgpack
+
+    if _is_ndarray(data):
+        data = data.tolist()
+    return msgpack.packb(data, use_bin_type=True)
+
+
+def _deserialize_msgpack(stream) -> Any:
+    import msgpack
+
+    return msgpack.unpackb(stream.read(), raw=False)
+
+
+def _serialize_arrow(data: Any) -> bytes:
+    import pyarrow as pa
+
+    if not isinstance(data, (pa.Table, pa.RecordBatch)):
+        data = pa.Table.from_pandas(data) if hasattr(data, "to_numpy") else pa.table(data)
+
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, data.schema) as writer:
+        writer.write(data)
+    return sink.getvalue().to_pybytes()
+
+
+def _deserialize_arrow(stream) -> Any:
+    import pyarrow as pa
+
+    return pa.ipc.open_stream(pa.py_buffer(stream.read())).read_all()
+
+
+register_serializer("application/json", _serialize_json)
+register_deserializer("application/json", _deserialize_json)
+register_serializer("text/csv", _serialize_csv)
+register_serializer("application/x-npy", _serialize_npy)
+register_deserializer("application/x-npy", _deserialize_npy)
+register_serializer("application/x-msgpack", _serialize_msgpack)
+register_deserializer("application/x-msgpack", _deserialize_msgpack)
+register_serializer("application/vnd.apache.arrow.stream", _serialize_arrow)
+register_deserializer("application/vnd.apache.arrow.stream", _deserialize_arrow)
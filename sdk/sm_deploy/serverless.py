@@ -0,0 +1,369 @@
+# =============================================================================
+# serverless.py - Serverless Endpoint 冷启动
+# =============================================================================
+# Serverless 变体空闲一段时间后容器被回收，之后的首个请求（以及并发超过
+# 已有容器数时的请求）需要等待容器启动，耗时数秒。缓解手段:
+#   ProvisionedConcurrency   预置并发（build_serverless_config），始终保持热容器，按时长计费
+#   KeepWarm                 后台定时发送轻量请求，让容器不被回收（尽力而为）
+#
+# 冷热统计: track_cold_starts() 之后，该 Endpoint 的每次 invoke_endpoint 按最后一次
+# 尝试的网络耗时（不含限流排队和重试退避）分类为 cold / warm（超过
+# max(min_cold_seconds, 热请求 EWMA × cold_factor) 视为冷启动），用于比较不同
+# 内存配置下的延迟与冷启动代价。
+# =============================================================================
+
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Optional
+
+from .config import get_config, DeployConfig
+from .bench import LatencyHistogram
+from . import metrics
+
+
+def build_serverless_config(
+    memory_mb: int = 2048,
+    max_concurrency: int = 5,
+    provisioned_concurrency: Optional[int] = None,
+) -> Dict[str, Any]:
+    """
+    构建 ProductionVariant 的 ServerlessConfig
+
+    Args:
+        memory_mb: 内存（1024-6144，步长 1024）
+        max_concurrency: 最大并发
+        provisioned_concurrency: 预置并发（不超过 max_concurrency；None 表示不预置）
+    """
+    serverless_config = {"MemorySizeInMB": memory_mb, "MaxConcurrency": max_concurrency}
+    if provisioned_concurrency:
+        if not 1 <= provisioned_concurrency <= max_concurrency:
+            raise ValueError("provisioned_concurrency must be between 1 and max_concurrency")
+        serverless_config["ProvisionedConcurrency"] = provisioned_concurrency
+    return serverless_config
+
+
+# =============================================================================
+# 冷热分类
+# =============================================================================
+
+
+class ColdStartDetector:
+    """
+    按延迟把调用分类为冷启动 / 热请求
+
+    网络耗时超过 max(min_cold_seconds, 热请求 EWMA × cold_factor) 视为冷启动；
+    同时记录距上一次调用的空闲时间，用于估算容器被回收前的空闲时长。
+
+    Example:
+        detector = track_cold_starts("sklearn-serverless")
+        ...
+        print(detector.stats())
+    """
+
+    def __init__(
+        self,
+        endpoint_name: str = "",
+        min_cold_seconds: float = 1.0,
+        cold_factor: float = 3.0,
+        alpha: float = 0.1,
+        clock=time.monotonic,
+    ):
+        """
+        Args:
+            endpoint_name: Endpoint 名称（用于指标标签）
+            min_cold_seconds: 冷启动的最小耗时（秒）
+            cold_factor: 相对热请求 EWMA 的倍数
+            alpha: 热请求 EWMA 的平滑系数
+            clock: 时钟（可注入，便于测试）
+        """
+        self.endpoint_name = endpoint_name
+        self.min_cold_seconds = min_cold_seconds
+        self.cold_factor = cold_factor
+        self.alpha = alpha
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._warm_ewma: Optional[float] = None
+        self._histograms = {"cold": LatencyHistogram(), "warm": LatencyHistogram()}
+        self.last_seen: Optional[float] = None
+        self._longest_warm_idle = 0.0
+        self._shortest_cold_idle: Optional[float] = None
+
+    @property
+    def cold_starts(self) -> int:
+        """已分类为冷启动的调用数"""
+        return self._histograms["cold"].count
+
+    def threshold(self) -> float:
+        """当前的冷启动判定阈值（秒）"""
+        if self._warm_ewma is None:
+            return self.min_cold_seconds
+        return max(self.min_cold_seconds, self._warm_ewma * self.cold_factor)
+
+    def record(self, seconds: float) -> str:
+        """记录一次调用的网络耗时，返回 "cold" 或 "warm" """
+        with self._lock:
+            finished = self._clock()
+            # 空闲时间从上一次调用结束到本次调用开始
+            idle = None if self.last_seen is None else max(0.0, finished - seconds - self.last_seen)
+            self.last_seen = finished
+
+            kind = "cold" if seconds > self.threshold() else "warm"
+            self._histograms[kind].record(seconds)
+            if kind == "warm":
+                self._warm_ewma = (
+                    seconds
+                    if self._warm_ewma is None
+                    else self._warm_ewma + self.alpha * (seconds - self._warm_ewma)
+                )
+                if idle is not None:
+                    self._longest_warm_idle = max(self._longest_warm_idle, idle)
+            elif idle is not None:
+                self._shortest_cold_idle = (
+                    idle if self._shortest_cold_idle is None else min(self._shortest_cold_idle, idle)
+                )
+
+        metrics.observe("serverless_invoke_seconds", seconds, endpoint=self.endpoint_name, start=kind)
+        if kind == "cold":
+            metrics.increment("cold_starts_total", endpoint=self.endpoint_name)
+        return kind
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        冷热统计
+
+        Returns:
+            {"endpoint", "requests", "cold", "cold_rate", "warm_ms", "cold_ms",
+             "cold_penalty_ms", "threshold_ms", "longest_warm_idle", "shortest_cold_idle"}
+            warm_ms / cold_ms 为 {"p50", "p90", "p99", "p99.9", "mean", "max"}；
+            cold_penalty_ms 为冷启动与热请求的 p50 之差；
+            longest_warm_idle / shortest_cold_idle 为空闲多久后仍为热请求 / 出现冷启动（秒），
+            可用于选择 KeepWarm 的间隔
+        """
+        with self._lock:
+            cold, warm = self._histograms["cold"], self._histograms["warm"]
+            requests = cold.count + warm.count
+            return {
+                "endpoint": self.endpoint_name,
+                "requests": requests,
+                "cold": cold.count,
+                "cold_rate": cold.count / requests if requests else 0.0,
+                "warm_ms": warm.summary(),
+                "cold_ms": cold.summary(),
+                "cold_penalty_ms": (
+                    (cold.percentile(50) - warm.percentile(50)) * 1000
+                    if cold.count and warm.count
+                    else None
+                ),
+                "threshold_ms": self.threshold() * 1000,
+                "longest_warm_idle": self._longest_warm_idle,
+                "shortest_cold_idle": self._shortest_cold_idle,
+            }
+
+
+_lock = threading.Lock()
+_detectors: Dict[str, ColdStartDetector] = {}
+
+
+def track_cold_starts(
+    endpoint_name: str,
+    config: DeployConfig = None,
+    **kwargs,
+) -> ColdStartDetector:
+    """
+    开始统计 Endpoint 的冷启动（已在统计时返回已有的 ColdStartDetector）
+
+    Args:
+        endpoint_name: Endpoint 名称
+        config: 部署配置
+        **kwargs: ColdStartDetector 参数（min_cold_seconds, cold_factor ...）
+    """
+    if config is None:
+        config = get_config()
+    prefix = config.get_endpoint_name_prefix()
+    full_endpoint_name = endpoint_name if endpoint_name.startswith(prefix) else f"{prefix}-{endpoint_name}"
+
+    with _lock:
+        detector = _detectors.get(full_endpoint_name)
+        if detector is None:
+            detector = _detectors[full_endpoint_name] = ColdStartDetector(full_endpoint_name, **kwargs)
+    return detector
+
+
+def untrack_cold_starts(endpoint_name: str):
+    """停止统计（完整 Endpoint 名称）"""
+    with _lock:
+        _detectors.pop(endpoint_name, None)
+
+
+def get_cold_start_detector(endpoint_name: str) -> Optional[ColdStartDetector]:
+    """完整 Endpoint 名称对应的 ColdStartDetector（未统计时为 None）"""
+    return _detectors.get(endpoint_name)
+
+
+def cold_start_stats() -> Dict[str, Dict[str, Any]]:
+    """所有统计中的 Endpoint {endpoint: stats}"""
+    with _lock:
+        detectors = list(_detectors.values())
+    return {detector.endpoint_name: detector.stats() for detector in detectors}
+
+
+# =============================================================================
+# 保温
+# =============================================================================
+
+
+class KeepWarm:
+    """
+    定时发送轻量请求，避免 Serverless 容器空闲被回收
+
+    每 interval 秒同时发送 concurrency 个请求（并发请求会落到不同容器，
+    从而保持多个容器）；上次保温之后已有真实请求时跳过本轮。容器回收时间
+    由 SageMaker 决定，保温只能降低冷启动概率，需要确定性时使用预置并发。
+
+    Example:
+        with KeepWarm("sklearn-serverless", {"instances": [[0, 0, 0]]}, interval=240):
+            serve_forever()
+    """
+
+    def __init__(
+        self,
+        endpoint_name: str,
+        payload: Any,
+        interval: float = 300.0,
+        concurrency: int = 1,
+        content_type: str = "application/json",
+        accept: str = "application/json",
+        jitter: float = 0.1,
+        skip_if_active: bool = True,
+        config: DeployConfig = None,
+    ):
+        """
+        Args:
+            endpoint_name: Endpoint 名称
+            payload: 保温请求体（应尽量小、推理快）
+            interval: 保温间隔（秒）
+            concurrency: 每轮同时发送的请求数（希望保持的热容器数）
+            content_type: 请求 Content-Type
+            accept: 响应 Accept
+            jitter: 间隔的随机抖动比例（多个进程保温同一 Endpoint 时错开）
+            skip_if_active: 上次保温后有真实请求时跳过本轮
+            config: 部署配置
+        """
+        if interval <= 0 or concurrency < 1:
+            raise ValueError("require interval > 0 and concurrency >= 1")
+        if config is None:
+            config = get_config()
+
+        self.config = config
+        self.payload = payload
+        self.interval = interval
+        self.concurrency = concurrency
+        self.content_type = content_type
+        self.accept = accept
+        self.jitter = jitter
+        self.skip_if_active = skip_if_active
+        self.detector = track_cold_starts(endpoint_name, config)
+        self.endpoint_name = self.detector.endpoint_name
+        self.pings = 0
+        self.skipped = 0
+        self.failures = 0
+        self.cold_pings = 0
+        self._last_ping: Optional[float] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _ping(self):
+        from .endpoint import invoke_endpoint
+
+        invoke_endpoint(
+            self.endpoint_name,
+            self.payload,
+            content_type=self.content_type,
+            accept=self.accept,
+            config=self.config,
+            retry=False,
+        )
+
+    def ping_once(self) -> int:
+        """
+        执行一轮保温
+
+        Returns:
+            本轮发送的请求数（跳过时为 0）
+        """
+        if self._recently_active():
+            self.skipped += 1
+            return 0
+
+        cold_before = self.detector.cold_starts
+        if self.concurrency == 1:
+            outcomes = [self._safe_ping()]
+        else:
+            with ThreadPoolExecutor(max_workers=self.concurrency) as pool:
+                outcomes = list(pool.map(lambda _: self._safe_ping(), range(self.concurrency)))
+
+        self.pings += len(outcomes)
+        self.failures += outcomes.count(False)
+        self.cold_pings += self.detector.cold_starts - cold_before
+        self._last_ping = time.monotonic()
+        return len(outcomes)
+
+    def _recently_active(self) -> bool:
+        """上次保温之后、最近 interval 秒内有真实请求"""
+        last_seen = self.detector.last_seen
+        return (
+            self.skip_if_active
+            and last_seen is not None
+            and (self._last_ping is None or last_seen > self._last_ping)
+            and time.monotonic() - last_seen < self.interval
+        )
+
+    def _safe_ping(self) -> bool:
+        try:
+            self._ping()
+            return True
+        except Exception as e:
+            print(f"⚠️  Keep-warm ping failed: {self.endpoint_name}: {e}")
+            return False
+
+    def _run(self):
+        while not self._stop.is_set():
+            sent = self.ping_once()
+            delay = self.interval * (1 + random.uniform(-self.jitter, self.jitter))
+            if not sent:
+                # 跳过时在最后一次真实请求之后 interval 秒再检查
+                delay = max(1.0, delay - (time.monotonic() - self.detector.last_seen))
+            self._stop.wait(delay)
+
+    def start(self) -> "KeepWarm":
+        """在后台线程开始保温（立即执行第一轮）"""
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name=f"keep-warm-{self.endpoint_name}", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        """停止保温"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def stats(self) -> Dict[str, Any]:
+        """{"endpoint", "pings", "skipped", "failures", "cold_pings"}"""
+        return {
+            "endpoint": self.endpoint_name,
+            "pings": self.pings,
+            "skipped": self.skipped,
+            "failures": self.failures,
+            "cold_pings": self.cold_pings,
+        }
+
+    def __enter__(self) -> "KeepWarm":
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
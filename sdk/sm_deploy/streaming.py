@@ -0,0 +1,159 @@
+# =============================================================================
+# streaming.py - 流式推理响应 (InvokeEndpointWithResponseStream)
+# =============================================================================
+# 按需拉取 event-stream 中的 PayloadPart 并增量解码:
+#   bytes      每个分片原样产出
+#   text       UTF-8 增量解码（多字节字符跨分片时自动拼接）
+#   lines      按换行产出文本行（不含换行符）
+#   jsonlines  每行 JSON 解析后产出（空行跳过）
+#
+# 只有消费者调用 next() 时才从连接读取下一个事件，消费慢时由 TCP
+# 流控让服务端暂停发送（背压），内存中最多保留一个未完成的行。
+# =============================================================================
+
+import codecs
+import json
+import time
+from typing import Any, Callable, Iterable, Iterator, Optional
+
+DECODERS = ("bytes", "text", "lines", "jsonlines")
+
+
+class ResponseStream:
+    """
+    流式推理响应
+
+    Attributes:
+        content_type: 响应 Content-Type
+        time_to_first_byte: 从发出请求到收到首个分片的秒数（尚未收到时为 None）
+        bytes_received: 已收到的字节数
+        chunks_received: 已收到的分片数
+
+    Example:
+        with invoke_endpoint_stream("llm-v1", {"inputs": "Hello"}, decode="jsonlines") as stream:
+            for event in stream:
+                print(event["token"]["text"], end="", flush=True)
+        print(stream.time_to_first_byte)
+    """
+
+    def __init__(
+        self,
+        events: Iterable[dict],
+        decode: str = "bytes",
+        content_type: Optional[str] = None,
+        started_at: Optional[float] = None,
+        max_line_bytes: int = 16 * 1024 * 1024,
+        on_close: Callable[[], None] = None,
+    ):
+        """
+        Args:
+            events: event-stream 事件（{"PayloadPart": {"Bytes": b"..."}}）
+            decode: bytes / text / lines / jsonlines
+            content_type: 响应 Content-Type
+            started_at: 请求发出时刻（time.perf_counter()），用于计算首字节时间
+            max_line_bytes: 单行最大长度（lines / jsonlines 时，防止无换行输出占满内存）
+            on_close: 关闭时的回调（释放底层连接）
+        """
+        if decode not in DECODERS:
+            raise ValueError(f"Unsupported decode: {decode} (expected one of {', '.join(DECODERS)})")
+
+        self.content_type = content_type
+        self.decode = decode
+        self.max_line_bytes = max_line_bytes
+        self.time_to_first_byte: Optional[float] = None
+        self.bytes_received = 0
+        self.chunks_received = 0
+        self._events = events
+        self._started_at = started_at if started_at is not None else time.perf_counter()
+        self._on_close = on_close
+        self._closed = False
+        self._iterator = self._decode()
+
+    def _payloads(self) -> Iterator[bytes]:
+        for event in self._events:
+            part = event.get("PayloadPart")
+            if part is None:
+                continue
+            chunk = part.get("Bytes", b"")
+            if not chunk:
+                continue
+            if self.time_to_first_byte is None:
+                self.time_to_first_byte = time.perf_counter() - self._started_at
+            self.bytes_received += len(chunk)
+            self.chunks_received += 1
+            yield chunk
+
+    def _decode(self) -> Iterator[Any]:
+        if self.decode == "bytes":
+            yield from self._payloads()
+            return
+
+        decoder = codecs.getincrementaldecoder("utf-8")()
+        if self.decode == "text":
+            for chunk in self._payloads():
+                text = decoder.decode(chunk)
+                if text:
+                    yield text
+            tail = decoder.decode(b"", final=True)
+            if tail:
+                yield tail
+            return
+
+        parse = json.loads if self.decode == "jsonlines" else None
+        for line in self._lines(decoder):
+            if parse is None:
+                yield line
+            elif line.strip():
+                yield parse(line)
+
+    def _lines(self, decoder) -> Iterator[str]:
+        pending = ""
+        for chunk in self._payloads():
+            pending += decoder.decode(chunk)
+            *lines, pending = pending.split("\n")
+            for line in lines:
+                yield line.rstrip("\r")
+            if len(pending) > self.max_line_bytes:
+                raise ValueError(f"Line exceeds max_line_bytes ({self.max_line_bytes})")
+        pending += decoder.decode(b"", final=True)
+        if pending:
+            yield pending.rstrip("\r")
+
+    def __iter__(self) -> "ResponseStream":
+        return self
+
+    def __next__(self) -> Any:
+        if self._closed:
+            raise StopIteration
+        try:
+            return next(self._iterator)
+        except StopIteration:
+            self.close()
+            raise
+        except BaseException:
+            self.close()
+            raise
+
+    def read(self) -> Any:
+        """读取剩余全部内容（bytes / text 拼接返回，lines / jsonlines 返回列表）"""
+        items = list(self)
+        if self.decode == "bytes":
+            return b"".join(items)
+        if self.decode == "text":
+            return "".join(items)
+        return items
+
+    def close(self):
+        """停止读取并释放底层连接（未读完时服务端会收到断开）"""
+        if self._closed:
+            return
+        self._closed = True
+        self._iterator.close()
+        if self._on_close is not None:
+            self._on_close()
+
+    def __enter__(self) -> "ResponseStream":
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
@@ -0,0 +1,284 @@
+# =============================================================================
+# testing.py - 测试替身
+# =============================================================================
+# 不访问 AWS 的模拟时钟、SageMaker Client 和 S3 Client，用于测试 StatusPoller、
+# 分片 Batch Transform 等依赖时间推进和资源状态变化的组件:
+#   FakeClock        可手动推进的时钟（传给 clock 参数）
+#   FakeSageMaker    按模拟时钟推进 Endpoint / Transform Job 状态，记录 API 调用次数
+#   FakeS3           内存中的 S3 对象存储（put / get / head / list）
+# =============================================================================
+
+import io
+from collections import Counter, deque
+from typing import Any, Dict, List, Optional, Tuple
+
+
+class FakeClock:
+    """
+    模拟时钟
+
+    Example:
+        clock = FakeClock()
+        clock.advance(30)
+        clock()  # 30.0
+    """
+
+    def __init__(self, start: float = 0.0):
+        self.now = start
+
+    def __call__(self) -> float:
+        return self.now
+
+    def advance(self, seconds: float) -> float:
+        """推进时钟，返回推进后的时刻"""
+        self.now += max(0.0, seconds)
+        return self.now
+
+
+class FakeClientError(Exception):
+    """与 botocore ClientError 相同的 response 结构"""
+
+    def __init__(self, code: str, message: str):
+        super().__init__(f"An error occurred ({code}): {message}")
+        self.response = {"Error": {"Code": code, "Message": message}}
+
+
+class _FakePaginator:
+    def __init__(self, client: "FakeSageMaker", operation: str):
+        self._client = client
+        self._operation = operation
+
+    def paginate(self, **kwargs):
+        return self._client._list(self._operation, **kwargs)
+
+
+class FakeSageMaker:
+    """
+    内存中的 SageMaker Client 替身
+
+    每个资源的状态是一条时间线，按 clock() 取当前状态；describe_* / list_* 的
+    调用次数记录在 calls 中。不存在的资源抛出与 SageMaker 相同文案的错误。
+
+    Example:
+        clock = FakeClock()
+        sm = FakeSageMaker(clock)
+        sm.set_endpoint("ep", "Creating")
+        sm.set_endpoint("ep", "InService", at=300)
+        sm.describe_endpoint(EndpointName="ep")["EndpointStatus"]  # Creating
+    """
+
+    exceptions = type("exceptions", (), {"ClientError": FakeClientError})
+
+    def __init__(self, clock: FakeClock = None, page_size: int = 100):
+        """
+        Args:
+            clock: 模拟时钟（默认新建）
+            page_size: list_* 每页的条数
+        """
+        self.clock = clock or FakeClock()
+        self.page_size = page_size
+        self.calls: Counter = Counter()
+        self.transform_jobs: Dict[str, Dict[str, Any]] = {}
+        self._timelines: Dict[Tuple[str, str], List[Tuple[float, str, Optional[str]]]] = {}
+        self._create_errors: deque = deque()
+        self._transform_outcomes: List[List[Any]] = []
+
+    # -------------------------------------------------------------------------
+    # 设置状态
+    # -------------------------------------------------------------------------
+
+    def _set(self, kind: str, name: str, status: str, at: Optional[float], failure_reason: Optional[str]):
+        timeline = self._timelines.setdefault((kind, name), [])
+        timeline.append((self.clock() if at is None else at, status, failure_reason))
+        timeline.sort(key=lambda entry: entry[0])
+
+    def set_endpoint(self, name: str, status: str, at: float = None, failure_reason: str = None):
+        """从时刻 at（默认当前）起 Endpoint 处于 status"""
+        self._set("endpoint", name, status, at, failure_reason)
+
+    def set_transform_job(self, name: str, status: str, at: float = None, failure_reason: str = None):
+        """从时刻 at（默认当前）起 Transform Job 处于 status"""
+        self._set("transform_job", name, status, at, failure_reason)
+
+    def fail_next_create(self, code: str = "ValidationException", message: str = "create failed", times: int = 1):
+        """接下来 times 次 create_transform_job 直接抛出错误"""
+        self._create_errors.extend([FakeClientError(code, message)] * times)
+
+    def set_transform_outcome(
+        self,
+        name_contains: str,
+        status: str = "Completed",
+        failure_reason: str = None,
+        duration: float = 0.0,
+        times: int = None,
+    ):
+        """
+        之后创建的、名称包含 name_contains 的 Transform Job 在 duration 秒后进入 status
+
+        Args:
+            times: 生效次数（None 表示一直生效）；未匹配的 Job 立即 Completed
+        """
+        self._transform_outcomes.append([name_contains, status, failure_reason, duration, times])
+
+    def _current(self, kind: str, name: str) -> Optional[Tuple[str, Optional[str]]]:
+        now = self.clock()
+        current = None
+        for at, status, reason in self._timelines.get((kind, name), []):
+            if at <= now:
+                current = (status, reason)
+        return current
+
+    def _names(self, kind: str) -> List[str]:
+        return sorted(name for k, name in self._timelines if k == kind and self._current(k, name))
+
+    def _pages(self, key: str, items: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        chunks = [items[i:i + self.page_size] for i in range(0, len(items), self.page_size)]
+        return [{key: chunk} for chunk in chunks or [[]]]
+
+    # -------------------------------------------------------------------------
+    # SageMaker API
+    # -------------------------------------------------------------------------
+
+    def describe_endpoint(self, EndpointName: str) -> Dict[str, Any]:
+        self.calls["describe_endpoint"] += 1
+        current = self._current("endpoint", EndpointName)
+        if current is None:
+            raise FakeClientError("ValidationException", f'Could not find endpoint "{EndpointName}".')
+        info = {"EndpointName": EndpointName, "EndpointStatus": current[0]}
+        if current[1]:
+            info["FailureReason"] = current[1]
+        return info
+
+    def describe_transform_job(self, TransformJobName: str) -> Dict[str, Any]:
+        self.calls["describe_transform_job"] += 1
+        current = self._current("transform_job", TransformJobName)
+        if current is None:
+            raise FakeClientError("ValidationException", f"Transform job {TransformJobName} does not exist.")
+        info = dict(self.transform_jobs.get(TransformJobName, {}))
+        info.update(TransformJobName=TransformJobName, TransformJobStatus=current[0])
+        if current[1]:
+            info["FailureReason"] = current[1]
+        return info
+
+    def create_transform_job(self, TransformJobName: str, **params) -> Dict[str, Any]:
+        self.calls["create_transform_job"] += 1
+        if self._create_errors:
+            raise self._create_errors.popleft()
+        if TransformJobName in self.transform_jobs:
+            raise FakeClientError("ValidationException", f"Job name {TransformJobName} must be unique.")
+
+        status, reason, duration = "Completed", None, 0.0
+        for outcome in self._transform_outcomes:
+            if outcome[0] in TransformJobName and outcome[4] != 0:
+                _, status, reason, duration, times = outcome
+                if times is not None:
+                    outcome[4] = times - 1
+                break
+
+        self.transform_jobs[TransformJobName] = dict(params, TransformJobName=TransformJobName)
+        self.set_transform_job(TransformJobName, "InProgress")
+        self.set_transform_job(TransformJobName, status, at=self.clock() + duration, failure_reason=reason)
+        return {"TransformJobArn": f"arn:aws:sagemaker:us-east-1:000000000000:transform-job/{TransformJobName}"}
+
+    def stop_transform_job(self, TransformJobName: str) -> Dict[str, Any]:
+        self.calls["stop_transform_job"] += 1
+        current = self._current("transform_job", TransformJobName)
+        if current is None:
+            raise FakeClientError("ValidationException", f"Transform job {TransformJobName} does not exist.")
+        if current[0] == "InProgress":
+            self.set_transform_job(TransformJobName, "Stopped")
+        return {}
+
+    def get_paginator(self, operation: str) -> _FakePaginator:
+        return _FakePaginator(self, operation)
+
+    def _list(self, operation: str, NameContains: str = "", StatusEquals: str = None, **kwargs):
+        self.calls[operation] += 1
+        if operation == "list_endpoints":
+            items = [
+                {"EndpointName": name, "EndpointStatus": self._current("endpoint", name)[0]}
+                for name in self._names("endpoint")
+                if NameContains in name
+            ]
+            return iter(self._pages("Endpoints", items))
+        if operation == "list_transform_jobs":
+            items = [
+                {"TransformJobName": name, "TransformJobStatus": self._current("transform_job", name)[0]}
+                for name in self._names("transform_job")
+                if NameContains in name
+            ]
+            if StatusEquals:
+                items = [item for item in items if item["TransformJobStatus"] == StatusEquals]
+            return iter(self._pages("TransformJobSummaries", items))
+        raise NotImplementedError(operation)
+
+
+class FakeS3:
+    """
+    内存中的 S3 Client 替身
+
+    支持 put_object / get_object / head_object / delete_object 和
+    list_objects_v2 分页（Prefix / StartAfter），调用次数记录在 calls 中。
+
+    Example:
+        s3 = FakeS3()
+        s3.put_object(Bucket="b", Key="input/part-0.csv", Body=b"1,2\n")
+        s3.read("s3://b/input/part-0.csv")  # b"1,2\n"
+    """
+
+    exceptions = type("exceptions", (), {"ClientError": FakeClientError})
+
+    def __init__(self, page_size: int = 1000):
+        self.page_size = page_size
+        self.calls: Counter = Counter()
+        self.objects: Dict[Tuple[str, str], bytes] = {}
+
+    def read(self, s3_uri: str) -> bytes:
+        """按 s3:// URI 读取对象内容"""
+        bucket, _, key = s3_uri[len("s3://"):].partition("/")
+        return self.objects[(bucket, key)]
+
+    def put_object(self, Bucket: str, Key: str, Body=b"", **kwargs) -> Dict[str, Any]:
+        self.calls["put_object"] += 1
+        if hasattr(Body, "read"):
+            Body = Body.read()
+        if isinstance(Body, str):
+            Body = Body.encode("utf-8")
+        self.objects[(Bucket, Key)] = bytes(Body)
+        return {}
+
+    def _get(self, Bucket: str, Key: str) -> bytes:
+        if (Bucket, Key) not in self.objects:
+            raise FakeClientError("NoSuchKey", "The specified key does not exist.")
+        return self.objects[(Bucket, Key)]
+
+    def get_object(self, Bucket: str, Key: str, Range: str = None, **kwargs) -> Dict[str, Any]:
+        self.calls["get_object"] += 1
+        body = self._get(Bucket, Key)
+        if Range:
+            start, _, end = Range[len("bytes="):].partition("-")
+            body = body[int(start):int(end) + 1 if end else None]
+        return {"Body": io.BytesIO(body), "ContentLength": len(body)}
+
+    def head_object(self, Bucket: str, Key: str, **kwargs) -> Dict[str, Any]:
+        self.calls["head_object"] += 1
+        if (Bucket, Key) not in self.objects:
+            raise FakeClientError("404", "Not Found")
+        return {"ContentLength": len(self.objects[(Bucket, Key)])}
+
+    def delete_object(self, Bucket: str, Key: str, **kwargs) -> Dict[str, Any]:
+        self.calls["delete_object"] += 1
+        self.objects.pop((Bucket, Key), None)
+        return {}
+
+    def get_paginator(self, operation: str) -> _FakePaginator:
+        return _FakePaginator(self, operation)
+
+    def _list(self, operation: str, Bucket: str, Prefix: str = "", StartAfter: str = "", **kwargs):
+        if operation != "list_objects_v2":
+            raise NotImplementedError(operation)
+        self.calls[operation] += 1
+        keys = sorted(key for bucket, key in self.objects if bucket == Bucket and key.startswith(Prefix))
+        items = [{"Key": key, "Size": len(self.objects[(Bucket, key)])} for key in keys if key > StartAfter]
+        chunks = [items[i:i + self.page_size] for i in range(0, len(items), self.page_size)]
+        return iter([{"Contents": chunk, "KeyCount": len(chunk)} for chunk in chunks] or [{"KeyCount": 0}])
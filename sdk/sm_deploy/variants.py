@@ -0,0 +1,502 @@
+# =============================================================================
+# variants.py - 多变体 Endpoint 与流量切换
+# =============================================================================
+# 一个 EndpointConfig 可以包含多个生产变体 (ProductionVariants) 和影子变体
+# (ShadowProductionVariants):
+#   生产变体   按权重分配流量，每个变体有自己的模型、实例类型和实例数
+#   影子变体   按权重复制一部分生产流量，响应被丢弃，只用于观测候选模型的延迟和错误
+#
+# 流量切换 shift_traffic(): 用 UpdateEndpointWeightsAndCapacities 分步调整权重
+# （不重建实例），每一步观察一段时间的 CloudWatch 指标，满足阈值才进入下一步，
+# 否则恢复原权重。
+# =============================================================================
+
+import math
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, List, Optional, Sequence, Union
+
+from .config import get_config, DeployConfig
+from .clients import get_client
+from .cache import invalidate_endpoint_caches
+from .poller import get_poller
+from .serverless import build_serverless_config
+
+# CloudWatch 指标 (namespace AWS/SageMaker，维度 EndpointName + VariantName)
+_METRICS = {
+    "invocations": ("Invocations", "Sum"),
+    "errors_5xx": ("Invocation5XXErrors", "Sum"),
+    "model_errors": ("InvocationModelErrors", "Sum"),
+    "p99": ("ModelLatency", "p99"),
+}
+
+# 变体指标: {variant: {"invocations", "errors", "error_rate", "p99_ms"}}
+VariantMetrics = Dict[str, Dict[str, float]]
+
+
+@dataclass
+class VariantSpec:
+    """
+    EndpointConfig 中的一个变体
+
+    设置 serverless_memory_mb 时为 Serverless 变体（忽略 instance_type / instance_count）。
+
+    Example:
+        VariantSpec("current", "xgb-v1", "ml.c5.xlarge", instance_count=2, weight=0.9)
+        VariantSpec("compiled", "xgb-v1-neo", "ml.c5.large", instance_count=2, weight=0.1)
+    """
+
+    name: str
+    model_name: str
+    instance_type: str = "ml.t2.medium"
+    instance_count: int = 1
+    weight: float = 1.0
+    serverless_memory_mb: Optional[int] = None
+    serverless_max_concurrency: int = 5
+    serverless_provisioned_concurrency: Optional[int] = None
+
+
+def _full_name(name: str, prefix: str) -> str:
+    return name if name.startswith(prefix) else f"{prefix}-{name}"
+
+
+def build_production_variants(
+    variants: Sequence[Union[VariantSpec, Dict[str, Any]]],
+    prefix: str,
+) -> List[Dict[str, Any]]:
+    """
+    构建 CreateEndpointConfig 的 ProductionVariants / ShadowProductionVariants
+
+    Args:
+        variants: VariantSpec（或同名字段的 dict）列表
+        prefix: 项目前缀（模型名称缺少前缀时补上）
+    """
+    specs = [v if isinstance(v, VariantSpec) else VariantSpec(**v) for v in variants]
+    names = [spec.name for spec in specs]
+    if len(set(names)) != len(names):
+        raise ValueError(f"Duplicate variant names: {names}")
+
+    result = []
+    for spec in specs:
+        if spec.weight < 0:
+            raise ValueError(f"Variant {spec.name}: weight must be >= 0")
+        variant: Dict[str, Any] = {
+            "VariantName": spec.name,
+            "ModelName": _full_name(spec.model_name, prefix),
+            "InitialVariantWeight": float(spec.weight),
+        }
+        if spec.serverless_memory_mb:
+            variant["ServerlessConfig"] = build_serverless_config(
+                spec.serverless_memory_mb,
+                spec.serverless_max_concurrency,
+                spec.serverless_provisioned_concurrency,
+            )
+        else:
+            variant["InstanceType"] = spec.instance_type
+            variant["InitialInstanceCount"] = spec.instance_count
+        result.append(variant)
+    return result
+
+
+# =============================================================================
+# 权重与实例数
+# =============================================================================
+
+
+def get_variant_weights(endpoint_name: str, config: DeployConfig = None) -> Dict[str, float]:
+    """当前生产变体权重 {variant: weight}"""
+    if config is None:
+        config = get_config()
+
+    sm = get_client("sagemaker", config.region)
+    full_endpoint_name = _full_name(endpoint_name, config.get_endpoint_name_prefix())
+    info = sm.describe_endpoint(EndpointName=full_endpoint_name)
+    return {
+        v["VariantName"]: float(v.get("CurrentWeight", v.get("DesiredWeight", 0.0)))
+        for v in info["ProductionVariants"]
+    }
+
+
+def set_variant_weights(
+    endpoint_name: str,
+    weights: Dict[str, float] = None,
+    instance_counts: Dict[str, int] = None,
+    config: DeployConfig = None,
+    wait: bool = True,
+) -> str:
+    """
+    调整生产变体的权重和实例数（UpdateEndpointWeightsAndCapacities，不重建实例）
+
+    Args:
+        endpoint_name: Endpoint 名称
+        weights: {variant: 权重}（权重为相对值）
+        instance_counts: {variant: 实例数}
+        config: 部署配置
+        wait: 是否等待 InService
+
+    Returns:
+        完整 Endpoint 名称
+    """
+    if config is None:
+        config = get_config()
+
+    weights = weights or {}
+    instance_counts = instance_counts or {}
+    if not weights and not instance_counts:
+        raise ValueError("weights or instance_counts is required")
+
+    sm = get_client("sagemaker", config.region)
+    full_endpoint_name = _full_name(endpoint_name, config.get_endpoint_name_prefix())
+
+    desired = []
+    for name in sorted(set(weights) | set(instance_counts)):
+        item: Dict[str, Any] = {"VariantName": name}
+        if name in weights:
+            item["DesiredWeight"] = float(weights[name])
+        if name in instance_counts:
+            item["DesiredInstanceCount"] = instance_counts[name]
+        desired.append(item)
+
+    sm.update_endpoint_weights_and_capacities(
+        EndpointName=full_endpoint_name,
+        DesiredWeightsAndCapacities=desired,
+    )
+    # 未指定变体的请求会按新权重路由，缓存的响应可能来自旧变体
+    invalidate_endpoint_caches(full_endpoint_name)
+
+    if wait:
+        get_poller(config).wait_endpoint(full_endpoint_name, timeout=1800)
+
+    return full_endpoint_name
+
+
+# =============================================================================
+# 指标
+# =============================================================================
+
+
+def cloudwatch_variant_metrics(
+    endpoint_name: str,
+    variant_names: Sequence[str],
+    start: datetime,
+    end: datetime,
+    config: DeployConfig = None,
+) -> VariantMetrics:
+    """
+    从 CloudWatch 读取变体在 [start, end) 内的调用数、错误数和 p99 ModelLatency
+
+    时间窗口按整分钟聚合（CloudWatch 最小周期 60 秒）；窗口跨越多个周期时
+    计数求和，p99 取各周期最大值（偏保守）。
+
+    Returns:
+        {variant: {"invocations", "errors", "error_rate", "p99_ms"}}
+        没有数据时 p99_ms 为 None
+    """
+    if config is None:
+        config = get_config()
+
+    cloudwatch = get_client("cloudwatch", config.region)
+    period = max(60, int(math.ceil((end - start).total_seconds() / 60.0)) * 60)
+
+    queries = []
+    for index, variant in enumerate(variant_names):
+        for key, (metric, stat) in _METRICS.items():
+            queries.append(
+                {
+                    "Id": f"m{index}_{key}",
+                    "MetricStat": {
+                        "Metric": {
+                            "Namespace": "AWS/SageMaker",
+                            "MetricName": metric,
+                            "Dimensions": [
+                                {"Name": "EndpointName", "Value": endpoint_name},
+                                {"Name": "VariantName", "Value": variant},
+                            ],
+                        },
+                        "Period": period,
+                        "Stat": stat,
+                    },
+                    "ReturnData": True,
+                }
+            )
+
+    values: Dict[str, List[float]] = {}
+    paginator = cloudwatch.get_paginator("get_metric_data")
+    for page in paginator.paginate(MetricDataQueries=queries, StartTime=start, EndTime=end):
+        for item in page["MetricDataResults"]:
+            values.setdefault(item["Id"], []).extend(item["Values"])
+
+    result: VariantMetrics = {}
+    for index, variant in enumerate(variant_names):
+        invocations = sum(values.get(f"m{index}_invocations", []))
+        errors = sum(values.get(f"m{index}_errors_5xx", [])) + sum(
+            values.get(f"m{index}_model_errors", [])
+        )
+        latencies = values.get(f"m{index}_p99", [])
+        result[variant] = {
+            "invocations": invocations,
+            "errors": errors,
+            "error_rate": errors / invocations if invocations else 0.0,
+            # ModelLatency 单位为微秒
+            "p99_ms": max(latencies) / 1000.0 if latencies else None,
+        }
+    return result
+
+
+def _combine(metrics: VariantMetrics, variants: Sequence[str]) -> Dict[str, Any]:
+    """合并多个变体的指标（p99 按调用数加权平均）"""
+    invocations = sum(metrics[v]["invocations"] for v in variants)
+    errors = sum(metrics[v]["errors"] for v in variants)
+    weighted = [
+        (metrics[v]["p99_ms"], metrics[v]["invocations"])
+        for v in variants
+        if metrics[v]["p99_ms"] is not None and metrics[v]["invocations"]
+    ]
+    total = sum(count for _, count in weighted)
+    return {
+        "invocations": invocations,
+        "errors": errors,
+        "error_rate": errors / invocations if invocations else 0.0,
+        "p99_ms": sum(p99 * count for p99, count in weighted) / total if total else None,
+    }
+
+
+# =============================================================================
+# 流量切换
+# =============================================================================
+
+
+def _step_weights(
+    original: Dict[str, float], to_variant: str, from_variants: List[str], fraction: float
+) -> Dict[str, float]:
+    """to_variant 取得 (to + from) 原权重之和的 fraction，其余按原比例分给 from_variants"""
+    pool = original[to_variant] + sum(original[v] for v in from_variants)
+    if pool <= 0:
+        pool = 1.0
+    base = sum(original[v] for v in from_variants)
+    weights = {to_variant: pool * fraction}
+    for v in from_variants:
+        share = original[v] / base if base > 0 else 1.0 / len(from_variants)
+        weights[v] = pool * (1 - fraction) * share
+    return weights
+
+
+def _check(
+    candidate: Dict[str, Any],
+    reference: Optional[float],
+    max_error_rate: float,
+    max_p99_latency_ms: Optional[float],
+    max_latency_regression: Optional[float],
+) -> Optional[str]:
+    """返回不满足阈值的原因（满足时为 None）"""
+    if candidate["error_rate"] > max_error_rate:
+        return f"error rate {candidate['error_rate']:.2%} > {max_error_rate:.2%}"
+    p99 = candidate["p99_ms"]
+    if p99 is None:
+        return None
+    if max_p99_latency_ms is not None and p99 > max_p99_latency_ms:
+        return f"p99 {p99:.1f} ms > {max_p99_latency_ms:.1f} ms"
+    if max_latency_regression is not None and reference and p99 > reference * max_latency_regression:
+        return f"p99 {p99:.1f} ms > {max_latency_regression:g} x baseline {reference:.1f} ms"
+    return None
+
+
+def shift_traffic(
+    endpoint_name: str,
+    to_variant: str,
+    from_variants: List[str] = None,
+    steps: Sequence[float] = (0.1, 0.25, 0.5, 1.0),
+    bake_seconds: float = 600.0,
+    check_interval: float = 60.0,
+    max_error_rate: float = 0.01,
+    max_p99_latency_ms: float = None,
+    max_latency_regression: float = 1.2,
+    min_invocations: int = 100,
+    rollback: bool = True,
+    metrics_fn: Callable[..., VariantMetrics] = None,
+    config: DeployConfig = None,
+    sleep: Callable[[float], None] = time.sleep,
+) -> Dict[str, Any]:
+    """
+    分步把流量切换到 to_variant，指标超出阈值时停止并恢复原权重
+
+    每一步设置权重后观察 bake_seconds，候选变体调用数达到 min_invocations 后
+    每 check_interval 检查一次:
+    - 错误率（5xx + ModelError）<= max_error_rate
+    - p99 ModelLatency <= max_p99_latency_ms（可选）
+    - p99 <= max_latency_regression × 基线 p99（基线为同一窗口内 from_variants 的 p99；
+      其调用数不足 min_invocations 时用切换前 bake_seconds 内的基线）
+    观察结束时候选变体调用数不足 min_invocations 也视为失败（无法判断）。
+
+    Args:
+        endpoint_name: Endpoint 名称
+        to_variant: 候选变体
+        from_variants: 让出流量的变体（默认其它所有生产变体）
+        steps: 候选变体依次取得的流量比例
+        bake_seconds: 每一步的观察时间（秒）
+        check_interval: 检查间隔（秒）
+        max_error_rate: 错误率上限
+        max_p99_latency_ms: p99 绝对上限（毫秒）
+        max_latency_regression: p99 相对基线的上限倍数（None 表示不比较）
+        min_invocations: 每一步候选变体的最少调用数
+        rollback: 失败时是否恢复原权重
+        metrics_fn: 指标函数 (endpoint, variants, start, end, config) -> VariantMetrics
+                    （默认 cloudwatch_variant_metrics）
+        config: 部署配置
+        sleep: 等待函数（可注入，便于测试）
+
+    Returns:
+        {"status": "completed" / "rolled_back" / "failed", "reason", "weights",
+         "baseline", "steps": [{"fraction", "weights", "metrics", "reason"}]}
+
+    Example:
+        report = shift_traffic("xgb", to_variant="compiled", steps=(0.1, 0.5, 1.0),
+                               bake_seconds=900, max_latency_regression=1.1)
+        print(report["status"], report["reason"])
+    """
+    if config is None:
+        config = get_config()
+    metrics_fn = metrics_fn or cloudwatch_variant_metrics
+
+    full_endpoint_name = _full_name(endpoint_name, config.get_endpoint_name_prefix())
+    original = get_variant_weights(full_endpoint_name, config)
+    if to_variant not in original:
+        raise ValueError(f"Variant {to_variant} not found in {full_endpoint_name}: {sorted(original)}")
+    if from_variants is None:
+        from_variants = [v for v in original if v != to_variant]
+    missing = [v for v in from_variants if v not in original]
+    if missing or not from_variants:
+        raise ValueError(f"Invalid from_variants {from_variants} (variants: {sorted(original)})")
+    if any(not 0 < f <= 1 for f in steps):
+        raise ValueError("steps must be in (0, 1]")
+
+    def now() -> datetime:
+        return datetime.now(timezone.utc)
+
+    started = now()
+    baseline = _combine(
+        metrics_fn(full_endpoint_name, from_variants, started - timedelta(seconds=bake_seconds), started, config),
+        from_variants,
+    )
+    report: Dict[str, Any] = {
+        "status": "completed",
+        "reason": None,
+        "baseline": baseline,
+        "steps": [],
+    }
+
+    def fail(reason: str) -> Dict[str, Any]:
+        report["reason"] = reason
+        if rollback:
+            set_variant_weights(full_endpoint_name, original, config=config)
+            report["status"] = "rolled_back"
+            print(f"↩️  Traffic restored on {full_endpoint_name}: {reason}")
+        else:
+            report["status"] = "failed"
+            print(f"⚠️  Traffic shift stopped on {full_endpoint_name}: {reason}")
+        report["weights"] = get_variant_weights(full_endpoint_name, config)
+        return report
+
+    weights = original
+    for fraction in steps:
+        weights = _step_weights(original, to_variant, from_variants, fraction)
+        set_variant_weights(full_endpoint_name, weights, config=config)
+        print(f"🔀 {full_endpoint_name}: {to_variant} at {fraction:.0%}")
+
+        step: Dict[str, Any] = {"fraction": fraction, "weights": weights, "metrics": None, "reason": None}
+        report["steps"].append(step)
+        step_start = now()
+        deadline = time.monotonic() + bake_seconds
+
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining > 0:
+                sleep(min(check_interval, remaining))
+            observed = metrics_fn(
+                full_endpoint_name, [to_variant] + from_variants, step_start, now(), config
+            )
+            candidate = observed[to_variant]
+            current = _combine(observed, from_variants)
+            reference = (
+                current["p99_ms"]
+                if current["invocations"] >= min_invocations and current["p99_ms"]
+                else baseline["p99_ms"]
+            )
+            step["metrics"] = {"candidate": candidate, "baseline": current, "reference_p99_ms": reference}
+
+            # 调用数达到 min_invocations 前错误率 / p99 没有统计意义（1/5 次错误即 20%），只继续观察
+            reason = None
+            if candidate["invocations"] >= min_invocations:
+                reason = _check(candidate, reference, max_error_rate, max_p99_latency_ms, max_latency_regression)
+            if reason is not None:
+                step["reason"] = reason
+                return fail(f"{to_variant} at {fraction:.0%}: {reason}")
+            if time.monotonic() >= deadline:
+                break
+
+        if candidate["invocations"] < min_invocations:
+            step["reason"] = "insufficient traffic"
+            return fail(
+                f"{to_variant} at {fraction:.0%}: only {candidate['invocations']:.0f} invocations"
+                f" (< {min_invocations})"
+            )
+
+    report["weights"] = weights
+    print(f"✅ Traffic shifted to {to_variant}: {full_endpoint_name}")
+    return report
+
+
+# =============================================================================
+# 影子变体
+# =============================================================================
+
+
+def compare_shadow(
+    endpoint_name: str,
+    window_seconds: float = 3600.0,
+    metrics_fn: Callable[..., VariantMetrics] = None,
+    config: DeployConfig = None,
+) -> Dict[str, Any]:
+    """
+    对比影子变体与生产变体在最近一段时间内的延迟和错误率
+
+    影子变体接收的是复制的生产流量，两者的请求分布一致，p99 可以直接比较。
+
+    Args:
+        endpoint_name: Endpoint 名称
+        window_seconds: 统计窗口（秒）
+        metrics_fn: 指标函数（默认 cloudwatch_variant_metrics）
+        config: 部署配置
+
+    Returns:
+        {"production": 合并指标, "shadow": {variant: 指标 + "latency_ratio"}, "variants": VariantMetrics}
+        latency_ratio = 影子 p99 / 生产 p99（缺少数据时为 None）
+    """
+    if config is None:
+        config = get_config()
+    metrics_fn = metrics_fn or cloudwatch_variant_metrics
+
+    sm = get_client("sagemaker", config.region)
+    full_endpoint_name = _full_name(endpoint_name, config.get_endpoint_name_prefix())
+    info = sm.describe_endpoint(EndpointName=full_endpoint_name)
+    production = [v["VariantName"] for v in info["ProductionVariants"]]
+    shadows = [v["VariantName"] for v in info.get("ShadowProductionVariants", [])]
+    if not shadows:
+        raise ValueError(f"Endpoint {full_endpoint_name} has no shadow variants")
+
+    end = datetime.now(timezone.utc)
+    observed = metrics_fn(
+        full_endpoint_name, production + shadows, end - timedelta(seconds=window_seconds), end, config
+    )
+    combined = _combine(observed, production)
+
+    shadow_report = {}
+    for name in shadows:
+        item = dict(observed[name])
+        item["latency_ratio"] = (
+            item["p99_ms"] / combined["p99_ms"] if item["p99_ms"] and combined["p99_ms"] else None
+        )
+        shadow_report[name] = item
+
+    return {"production": combined, "shadow": shadow_report, "variants": observed}
@@ -0,0 +1,25 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sm_deploy.config import DeployConfig  # noqa: E402
+
+
+@pytest.fixture
+def config() -> DeployConfig:
+    return DeployConfig(
+        company="acme",
+        team="ml",
+        project="test",
+        region="us-east-1",
+        account_id="000000000000",
+        vpc_id="vpc-test",
+        subnet_ids=["subnet-test"],
+        security_group_ids=["sg-test"],
+        inference_role_arn="arn:aws:iam::000000000000:role/test",
+        execution_role_arn="arn:aws:iam::000000000000:role/test",
+        bucket="test",
+    )
@@ -0,0 +1,139 @@
+import json
+
+import pytest
+
+pytest.importorskip("botocore")
+
+from sm_deploy.batch import run_sharded_batch_transform  # noqa: E402
+from sm_deploy.batch_results import iter_transform_job_results, iter_transform_results  # noqa: E402
+from sm_deploy.poller import StatusPoller  # noqa: E402
+from sm_deploy.testing import FakeS3, FakeSageMaker  # noqa: E402
+
+
+@pytest.fixture
+def s3():
+    s3 = FakeS3()
+    for i in range(6):
+        s3.put_object(Bucket="data", Key=f"input/part-{i}.csv", Body=b"1,2\n" * (i + 1))
+    return s3
+
+
+@pytest.fixture
+def sm():
+    return FakeSageMaker()
+
+
+@pytest.fixture
+def poller(config, sm):
+    poller = StatusPoller(config, sm_client=sm, min_interval=0.01, max_interval=0.01)
+    yield poller
+    poller.stop()
+
+
+def run(config, s3, sm, poller, **kwargs):
+    params = dict(
+        job_name="nightly",
+        model_name="sklearn-v1",
+        input_s3_uri="s3://data/input/",
+        output_s3_uri="s3://out/scores/",
+        num_shards=3,
+        retry_backoff=0,
+        timeout=30,
+        config=config,
+        s3_client=s3,
+        sm_client=sm,
+        poller=poller,
+    )
+    params.update(kwargs)
+    return run_sharded_batch_transform(**params)
+
+
+def test_shards_cover_all_inputs(config, s3, sm, poller):
+    report = run(config, s3, sm, poller)
+
+    assert report["status"] == "Completed"
+    assert report["completed_shards"] == report["total_shards"] == 3
+    assert sm.calls["create_transform_job"] == 3
+
+    keys = []
+    for shard in report["shards"]:
+        manifest = json.loads(s3.read(shard["manifest_s3_uri"]))
+        assert manifest[0] == {"prefix": "s3://data/"}
+        keys += manifest[1:]
+        job = sm.transform_jobs[shard["job_name"]]
+        assert job["TransformInput"]["DataSource"]["S3DataSource"]["S3DataType"] == "ManifestFile"
+        assert job["TransformOutput"]["S3OutputPath"] == shard["output_s3_uri"]
+    assert sorted(keys) == [f"input/part-{i}.csv" for i in range(6)]
+
+    completion = json.loads(s3.read("s3://out/scores/_COMPLETION.json"))
+    assert completion["status"] == "Completed"
+    assert [s["status"] for s in completion["shards"]] == ["Completed"] * 3
+
+
+def test_only_failed_shards_are_retried(config, s3, sm, poller):
+    sm.set_transform_outcome("-s001", "Failed", failure_reason="ClientError: bad record", times=1)
+
+    report = run(config, s3, sm, poller)
+
+    assert report["status"] == "Completed"
+    assert sm.calls["create_transform_job"] == 4
+    assert [s["attempts"] for s in report["shards"]] == [1, 2, 1]
+    assert report["shards"][1]["job_name"].endswith("-s001-r1")
+
+
+def test_create_failures_are_retried_then_reported(config, s3, sm, poller):
+    sm.fail_next_create(times=10)
+
+    report = run(config, s3, sm, poller, num_shards=1, max_retries=2)
+
+    assert report["status"] == "PartiallyFailed"
+    assert sm.calls["create_transform_job"] == 3
+    shard = report["shards"][0]
+    assert shard["status"] == "Failed"
+    assert "create failed" in shard["failure_reason"]
+    assert json.loads(s3.read("s3://out/scores/_COMPLETION.json"))["completed_shards"] == 0
+
+
+def test_timeout_stops_running_shards(config, s3, sm, poller):
+    sm.set_transform_outcome("-s", "Completed", duration=3600)
+
+    report = run(config, s3, sm, poller, max_concurrent_jobs=2, timeout=0.2)
+
+    statuses = [s["status"] for s in report["shards"]]
+    assert statuses == ["Stopped", "Stopped", "Timeout"]
+    assert sm.calls["stop_transform_job"] == 2
+    assert report["shards"][2]["failure_reason"] == "Timed out before launch"
+
+
+def write_outputs(s3, report):
+    """按 Manifest 布局为每个分片写出 .out（每行输入对应一行预测）"""
+    for shard in report["shards"]:
+        out_bucket, _, out_prefix = shard["output_s3_uri"][len("s3://"):].partition("/")
+        for key in json.loads(s3.read(shard["manifest_s3_uri"]))[1:]:
+            rows = s3.read(f"s3://data/{key}").decode().splitlines()
+            body = "".join(f"{i}\n" for i, _ in enumerate(rows))
+            s3.put_object(Bucket=out_bucket, Key=f"{out_prefix}{key}.out", Body=body)
+
+
+def test_sharded_results_join_inputs_from_input_bucket(config, s3, sm, poller):
+    report = run(config, s3, sm, poller)
+    write_outputs(s3, report)
+
+    rows = list(iter_transform_results("s3://out/scores/", input_s3_uri="s3://data/input/", s3_client=s3))
+    assert len(rows) == sum(i + 1 for i in range(6))
+    assert all(row == "1,2" for row, _ in rows)
+
+    # Manifest 在输出 Bucket，输入按 Manifest 的 prefix 从输入 Bucket 读取
+    shard = report["shards"][0]
+    keys = json.loads(s3.read(shard["manifest_s3_uri"]))[1:]
+    job_rows = list(iter_transform_job_results(shard["job_name"], config=config, sm_client=sm, s3_client=s3))
+    assert len(job_rows) == sum(len(s3.read(f"s3://data/{key}").splitlines()) for key in keys)
+
+
+def test_unsharded_shard_named_directory_is_kept(s3):
+    s3.put_object(Bucket="data", Key="input/shard-1/a.csv", Body=b"x\ny\n")
+    s3.put_object(Bucket="out", Key="plain/shard-1/a.csv.out", Body=b"0\n1\n")
+
+    rows = list(iter_transform_results("s3://out/plain/", input_s3_uri="s3://data/input/", s3_client=s3))
+
+    assert [row for row, _ in rows] == ["x", "y"]
@@ -0,0 +1,180 @@
+from concurrent.futures import TimeoutError as FutureTimeoutError
+
+import pytest
+
+pytest.importorskip("botocore")
+
+from sm_deploy.poller import ENDPOINT, TRANSFORM_JOB, StatusPoller  # noqa: E402
+from sm_deploy.testing import FakeClock, FakeSageMaker  # noqa: E402
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def sm(clock):
+    return FakeSageMaker(clock)
+
+
+@pytest.fixture
+def poller(config, sm, clock):
+    return StatusPoller(config, sm_client=sm, clock=clock, background=False)
+
+
+def run_until_done(poller, clock, futures, limit=1000):
+    """推进模拟时钟直到所有 Future 完成，返回轮询轮数"""
+    rounds = 0
+    while not all(f.done() for f in futures):
+        clock.advance(poller.poll_once())
+        rounds += 1
+        assert rounds < limit
+    return rounds
+
+
+def test_backoff_grows_to_max_interval(poller, sm, clock):
+    sm.set_endpoint("ml-test-ep", "Creating")
+    poller.track_endpoint("ml-test-ep")
+
+    delays = []
+    for _ in range(8):
+        clock.advance(poller.poll_once())
+        delays.append(clock())
+    gaps = [b - a for a, b in zip(delays, delays[1:])]
+
+    assert gaps[:3] == pytest.approx([5.0, 7.5, 11.25])
+    assert all(later >= earlier for earlier, later in zip(gaps, gaps[1:]))
+    assert gaps[-1] == pytest.approx(30.0)
+
+
+def test_status_change_resets_to_fast_polling(poller, sm, clock):
+    sm.set_endpoint("ml-test-ep", "Creating")
+    sm.set_endpoint("ml-test-ep", "Updating", at=200)
+    poller.track_endpoint("ml-test-ep")
+
+    while clock() < 200:
+        clock.advance(poller.poll_once())
+    # 这一轮看到 Creating -> Updating，间隔回到 min_interval
+    assert poller.poll_once() == pytest.approx(5.0)
+
+
+def test_endpoint_future_and_callback(poller, sm, clock):
+    sm.set_endpoint("ml-test-ep", "Creating")
+    sm.set_endpoint("ml-test-ep", "InService", at=120)
+    results = []
+
+    future = poller.track_endpoint("ml-test-ep", callback=results.append)
+    # 同一资源共享 Future
+    assert poller.track_endpoint("ml-test-ep") is future
+
+    run_until_done(poller, clock, [future])
+    result = future.result()
+    assert result["status"] == "InService"
+    assert result["elapsed"] >= 120
+    assert results == [result]
+
+
+def test_failed_endpoint_reports_reason(poller, sm, clock):
+    sm.set_endpoint("ml-test-ep", "Creating")
+    sm.set_endpoint("ml-test-ep", "Failed", at=60, failure_reason="image pull failed")
+
+    future = poller.track_endpoint("ml-test-ep")
+    run_until_done(poller, clock, [future])
+    assert future.result()["status"] == "Failed"
+    assert future.result()["failure_reason"] == "image pull failed"
+
+
+def test_missing_endpoint_sets_exception(poller, clock):
+    future = poller.track_endpoint("ml-test-missing")
+    run_until_done(poller, clock, [future])
+    assert "Could not find endpoint" in str(future.exception())
+
+
+def test_batch_refresh_uses_single_list_call(poller, sm, clock):
+    names = [f"ml-test-ep-{i}" for i in range(5)]
+    for i, name in enumerate(names):
+        sm.set_endpoint(name, "Creating")
+        sm.set_endpoint(name, "InService", at=100 + 10 * i)
+    futures = [poller.track_endpoint(name) for name in names]
+
+    clock.advance(poller.poll_once())
+    poller.poll_once()
+    assert sm.calls["list_endpoints"] == 1
+    assert sm.calls["describe_endpoint"] == 0
+
+    run_until_done(poller, clock, futures)
+    assert all(f.result()["status"] == "InService" for f in futures)
+
+
+def test_batch_refresh_describes_failed_endpoints(poller, sm, clock):
+    sm.set_endpoint("ml-test-a", "Creating")
+    sm.set_endpoint("ml-test-b", "Creating")
+    sm.set_endpoint("ml-test-b", "Failed", at=30, failure_reason="capacity")
+    sm.set_endpoint("ml-test-a", "InService", at=30)
+    futures = [poller.track_endpoint("ml-test-a"), poller.track_endpoint("ml-test-b")]
+
+    run_until_done(poller, clock, futures)
+    assert futures[1].result()["failure_reason"] == "capacity"
+    # ListEndpoints 不返回失败原因，只对失败的 Endpoint 调用 Describe
+    assert sm.calls["describe_endpoint"] == 1
+
+
+def test_transform_jobs_leaving_in_progress_are_described(poller, sm, clock):
+    jobs = ["ml-test-job-1", "ml-test-job-2", "ml-test-job-3"]
+    for job in jobs:
+        sm.set_transform_job(job, "InProgress")
+    sm.set_transform_job(jobs[0], "Failed", at=4, failure_reason="bad input")
+    sm.set_transform_job(jobs[1], "Completed", at=400)
+    sm.set_transform_job(jobs[2], "Completed", at=400)
+    futures = [poller.track_transform_job(job) for job in jobs]
+
+    # List 只返回 InProgress: 这一轮只有已结束的 Job 需要 Describe
+    clock.advance(poller.poll_once())
+    poller.poll_once()
+    assert sm.calls["list_transform_jobs"] == 1
+    assert sm.calls["describe_transform_job"] == 1
+    assert futures[0].result()["failure_reason"] == "bad input"
+    assert not futures[1].done() and not futures[2].done()
+
+    run_until_done(poller, clock, futures)
+    assert [f.result()["status"] for f in futures] == ["Failed", "Completed", "Completed"]
+
+
+def test_wait_timeout_keeps_other_waiters_tracked(poller, sm, clock):
+    sm.set_endpoint("ml-test-ep", "Creating")
+    sm.set_endpoint("ml-test-ep", "InService", at=60)
+    results = []
+    future = poller.track_endpoint("ml-test-ep", callback=results.append)
+
+    with pytest.raises(FutureTimeoutError):
+        poller.wait_endpoint("ml-test-ep", timeout=0.01)
+
+    # 超时的等待者放弃后，回调仍然收到结果
+    run_until_done(poller, clock, [future])
+    assert results and results[0]["status"] == "InService"
+
+
+def test_wait_transform_job_timeout_untracks_last_waiter(poller, sm, clock):
+    sm.set_transform_job("ml-test-job", "InProgress")
+
+    with pytest.raises(FutureTimeoutError):
+        poller.wait_transform_job("ml-test-job", timeout=0.01)
+
+    assert poller.poll_once() == poller.max_interval
+    assert sm.calls["describe_transform_job"] == 0
+
+
+def test_untrack_is_refcounted(poller, sm, clock):
+    sm.set_endpoint("ml-test-ep", "Creating")
+    poller.track_endpoint("ml-test-ep")
+    poller.track_endpoint("ml-test-ep")
+
+    poller.untrack(ENDPOINT, "ml-test-ep")
+    clock.advance(poller.poll_once())
+    poller.poll_once()
+    assert sm.calls["describe_endpoint"] == 1
+
+    poller.untrack(ENDPOINT, "ml-test-ep")
+    poller.untrack(TRANSFORM_JOB, "unknown")
+    assert poller.poll_once() == poller.max_interval